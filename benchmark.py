@@ -0,0 +1,412 @@
+"""
+Benchmark suite (NO network): evaluator throughput, JSON extraction, metrics
+logging overhead and end-to-end graph runs against the offline mock LLM.
+
+Results are written as JSON and compared with a stored baseline; a case that
+is worse than the baseline by more than its threshold is a regression and
+makes the exit code 1.
+
+--scaling adds generated instances of growing size (problem.generate), each
+benchmarked in its own process: evaluator throughput, prompt prefix tokens
+and a short mock run's convergence. It is off by default, so the default
+cases always run on the default instance.
+
+Usage:
+  python benchmark.py                       # run everything, compare to benchmark_baseline.json
+  python benchmark.py --quick               # smaller graph sweep
+  python benchmark.py --only evaluate       # cases whose name contains "evaluate"
+  python benchmark.py --save-baseline       # store this run as the new baseline
+  python benchmark.py --only scaling --scaling 10 50 200   # instance-size scaling only
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+RESULTS_FILE = os.path.join(os.path.dirname(__file__), "benchmark_results.json")
+DEFAULT_THRESHOLD = 0.30  # fail when a case is more than 30% worse than its baseline
+MIN_SECONDS = 0.5         # each timing repeat runs at least this long
+REPEATS = 5               # best of N repeats
+
+GRID = {"islands": (2, 4), "pop": (4, 8), "gens": (2, 4)}
+QUICK_GRID = {"islands": (2,), "pop": (4,), "gens": (2,)}
+
+
+# ── Inputs ──
+
+def _valid_plans(n: int, seed: int = 0) -> list[str]:
+    """The optimum plan (stored in the instance, or from the solver) plus noisy but well-formed plans like the LLM produces."""
+    from evaluator import PROBLEM
+    from mock_llm import _random_plan
+    from solver import solve
+    rng = random.Random(seed)
+    plans = [json.dumps(PROBLEM.solution, ensure_ascii=False) if PROBLEM.solution else solve()[1]]
+    while len(plans) < n:
+        plans.append(json.dumps({"meetings": _random_plan(rng, noise=0.3)}))
+    return plans
+
+
+def _invalid_plans(n: int, seed: int = 0) -> list[str]:
+    """Unparseable text: truncated JSON, prose, empty, non-plan JSON."""
+    rng = random.Random(seed)
+    valid = _valid_plans(n, seed)
+    out = []
+    for i, plan in enumerate(valid):
+        kind = i % 4
+        if kind == 0:
+            out.append(plan[: rng.randint(1, len(plan) - 1)])
+        elif kind == 1:
+            out.append("Lo siento, no puedo generar el plan.")
+        elif kind == 2:
+            out.append("")
+        else:
+            out.append(json.dumps({"plan": "none"}))
+    return out
+
+
+def _adversarial_plans(n: int, seed: int = 0) -> list[str]:
+    """Well-formed JSON that stresses the evaluator: huge, duplicated, mistyped and out-of-range meetings."""
+    from evaluator import PARTICIPANTS
+    rng = random.Random(seed)
+    people = list(PARTICIPANTS) + ["Zoe", "", "ana"]
+    out = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:   # hundreds of meetings, many repeats
+            meetings = [{"person": rng.choice(people), "day": rng.choice([1, 2]),
+                         "start": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+                         "end": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"} for _ in range(300)]
+        elif kind == 1:  # wrong types everywhere
+            meetings = [{"person": rng.choice(people), "day": rng.choice(["1", None, 3, 1.5]),
+                         "start": rng.choice(["9", "99:99", "", "09:00"]), "end": rng.choice(["", "xx", "10:00"])}
+                        for _ in range(20)]
+        elif kind == 2:  # overlapping back-to-back meetings at one instant
+            meetings = [{"person": p, "day": 1, "start": "12:00", "end": "12:00"} for p in people]
+        else:            # bare list root with extra keys
+            meetings = [{"person": p, "day": 2, "start": "08:00", "end": "20:00", "location": "x" * 200} for p in people]
+        out.append(json.dumps(meetings if kind == 3 else {"meetings": meetings}))
+    return out
+
+
+def _llm_outputs(n: int, seed: int = 0) -> list[str]:
+    """Realistic raw completions: fenced, commented, with prose before and after the plan."""
+    rng = random.Random(seed)
+    out = []
+    for i, plan in enumerate(_valid_plans(n, seed)):
+        kind = i % 4
+        if kind == 0:
+            out.append(plan)
+        elif kind == 1:
+            out.append(f"```json\n{plan}\n```")
+        elif kind == 2:
+            commented = plan.replace('"day": 1,', '"day": 1, // dia 1', 1)
+            out.append(f"Aqui tienes el plan:\n```json\n{commented}\n```\nExplicacion: " + "viaje respetado. " * rng.randint(5, 40))
+        else:
+            out.append("/* plan */ " + plan + " Nota: Elena puede ir cualquier dia.")
+    return out
+
+
+# ── Timing ──
+
+def _throughput(fn, items: list) -> float:
+    """Best-of-REPEATS items/sec for fn(item), each repeat looping for at least MIN_SECONDS."""
+    best = 0.0
+    for _ in range(REPEATS):
+        done, t0 = 0, time.perf_counter()
+        while True:
+            for item in items:
+                fn(item)
+            done += len(items)
+            elapsed = time.perf_counter() - t0
+            if elapsed >= MIN_SECONDS:
+                break
+        best = max(best, done / elapsed)
+    return best
+
+
+def _batch_throughput(fn, items: list) -> float:
+    """Like _throughput, for fn(items) scoring the whole list at once."""
+    return _throughput(fn, [items]) * len(items)
+
+
+def _result(value: float, unit: str, higher_is_better: bool) -> dict:
+    return {"value": round(value, 4), "unit": unit, "higher_is_better": higher_is_better}
+
+
+# ── Cases ──
+
+def _retimed_children(n: int, seed: int = 0) -> list:
+    """(parent evaluation, MeetingDiff moving one meeting, child plan): the near-duplicates local search produces."""
+    from evaluator import MeetingDiff, evaluate_detailed
+    rng = random.Random(seed)
+    out = []
+    for text in _valid_plans(n, seed):
+        plan = json.loads(text)
+        meetings = plan["meetings"]
+        i = rng.randrange(len(meetings))
+        diff = MeetingDiff(replaced={i: dict(meetings[i], start=f"{rng.randint(8, 18):02d}:{rng.choice([0, 15, 30]):02d}")})
+        out.append((evaluate_detailed(plan), diff, {"meetings": diff.apply(meetings)}))
+    return out
+
+
+def bench_evaluator() -> dict:
+    from evaluator import evaluate, evaluate_batch, evaluate_delta, evaluate_plan
+    valid, invalid, adversarial = _valid_plans(200), _invalid_plans(200), _adversarial_plans(40)
+    children = _retimed_children(200)
+    return {
+        "evaluate_child_full": _result(_throughput(lambda c: evaluate_plan(c[2]), children), "plans/s", True),
+        "evaluate_child_delta": _result(_throughput(lambda c: evaluate_delta(c[0], c[1]), children), "plans/s", True),
+        "evaluate_valid": _result(_throughput(evaluate, valid), "plans/s", True),
+        "evaluate_invalid": _result(_throughput(evaluate, invalid), "plans/s", True),
+        "evaluate_adversarial": _result(_throughput(evaluate, adversarial), "plans/s", True),
+        "evaluate_batch_valid": _result(_batch_throughput(evaluate_batch, valid), "plans/s", True),
+        "evaluate_batch_adversarial": _result(_batch_throughput(evaluate_batch, adversarial), "plans/s", True),
+    }
+
+
+def bench_extract_json() -> dict:
+    from nodes import _extract_json
+    return {"extract_json": _result(_throughput(_extract_json, _llm_outputs(200)), "outputs/s", True)}
+
+
+def bench_metrics(tmp: str) -> dict:
+    import metrics
+    metrics.METRICS_FILE = os.path.join(tmp, "metrics.csv")
+    metrics.init_csv(run_id="benchmark")
+    rows = [(g, i % 4 + 1, i, 0.5, 3, 100, "eval") for g in range(10) for i in range(50)]
+    counts = {"C1": 1, "C2": 1, "C11": 1}
+    rate = _throughput(lambda row: metrics.log_row(*row, counts=counts), rows)
+    metrics.flush()
+    return {"metrics_log_row": _result(rate, "rows/s", True)}
+
+
+def bench_graph(tmp: str, grid: dict) -> dict:
+    """Full build_graph().invoke runs against a zero-latency mock LLM: pipeline overhead per generation."""
+    import instrumentation
+    import metrics
+    import nodes
+    import rate_limiter
+    from evaluator import FITNESS_CACHE
+    from graph import build_graph
+    from llm_cache import get_cache
+    from mock_llm import MockChatModel
+    from run_config import RunConfig, graph_config
+
+    metrics.METRICS_FILE = os.path.join(tmp, "metrics.csv")
+    instrumentation.PERF_FILE = os.path.join(tmp, "perf.csv")
+    rate_limiter._limiter = rate_limiter.RateLimiter(rpm=1e9, tpm=1e12)  # measure the pipeline, not the quota
+    nodes.BACKENDS["bench"] = lambda seed: MockChatModel(seed=seed, latency=0.0, seconds_per_token=0.0)
+    results = {}
+    for islands in grid["islands"]:
+        for pop in grid["pop"]:
+            for gens in grid["gens"]:
+                cfg = RunConfig(run_id="benchmark", islands=islands, pop_size=pop, max_generations=gens,
+                                seed=0, backend="bench", prompt_format="full")
+                elapsed = float("inf")
+                for _ in range(REPEATS):
+                    # Every repeat starts cold: fresh mock (same responses), empty fitness cache, cache ordinals at 0
+                    nodes._llms.clear()
+                    FITNESS_CACHE.clear()
+                    get_cache().reset_ordinals()
+                    state = {"generation": 0, "max_generations": gens, "llm_call_count": 0,
+                             "best_solution": "", "best_score": 0.0, "islands": []}
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        t0 = time.perf_counter()
+                        final = build_graph().invoke(state, graph_config(cfg))
+                        elapsed = min(elapsed, time.perf_counter() - t0)
+                results[f"graph_i{islands}_p{pop}_g{gens}"] = _result(
+                    elapsed / (gens + 1), "s/generation", False)
+                results[f"graph_i{islands}_p{pop}_g{gens}_calls"] = _result(
+                    final["llm_call_count"] / elapsed, "llm_calls/s", True)
+    nodes._llms.clear()
+    del nodes.BACKENDS["bench"]
+    rate_limiter._limiter = None
+    metrics.flush()
+    instrumentation.flush()
+    return results
+
+
+SCALING_GRID = {"islands": 2, "pop": 4, "gens": 3}  # convergence run per instance size
+
+
+def _scaling_instance(people: int):
+    """Generated instance of `people` participants: a location per 5 people, a day per 12 (at least 2 of each)."""
+    from problem import generate
+    return generate(people, max(2, people // 5), max(2, math.ceil(people / 12)), density=0.5, seed=0,
+                    name=f"scaling_{people}p")
+
+
+def _scaling_case(people: int, tmp: str) -> dict:
+    """Runs in a fresh process whose PROBLEM_FILE is the generated instance."""
+    import instrumentation
+    import metrics
+    import nodes
+    import rate_limiter
+    from evaluator import evaluate, evaluate_batch
+    from graph import build_graph
+    from mock_llm import MockChatModel
+    from prompts import FULL_PROBLEM_DESCRIPTION, compact_problem_description, count_tokens
+    from run_config import RunConfig, graph_config
+
+    valid = _valid_plans(100)
+    name = f"scaling_n{people}"
+    results = {
+        f"{name}_evaluate": _result(_throughput(evaluate, valid), "plans/s", True),
+        f"{name}_evaluate_batch": _result(_batch_throughput(evaluate_batch, valid), "plans/s", True),
+        f"{name}_prefix_full": _result(count_tokens(FULL_PROBLEM_DESCRIPTION + "\n\n"), "tokens", False),
+        f"{name}_prefix_compact": _result(count_tokens(compact_problem_description() + "\n\n"), "tokens", False),
+    }
+
+    metrics.METRICS_FILE = os.path.join(tmp, "metrics.csv")
+    instrumentation.PERF_FILE = os.path.join(tmp, "perf.csv")
+    rate_limiter._limiter = rate_limiter.RateLimiter(rpm=1e9, tpm=1e12)
+    nodes.BACKENDS["bench"] = lambda seed: MockChatModel(seed=seed, latency=0.0, seconds_per_token=0.0)
+    gens = SCALING_GRID["gens"]
+    cfg = RunConfig(run_id="benchmark", islands=SCALING_GRID["islands"], pop_size=SCALING_GRID["pop"],
+                    max_generations=gens, seed=0, backend="bench", prompt_format="full", target_score=1.0,
+                    local_search=True, local_search_workers=0)
+    state = {"generation": 0, "max_generations": gens, "target_score": 1.0, "llm_call_count": 0,
+             "best_solution": "", "best_score": 0.0, "islands": []}
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        final = build_graph().invoke(state, graph_config(cfg))
+        elapsed = time.perf_counter() - t0
+    metrics.flush()
+    instrumentation.flush()
+    results[f"{name}_best_score"] = _result(final["best_score"], "score", True)
+    results[f"{name}_llm_calls"] = _result(final["llm_call_count"], "llm_calls", False)
+    results[f"{name}_run"] = _result(elapsed / (final["generation"] + 1), "s/generation", False)
+    return results
+
+
+def bench_scaling(tmp: str, sizes: list) -> dict:
+    """One generated instance per size, each benchmarked in a spawned process (the instance is fixed per process)."""
+    from problem import save_problem
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    previous = os.environ.get("PROBLEM_FILE")
+    try:
+        for people in sizes:
+            path = os.path.join(tmp, f"scaling_{people}p.json")
+            save_problem(_scaling_instance(people), path)
+            os.environ["PROBLEM_FILE"] = path  # read by the spawned interpreter at import
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                results.update(pool.submit(_scaling_case, people, tmp).result())
+    finally:
+        if previous is None:
+            os.environ.pop("PROBLEM_FILE", None)
+        else:
+            os.environ["PROBLEM_FILE"] = previous
+    return results
+
+
+# ── Baseline comparison ──
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regression messages for cases worse than baseline by more than their threshold."""
+    regressions = []
+    base_cases = baseline.get("cases", {})
+    thresholds = baseline.get("thresholds", {})
+    for name, res in results.items():
+        base = base_cases.get(name)
+        if base is None or not base["value"]:
+            continue
+        limit = thresholds.get(name, threshold)
+        change = (res["value"] - base["value"]) / base["value"]
+        worse = -change if res["higher_is_better"] else change
+        if worse > limit:
+            regressions.append(f"{name}: {res['value']:g} {res['unit']} vs baseline {base['value']:g} "
+                               f"({worse:.0%} worse, limit {limit:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mind Evolution v4 benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smallest graph sweep only")
+    parser.add_argument("--only", default=None, help="run only cases whose name contains this")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown vs baseline (per-case overrides live in the baseline file)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the baseline")
+    parser.add_argument("--scaling", type=int, nargs="+", default=None, metavar="PEOPLE",
+                        help="also benchmark generated instances with these participant counts")
+    args = parser.parse_args()
+
+    suites = {
+        "evaluate": bench_evaluator,
+        "extract_json": bench_extract_json,
+        "metrics": bench_metrics,
+        "graph": bench_graph,
+    }
+    if args.scaling:
+        suites["scaling"] = bench_scaling
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, suite in suites.items():
+            if args.only and args.only not in name:
+                continue
+            t0 = time.perf_counter()
+            if name == "graph":
+                cases = suite(tmp, QUICK_GRID if args.quick else GRID)
+            elif name == "metrics":
+                cases = suite(tmp)
+            elif name == "scaling":
+                cases = suite(tmp, args.scaling)
+            else:
+                cases = suite()
+            results.update(cases)
+            print(f"[bench] {name}: {len(cases)} cases in {time.perf_counter() - t0:.1f}s")
+
+    for name, res in results.items():
+        print(f"  {name:<36}{res['value']:>14,.2f} {res['unit']}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Results written to {args.output}")
+
+    if args.save_baseline:
+        old = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                old = json.load(f)
+        report["thresholds"] = old.get("thresholds", {})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("[bench] No baseline yet (run with --save-baseline)")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"[bench] {len(regressions)} regression(s):")
+        for r in regressions:
+            print(f"  REGRESSION {r}")
+        sys.exit(1)
+    print("[bench] No regressions vs baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Crash-safe LangGraph checkpointer backed by a local sqlite file.
+
+Extends LangGraph's InMemorySaver, which already keeps channel values as
+versioned blobs and only writes the channels that changed in a step. Each
+put() appends just those new blobs plus the small checkpoint record to
+sqlite, so a generation costs a few row inserts rather than a full state dump.
+A thread (run) is loaded into memory the first time it is read or written, so
+reads stay in-memory without pulling every past run into RAM; prune_thread()
+shrinks a finished run to its final checkpoint.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+CHECKPOINT_FILE = os.path.join(os.path.dirname(__file__), "checkpoints.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT, ns TEXT, channel TEXT, version TEXT, type TEXT, data BLOB,
+    PRIMARY KEY (thread_id, ns, channel, version));
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT, ns TEXT, checkpoint_id TEXT, ckpt_type TEXT, ckpt BLOB,
+    meta_type TEXT, meta BLOB, parent_id TEXT,
+    PRIMARY KEY (thread_id, ns, checkpoint_id));
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT, ns TEXT, checkpoint_id TEXT, task_id TEXT, idx INTEGER,
+    channel TEXT, type TEXT, data BLOB, task_path TEXT,
+    PRIMARY KEY (thread_id, ns, checkpoint_id, task_id, idx));
+CREATE TABLE IF NOT EXISTS run_config (run_id TEXT PRIMARY KEY, config TEXT);
+"""
+
+
+# State types stored in checkpoints (msgpack refuses to rebuild unregistered classes)
+ALLOWED_TYPES = [("state", "Individual"), ("evaluator", "EvalResult"), ("evaluator", "Violation")]
+
+
+class SqliteDeltaSaver(InMemorySaver):
+    def __init__(self, path: str = CHECKPOINT_FILE):
+        super().__init__(serde=JsonPlusSerializer(allowed_msgpack_modules=ALLOWED_TYPES))
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._loaded = set()
+
+    def _load(self, thread_id: str):
+        """Read one thread's rows into the in-memory saver (once per thread)."""
+        with self._lock:
+            if thread_id in self._loaded:
+                return
+            self._loaded.add(thread_id)
+            for ns, channel, version, typ, data in self._conn.execute(
+                    "SELECT ns, channel, version, type, data FROM blobs WHERE thread_id = ?", (thread_id,)):
+                self.blobs[(thread_id, ns, channel, version)] = (typ, data)
+            for ns, cid, ctype, ckpt, mtype, meta, parent in self._conn.execute(
+                    "SELECT ns, checkpoint_id, ckpt_type, ckpt, meta_type, meta, parent_id FROM checkpoints"
+                    " WHERE thread_id = ?", (thread_id,)):
+                self.storage[thread_id][ns][cid] = ((ctype, ckpt), (mtype, meta), parent)
+            for ns, cid, task_id, idx, channel, typ, data, task_path in self._conn.execute(
+                    "SELECT ns, checkpoint_id, task_id, idx, channel, type, data, task_path FROM writes"
+                    " WHERE thread_id = ?", (thread_id,)):
+                self.writes[(thread_id, ns, cid)][(task_id, idx)] = (task_id, channel, (typ, data), task_path)
+
+    def _load_all(self):
+        for (thread_id,) in self._conn.execute("SELECT DISTINCT thread_id FROM checkpoints").fetchall():
+            self._load(thread_id)
+
+    def get_tuple(self, config):
+        self._load(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def get_delta_channel_history(self, *, config, channels):
+        self._load(config["configurable"]["thread_id"])
+        return super().get_delta_channel_history(config=config, channels=channels)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        if config:
+            self._load(config["configurable"]["thread_id"])
+        else:
+            self._load_all()
+        return super().list(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        self._load(thread_id)
+        result = super().put(config, checkpoint, metadata, new_versions)
+        ns = config["configurable"]["checkpoint_ns"]
+        (ctype, ckpt), (mtype, meta), parent = self.storage[thread_id][ns][checkpoint["id"]]
+        with self._lock:
+            # Only the channels that changed in this step
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                [(thread_id, ns, k, v, *self.blobs[(thread_id, ns, k, v)]) for k, v in new_versions.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, ns, checkpoint["id"], ctype, ckpt, mtype, meta, parent),
+            )
+            self._conn.commit()
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        self._load(thread_id)
+        super().put_writes(config, writes, task_id, task_path)
+        ns = config["configurable"].get("checkpoint_ns", "")
+        cid = config["configurable"]["checkpoint_id"]
+        rows = [
+            (thread_id, ns, cid, tid, idx, channel, typ, data, path)
+            for (tid, idx), (_, channel, (typ, data), path) in self.writes[(thread_id, ns, cid)].items()
+            if tid == task_id
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str):
+        super().delete_thread(thread_id)
+        with self._lock:
+            for table in ("blobs", "checkpoints", "writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+            self._loaded.add(thread_id)  # nothing left on disk to load
+
+    def prune_thread(self, thread_id: str):
+        """
+        Keep only a finished run's final checkpoint (and the blobs it references): enough
+        for --resume to report the run, without the history of every node of every generation.
+        """
+        with self._lock:
+            namespaces = self._conn.execute(
+                "SELECT DISTINCT ns FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchall()
+            for (ns,) in namespaces:
+                cid, ctype, ckpt = self._conn.execute(
+                    "SELECT checkpoint_id, ckpt_type, ckpt FROM checkpoints WHERE thread_id = ? AND ns = ?"
+                    " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, ns)).fetchone()
+                versions = self.serde.loads_typed((ctype, ckpt))["channel_versions"]
+                self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ? AND ns = ? AND checkpoint_id != ?",
+                                   (thread_id, ns, cid))
+                self._conn.execute("DELETE FROM writes WHERE thread_id = ? AND ns = ? AND checkpoint_id != ?",
+                                   (thread_id, ns, cid))
+                stale = [(channel, version) for channel, version in self._conn.execute(
+                    "SELECT channel, version FROM blobs WHERE thread_id = ? AND ns = ?", (thread_id, ns))
+                    if versions.get(channel) != version]
+                self._conn.executemany("DELETE FROM blobs WHERE thread_id = ? AND ns = ? AND channel = ? AND version = ?",
+                                       [(thread_id, ns, channel, version) for channel, version in stale])
+            self._conn.commit()
+        # Drop the in-memory copy; the next read loads the pruned thread
+        InMemorySaver.delete_thread(self, thread_id)
+        self._loaded.discard(thread_id)
+
+    # ── Run config (so --resume restores islands / pop / stopping rules) ──
+
+    def save_run_config(self, run_id: str, config: dict):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO run_config VALUES (?, ?)", (run_id, json.dumps(config)))
+            self._conn.commit()
+
+    def load_run_config(self, run_id: str):
+        row = self._conn.execute("SELECT config FROM run_config WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row else None
@@ -1,85 +1,37 @@
 """
 Deterministic fitness evaluator v4 (NO LLM).
-2-Day Meeting Planner: 10 participants, 8 locations, 11 constraints.
+Multi-day Meeting Planner, 11 constraints. Participants, locations, travel
+times, days and the C6 / C11 minimums come from the active problem instance
+(problem.py); the default one has 10 participants, 9 locations and 2 days.
 """
 
 import json
-from typing import Tuple
-
-# ── Participants ──
-PARTICIPANTS = {
-    # Day 1
-    "Ana":    {"location": "Cafe Central",       "day": 1, "avail_start": 540,  "avail_end": 720,  "duration": 45},
-    "Bruno":  {"location": "Parque Norte",       "day": 1, "avail_start": 600,  "avail_end": 780,  "duration": 30, "prereq": "Ana"},
-    "Carla":  {"location": "Biblioteca Sur",     "day": 1, "avail_start": 480,  "avail_end": 660,  "duration": 60},
-    "Diego":  {"location": "Oficina Este",       "day": 1, "avail_start": 840,  "avail_end": 1020, "duration": 45},
-    "Elena":  {"location": "Centro Comercial",   "day": 0, "avail_start": 900,  "avail_end": 1140, "duration": 30},  # day 0 = both days
-    "Felipe": {"location": "Restaurante Oeste",  "day": 1, "avail_start": 660,  "avail_end": 840,  "duration": 60},
-    # Day 2
-    "Gaby":   {"location": "Hotel Plaza",        "day": 2, "avail_start": 540,  "avail_end": 720,  "duration": 45},
-    "Hugo":   {"location": "Museo Central",      "day": 2, "avail_start": 600,  "avail_end": 840,  "duration": 30, "prereq": "Gaby"},
-    "Isabel": {"location": "Parque Norte",       "day": 2, "avail_start": 780,  "avail_end": 960,  "duration": 60},
-    "Javier": {"location": "Estacion Sur",       "day": 2, "avail_start": 960,  "avail_end": 1140, "duration": 45, "prereq": "Isabel"},
-}
-
-LOCATIONS = [
-    "Cafe Central", "Parque Norte", "Biblioteca Sur", "Oficina Este",
-    "Centro Comercial", "Restaurante Oeste", "Hotel Plaza", "Museo Central",
-    "Estacion Sur",
-]
-
-# ── Travel times (minutes) ──
-_TRAVEL = {
-    ("Cafe Central", "Parque Norte"): 20,
-    ("Cafe Central", "Biblioteca Sur"): 30,
-    ("Cafe Central", "Oficina Este"): 25,
-    ("Cafe Central", "Centro Comercial"): 35,
-    ("Cafe Central", "Restaurante Oeste"): 15,
-    ("Cafe Central", "Hotel Plaza"): 10,
-    ("Cafe Central", "Museo Central"): 20,
-    ("Cafe Central", "Estacion Sur"): 40,
-    ("Parque Norte", "Biblioteca Sur"): 40,
-    ("Parque Norte", "Oficina Este"): 15,
-    ("Parque Norte", "Centro Comercial"): 25,
-    ("Parque Norte", "Restaurante Oeste"): 30,
-    ("Parque Norte", "Hotel Plaza"): 25,
-    ("Parque Norte", "Museo Central"): 15,
-    ("Parque Norte", "Estacion Sur"): 35,
-    ("Biblioteca Sur", "Oficina Este"): 35,
-    ("Biblioteca Sur", "Centro Comercial"): 45,
-    ("Biblioteca Sur", "Restaurante Oeste"): 25,
-    ("Biblioteca Sur", "Hotel Plaza"): 35,
-    ("Biblioteca Sur", "Museo Central"): 30,
-    ("Biblioteca Sur", "Estacion Sur"): 20,
-    ("Oficina Este", "Centro Comercial"): 20,
-    ("Oficina Este", "Restaurante Oeste"): 30,
-    ("Oficina Este", "Hotel Plaza"): 30,
-    ("Oficina Este", "Museo Central"): 25,
-    ("Oficina Este", "Estacion Sur"): 35,
-    ("Centro Comercial", "Restaurante Oeste"): 40,
-    ("Centro Comercial", "Hotel Plaza"): 30,
-    ("Centro Comercial", "Museo Central"): 20,
-    ("Centro Comercial", "Estacion Sur"): 25,
-    ("Restaurante Oeste", "Hotel Plaza"): 20,
-    ("Restaurante Oeste", "Museo Central"): 25,
-    ("Restaurante Oeste", "Estacion Sur"): 30,
-    ("Hotel Plaza", "Museo Central"): 15,
-    ("Hotel Plaza", "Estacion Sur"): 35,
-    ("Museo Central", "Estacion Sur"): 30,
-}
-
-# Make symmetric + self
-TRAVEL_TIMES = {}
-for (a, b), t in _TRAVEL.items():
-    TRAVEL_TIMES[(a, b)] = t
-    TRAVEL_TIMES[(b, a)] = t
-for loc in LOCATIONS:
-    TRAVEL_TIMES[(loc, loc)] = 0
-
-DAY_START = 480   # 08:00
-DAY_END = 1200    # 20:00
-LUNCH_START = 720  # 12:00
-LUNCH_END = 780    # 13:00
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from itertools import chain
+from typing import Any, NamedTuple, Tuple
+
+import numpy as np
+
+from problem import get_problem
+
+# ── Problem instance (problem.py; PROBLEM_FILE selects it) ──
+PROBLEM = get_problem()
+PARTICIPANTS = PROBLEM.participants
+LOCATIONS = PROBLEM.locations
+TRAVEL_TIMES = PROBLEM.travel  # symmetric, 0 on the diagonal
+
+DAYS = tuple(range(1, PROBLEM.days + 1))
+DAY_START = PROBLEM.day_start
+DAY_END = PROBLEM.day_end
+START_LOCATION = PROBLEM.start_location  # C8: every day starts here at DAY_START
+N_PEOPLE = len(PARTICIPANTS)
+MIN_PEOPLE = PROBLEM.min_people          # C6
+MIN_PER_DAY = dict(zip(DAYS, PROBLEM.min_per_day))  # C11
+# A violation costs 0.6 of a met person: 0.06 for the default 10, and large instances keep a gradient
+VIOLATION_PENALTY = round(0.6 / N_PEOPLE, 6)
 
 
 def _time_str(minutes: int) -> str:
@@ -98,155 +50,857 @@ def get_travel_time(loc_a: str, loc_b: str) -> int:
     return TRAVEL_TIMES.get((loc_a, loc_b), 60)
 
 
-def evaluate(solution_json: str) -> Tuple[float, str]:
-    """
-    Evaluate a 2-day meeting plan. 11 constraints.
-    Score = people_met/10 - 0.06*violations
-    """
+# ── Results ──
+# Violations are typed records; the Spanish feedback text the prompts quote is
+# only rendered when something reads EvalResult.feedback. Metrics use counts.
+
+CONSTRAINTS = tuple(f"C{i}" for i in range(1, 12))
+
+
+class Violation(NamedTuple):
+    """One violated constraint: code (C1..C11, or PLAN / PERSONA / HORA for unusable input), message kind, and the values it quotes."""
+    code: str
+    kind: str
+    person: Any = None
+    day: Any = None      # as written in the plan (also for C3 / C2 / C11: the day checked)
+    values: tuple = ()   # minutes, counts and names, see _MESSAGES
+
+
+_MESSAGES = {
+    "json": lambda v: "JSON invalido",
+    "format": lambda v: "Formato invalido: se espera {\"meetings\": [...]}",
+    "empty": lambda v: "Lista de reuniones vacia",
+    "unknown_person": lambda v: f"Persona '{v.person}' no existe",
+    "bad_time": lambda v: f"Hora invalida para {v.person}",
+    "duplicate": lambda v: f"C10: {v.person} duplicado",
+    "bad_day": lambda v: f"C7: {v.person} dia {v.day} invalido (debe ser {_DAY_CHOICES})",
+    # values: (required day,)
+    "wrong_day": lambda v: f"C7: {v.person} debe ser dia {v.values[0]}, no dia {v.day}",
+    # values: (start, available from) / (end, available until) / (duration, required)
+    "early": lambda v: f"C1: {v.person} empieza {_time_str(v.values[0])}, disponible desde {_time_str(v.values[1])}",
+    "late": lambda v: f"C1: {v.person} termina {_time_str(v.values[0])}, disponible hasta {_time_str(v.values[1])}",
+    "short": lambda v: f"C4: {v.person} dura {v.values[0]}min, necesita {v.values[1]}min",
+    "before_day": lambda v: f"C5: {v.person} antes de {_time_str(DAY_START)}",
+    "after_day": lambda v: f"C5: {v.person} despues de {_time_str(DAY_END)}",
+    # values: (end, next person, next start)
+    "overlap": lambda v: f"C3: D{v.day} {v.person}({_time_str(v.values[0])}) solapa {v.values[1]}({_time_str(v.values[2])})",
+    # values: (location, earliest arrival, travel minutes, previous location, start)
+    "travel": lambda v: (f"C2: D{v.day} llegas a {v.values[0]} a {_time_str(v.values[1])} "
+                         f"(travel {v.values[2]}min desde {v.values[3]}), "
+                         f"pero {v.person} empieza {_time_str(v.values[4])}"),
+    # values: (people met,)
+    "few_people": lambda v: f"C6: Solo {v.values[0]} reuniones, minimo {MIN_PEOPLE}",
+    # values: (prerequisite,) / (prerequisite, its start); day is the prerequisite's
+    "prereq_missing": lambda v: f"C9: {v.person} requiere {v.values[0]}, pero {v.values[0]} no programado",
+    "prereq_late": lambda v: f"C9: {v.person} requiere {v.values[0]} antes, pero {v.values[0]} es D{v.day}/{_time_str(v.values[1])}",
+    # values: (meetings that day, minimum)
+    "few_on_day": lambda v: f"C11: Solo {v.values[0]} reuniones dia {v.day}, minimo {v.values[1]}",
+}
+_PLAN_ERRORS = ("json", "format", "empty")
+_DAY_CHOICES = " o ".join(filter(None, (", ".join(map(str, DAYS[:-1])), str(DAYS[-1]))))  # "1 o 2"
+
+
+def render(violation: Violation) -> str:
+    """The feedback message of one violation."""
+    return _MESSAGES[violation.kind](violation)
+
+
+@dataclass(frozen=True)
+class EvalResult:
+    """Score of one plan and its violations, in evaluate()'s order. `feedback` is rendered on first use."""
+    score: float
+    violations: tuple = ()
+    people_met: int = 0
+
+    def __post_init__(self):
+        if isinstance(self.violations, list):  # checkpoints hand tuples back as lists
+            object.__setattr__(self, "violations", tuple(Violation(*v[:4], tuple(v[4])) for v in self.violations))
+
+    @cached_property
+    def feedback(self) -> str:
+        v = self.violations
+        if v and v[0].kind in _PLAN_ERRORS:
+            return render(v[0])
+        if self.people_met == 0:
+            return "Ninguna reunion valida"
+        if not v:
+            return f"Plan perfecto: {self.people_met} reuniones sin violaciones"
+        return "; ".join(map(render, v))
+
+    @cached_property
+    def counts(self) -> dict:
+        """Violations per code, e.g. {"C1": 2, "C11": 1}."""
+        counts = {}
+        for v in self.violations:
+            counts[v.code] = counts.get(v.code, 0) + 1
+        return counts
+
+
+INVALID_JSON = EvalResult(0.0, (Violation("PLAN", "json"),))
+
+
+def parse_plan(solution_json: str):
+    """(True, parsed JSON) or (False, None) if the text is not valid JSON."""
     try:
-        plan = json.loads(solution_json)
+        return True, json.loads(solution_json)
     except (json.JSONDecodeError, TypeError):
-        return 0.0, "JSON invalido"
+        return False, None
+
+
+def evaluate(solution_json: str) -> EvalResult:
+    """
+    Evaluate a meeting plan against the active instance. 11 constraints.
+    Score = people_met/N_PEOPLE - VIOLATION_PENALTY*violations
+    """
+    ok, plan = parse_plan(solution_json)
+    if not ok:
+        return INVALID_JSON
+    return evaluate_plan(plan)
+
+
+def evaluate_plan(plan) -> EvalResult:
+    """evaluate() for an already-parsed plan (whatever json.loads returned)."""
+    meetings, error = _plan_meetings(plan)
+    if error:
+        return error
+    return _evaluate_meetings(meetings)[0]
+
+
+_BAD_FORMAT = EvalResult(0.0, (Violation("PLAN", "format"),))
+_EMPTY = EvalResult(0.0, (Violation("PLAN", "empty"),))
 
+
+def _plan_meetings(plan):
+    """(meeting list, None) or (None, EvalResult) for a plan without usable meetings."""
     if isinstance(plan, list):
         meetings = plan
     elif isinstance(plan, dict) and "meetings" in plan:
         meetings = plan["meetings"]
     else:
-        return 0.0, "Formato invalido: se espera {\"meetings\": [...]}"
+        return None, _BAD_FORMAT
 
     if not meetings or not isinstance(meetings, list):
-        return 0.0, "Lista de reuniones vacia"
-
+        return None, _EMPTY
+    return meetings, None
+
+
+def _check_meeting(m, person: str):
+    """Order-independent checks of one meeting with a known participant: (violations, record or None if unusable)."""
+    day = m.get("day", 0)
+    start = _parse_time(m.get("start", ""))
+    end = _parse_time(m.get("end", ""))
+
+    if start < 0 or end < 0:
+        return (Violation("HORA", "bad_time", person),), None
+    if day not in DAYS:
+        return (Violation("C7", "bad_day", person, day),), None
+
+    info = PARTICIPANTS[person]
+    found = []
+
+    # C7: Correct day
+    if info["day"] != 0 and info["day"] != day:
+        found.append(Violation("C7", "wrong_day", person, day, (info["day"],)))
+
+    # C1: Within availability window
+    if start < info["avail_start"]:
+        found.append(Violation("C1", "early", person, day, (start, info["avail_start"])))
+    if end > info["avail_end"]:
+        found.append(Violation("C1", "late", person, day, (end, info["avail_end"])))
+
+    # C4: Duration
+    actual_dur = end - start
+    if actual_dur < info["duration"]:
+        found.append(Violation("C4", "short", person, day, (actual_dur, info["duration"])))
+
+    # C5: Day bounds
+    if start < DAY_START:
+        found.append(Violation("C5", "before_day", person, day))
+    if end > DAY_END:
+        found.append(Violation("C5", "after_day", person, day))
+
+    return tuple(found), {
+        "person": person,
+        "day": day,
+        "start": start,
+        "end": end,
+        "location": info["location"],
+    }
+
+
+def _day_violations(day_meetings: list, day: int) -> Tuple[list, list]:
+    """(C3 overlaps, C2/C8 travel chain) of one day's meetings, already sorted by start."""
+    overlaps = []
+    for i in range(len(day_meetings) - 1):
+        curr = day_meetings[i]
+        nxt = day_meetings[i + 1]
+        if curr["end"] > nxt["start"]:
+            overlaps.append(Violation("C3", "overlap", curr["person"], day, (curr["end"], nxt["person"], nxt["start"])))
+
+    # C8: Start from START_LOCATION each day at DAY_START
+    late = []
+    prev_loc = START_LOCATION
+    prev_end = DAY_START
+    for m in day_meetings:
+        travel = get_travel_time(prev_loc, m["location"])
+        earliest = prev_end + travel
+        if m["start"] < earliest:
+            late.append(Violation("C2", "travel", m["person"], day,
+                                  (m["location"], earliest, travel, prev_loc, m["start"])))
+        prev_loc = m["location"]
+        prev_end = m["end"]
+    return overlaps, late
+
+
+def _evaluate_meetings(meetings: list, keys: list = None, checks: dict = None, days: dict = None):
+    """
+    The 11 constraints over a meeting list: (EvalResult, PlanEvaluation fields or None).
+    With `keys` (one per meeting, see _meeting_key) the per-meeting checks are memoized
+    by key and the per-meeting / per-day results are returned for evaluate_delta();
+    `checks` / `days` are a parent evaluation's to reuse: a meeting whose key the
+    parent checked is not re-checked, and a day whose usable meetings are the same
+    keys in the same order keeps the parent's sorted sequence, C3 and C2 results.
+    """
     violations = []
-    valid_meetings = []
-    people_seen = set()
+    owners = {}  # person -> index of the meeting that counts for them (C10 keeps the first)
+    by_day = {day: [] for day in DAYS}
+    day_index = {day: [] for day in DAYS}
+    keyed = keys is not None
+    new_checks, entries, records = ({}, [], []) if keyed else (None, None, None)
 
-    for m in meetings:
+    for i, m in enumerate(meetings):
         person = m.get("person", "")
         if person not in PARTICIPANTS:
-            violations.append(f"Persona '{person}' no existe")
-            continue
+            found, record = (Violation("PERSONA", "unknown_person", person),), None
+        elif person in owners:  # C10: No duplicates
+            found, record = (Violation("C10", "duplicate", person),), None
+        else:
+            owners[person] = i
+            key = keys[i] if keyed else None
+            checked = checks.get(key) if checks and key is not None else None
+            if checked is None:
+                checked = _check_meeting(m, person)
+            if key is not None:
+                new_checks[key] = checked
+            found, record = checked
+            if record is not None:
+                by_day[record["day"]].append(record)
+                day_index[record["day"]].append(i)
+        violations.extend(found)
+        if keyed:
+            entries.append(found)
+            records.append(record)
+
+    # Per day: sorted sequence, C3 overlaps, C2 travel chain
+    day_results = {}
+    for day in DAYS:
+        order = tuple(keys[i] for i in day_index[day]) if keyed else None
+        parent = days.get(day) if days else None
+        if parent is not None and None not in order and parent[0] == order:
+            day_results[day] = parent
+        else:
+            day_results[day] = _sequence_day(order, by_day[day], day)
+
+    # C9: Prerequisites (same day before, or earlier day)
+    meeting_order = {}
+    for day in DAYS:
+        for m in day_results[day][1]:
+            meeting_order[m["person"]] = (m["day"], m["start"])
+    c9 = {person: _prereq_violation(person, prereq, meeting_order) for person, prereq in _PREREQ_OF}
+
+    result = _assemble(violations, day_results, len(owners), c9, {day: len(by_day[day]) for day in DAYS})
+    if not keyed:
+        return result, None
+    return result, {"checks": new_checks, "days": day_results, "entries": tuple(entries), "records": tuple(records),
+                    "owners": owners, "day_index": {day: tuple(day_index[day]) for day in DAYS},
+                    "meeting_order": meeting_order, "c9": c9}
+
+
+_PREREQ_OF = tuple((person, info["prereq"]) for person, info in PARTICIPANTS.items() if "prereq" in info)
+_DEPENDENTS = {}  # prerequisite -> the people who require it
+for _person, _prereq in _PREREQ_OF:
+    _DEPENDENTS.setdefault(_prereq, []).append(_person)
+
+
+def _sequence_day(order, records: list, day: int) -> tuple:
+    """(keys in input order, records sorted by start, C3, C2) for one day."""
+    ordered = sorted(records, key=lambda x: x["start"])
+    return (order, ordered, *_day_violations(ordered, day))
+
+
+def _prereq_violation(person: str, prereq: str, meeting_order: dict):
+    """C9 for one person with a prerequisite (None when met in time or when `person` is not met)."""
+    if person not in meeting_order:
+        return None
+    if prereq not in meeting_order:
+        return Violation("C9", "prereq_missing", person, values=(prereq,))
+    p_day, p_start = meeting_order[prereq]
+    if (p_day, p_start) >= meeting_order[person]:
+        return Violation("C9", "prereq_late", person, p_day, (prereq, p_start))
+    return None
 
-        # C10: No duplicates
+
+def _assemble(violations: list, day_results: dict, people_met: int, c9: dict, per_day: dict) -> EvalResult:
+    """
+    Append the plan-level violations to the per-meeting ones, in evaluate()'s order:
+    C3 and C2 by day, C6, C9 in participant order, C11 by day; then score.
+    """
+    for day in DAYS:
+        violations.extend(day_results[day][2])  # C3
+    for day in DAYS:
+        violations.extend(day_results[day][3])  # C2
+
+    # C6: Meet at least MIN_PEOPLE of N_PEOPLE
+    if people_met < MIN_PEOPLE:
+        violations.append(Violation("C6", "few_people", values=(people_met,)))
+
+    for person, _ in _PREREQ_OF:
+        if c9[person] is not None:
+            violations.append(c9[person])
+
+    # C11: At least MIN_PER_DAY[day] meetings on every day (default: 4 on day 1, 3 on day 2)
+    for day in DAYS:
+        if per_day[day] < MIN_PER_DAY[day]:
+            violations.append(Violation("C11", "few_on_day", day=day, values=(per_day[day], MIN_PER_DAY[day])))
+
+    # ── Score ──
+    return EvalResult(_score(people_met, len(violations)), tuple(violations), people_met)
+
+
+def _score(people_met: int, violations: int) -> float:
+    """people_met/N_PEOPLE - VIOLATION_PENALTY per violation (floored at 0); 1.0 for everyone without violations."""
+    if people_met == 0:
+        return 0.0
+
+    coverage = people_met / N_PEOPLE
+    penalty = violations * VIOLATION_PENALTY
+    score = max(0.0, coverage - penalty)
+
+    if not violations and people_met == N_PEOPLE:
+        score = 1.0
+    return round(score, 3)
+
+
+# ── Incremental (delta) evaluation ──
+# A child that changes a few meetings of an already evaluated parent re-checks only
+# the changed meetings and re-sequences only the days whose usable meetings changed.
+# When every changed meeting keeps its person (shift / swap / day moves), C6 is the
+# parent's and C9 is re-checked only for the changed people and those who require
+# them; other diffs recompute the plan-level checks. The result is exactly
+# evaluate_plan()'s.
+
+@dataclass(frozen=True)
+class PlanEvaluation:
+    """evaluate_plan() result plus what a child's evaluate_delta() can reuse."""
+    result: EvalResult
+    meetings: tuple = ()                         # the plan's meeting dicts, in order
+    keys: tuple = ()                             # _meeting_key() of each meeting
+    checks: dict = field(default_factory=dict)   # meeting key -> (violations, record)
+    days: dict = field(default_factory=dict)     # day -> (keys in input order, sorted records, C3, C2)
+    entries: tuple = ()                          # per meeting: its own violations (PERSONA / C10 / C1 C4 C5 C7 / HORA)
+    records: tuple = ()                          # per meeting: its usable record, or None
+    owners: dict = field(default_factory=dict)   # person -> index of the meeting that counts for them
+    day_index: dict = field(default_factory=dict)      # day -> indices of its usable meetings, in input order
+    meeting_order: dict = field(default_factory=dict)  # person -> (day, start) of their usable meeting
+    c9: dict = field(default_factory=dict)       # person with a prerequisite -> C9 Violation or None
+
+
+@dataclass(frozen=True)
+class MeetingDiff:
+    """A child plan relative to its parent's meeting list: replaced positions, dropped positions, appended meetings."""
+    replaced: dict = field(default_factory=dict)  # index -> new meeting
+    removed: frozenset = frozenset()              # indices dropped
+    added: tuple = ()                             # meetings appended at the end
+
+    def apply(self, meetings) -> list:
+        out = [self.replaced.get(i, m) for i, m in enumerate(meetings) if i not in self.removed]
+        out.extend(self.added)
+        return out
+
+    def __bool__(self):
+        return bool(self.replaced or self.removed or self.added)
+
+
+def _meeting_key(m):
+    """Hashable identity of a meeting's evaluated fields (types included: day 1 and day True format differently)."""
+    if not isinstance(m, dict):
+        return None
+    values = (m.get("person", ""), m.get("day", 0), m.get("start", ""), m.get("end", ""))
+    key = values + tuple(type(v) for v in values)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def evaluate_detailed(plan) -> PlanEvaluation:
+    """evaluate_plan() that keeps its per-meeting and per-day results for evaluate_delta()."""
+    meetings, error = _plan_meetings(plan)
+    if error:
+        return PlanEvaluation(error)
+    return _evaluate_keyed(meetings, [_meeting_key(m) for m in meetings])
+
+
+def _evaluate_keyed(meetings: list, keys: list, parent: PlanEvaluation = None) -> PlanEvaluation:
+    result, detail = _evaluate_meetings(
+        meetings, keys, parent.checks if parent else None, parent.days if parent else None)
+    return PlanEvaluation(result, tuple(meetings), tuple(keys), **detail)
+
+
+def diff_meetings(parent: PlanEvaluation, child_plan) -> MeetingDiff:
+    """Position-wise MeetingDiff turning the parent's meetings into the child plan's (None if the child has no meeting list)."""
+    meetings, error = _plan_meetings(child_plan)
+    if error:
+        return None
+    n = min(len(parent.meetings), len(meetings))
+    replaced = {i: meetings[i] for i in range(n) if _meeting_key(meetings[i]) != parent.keys[i] or parent.keys[i] is None}
+    return MeetingDiff(replaced, frozenset(range(n, len(parent.meetings))), tuple(meetings[n:]))
+
+
+def evaluate_delta(parent: PlanEvaluation, diff: MeetingDiff) -> PlanEvaluation:
+    """Evaluate diff.apply(parent.meetings), reusing the parent's unchanged meeting checks and days."""
+    if not parent.meetings:
+        return evaluate_detailed(diff.apply([]))
+    if not diff:
+        return parent
+    if not diff.removed and not diff.added:
+        child = _evaluate_retimed(parent, diff.replaced)
+        if child is not None:
+            return child
+    keys = list(parent.keys)
+    for i, m in diff.replaced.items():
+        keys[i] = _meeting_key(m)
+    if diff.removed:
+        keys = [k for i, k in enumerate(keys) if i not in diff.removed]
+    keys.extend(_meeting_key(m) for m in diff.added)
+    meetings = diff.apply(parent.meetings)
+    if not meetings:
+        return PlanEvaluation(_EMPTY)
+    return _evaluate_keyed(meetings, keys, parent)
+
+
+def _evaluate_retimed(parent: PlanEvaluation, replaced: dict):
+    """
+    evaluate_delta() for replacements that keep each meeting's person (the one C10
+    counts) and change only its day / times: None when that does not hold. The
+    people met are the parent's, so only the touched days, the C9 of the changed
+    people and of those who require them, and C11 are redone.
+    """
+    entries, records, keys = list(parent.entries), list(parent.records), list(parent.keys)
+    checks = parent.checks
+    touched, changed = set(), []
+    for i, m in replaced.items():
+        key = _meeting_key(m)
+        if key is None or parent.owners.get(key[0]) != i:
+            return None
+        person = key[0]
+        checked = checks.get(key)
+        if checked is None:
+            checked = _check_meeting(m, person)
+            if checks is parent.checks:
+                checks = dict(checks)
+            checks[key] = checked
+        entries[i], records[i] = checked
+        keys[i] = key
+        if parent.records[i] is not None:
+            touched.add(parent.records[i]["day"])
+        if records[i] is not None:
+            touched.add(records[i]["day"])
+        changed.append(person)
+
+    days, day_index = dict(parent.days), dict(parent.day_index)
+    for day in filter(touched.__contains__, DAYS):  # DAYS' own values: a plan may write day 1 as True
+        idx = [j for j in parent.day_index[day] if j not in replaced]
+        idx.extend(i for i in replaced if records[i] is not None and records[i]["day"] == day)
+        idx.sort()
+        day_index[day] = tuple(idx)
+        order = tuple(keys[j] for j in idx)
+        if None in order or days[day][0] != order:
+            days[day] = _sequence_day(order, [records[j] for j in idx], day)
+
+    meeting_order, c9 = dict(parent.meeting_order), dict(parent.c9)
+    for person in changed:
+        record = records[parent.owners[person]]
+        if record is None:
+            meeting_order.pop(person, None)
+        else:
+            meeting_order[person] = (record["day"], record["start"])
+    for person in changed:
+        for p in ([person] if person in c9 else []) + _DEPENDENTS.get(person, []):
+            c9[p] = _prereq_violation(p, PARTICIPANTS[p]["prereq"], meeting_order)
+
+    violations = list(chain.from_iterable(entries))
+    result = _assemble(violations, days, parent.result.people_met, c9, {day: len(day_index[day]) for day in DAYS})
+    meetings = list(parent.meetings)
+    for i, m in replaced.items():
+        meetings[i] = m
+    return PlanEvaluation(result, tuple(meetings), tuple(keys), checks, days, tuple(entries), tuple(records), parent.owners,
+                          day_index, meeting_order, c9)
+
+
+def evaluate_child(parent: PlanEvaluation, child_plan) -> PlanEvaluation:
+    """evaluate_detailed(child_plan), incrementally from the parent when the child is a meeting list."""
+    diff = diff_meetings(parent, child_plan)
+    if diff is None or not parent.meetings:
+        return evaluate_detailed(child_plan)
+    return evaluate_delta(parent, diff)
+
+
+# ── Vectorized batch evaluation ──
+
+_PERSONS = list(PARTICIPANTS)
+_PERSON_IDX = {p: i for i, p in enumerate(_PERSONS)}
+_LOC_IDX = {loc: i for i, loc in enumerate(LOCATIONS)}
+_START_LOC = _LOC_IDX[START_LOCATION]
+
+_P_DAY = np.array([PARTICIPANTS[p]["day"] for p in _PERSONS])
+_P_AVAIL_START = np.array([PARTICIPANTS[p]["avail_start"] for p in _PERSONS])
+_P_AVAIL_END = np.array([PARTICIPANTS[p]["avail_end"] for p in _PERSONS])
+_P_DURATION = np.array([PARTICIPANTS[p]["duration"] for p in _PERSONS])
+_P_LOC = np.array([_LOC_IDX[PARTICIPANTS[p]["location"]] for p in _PERSONS])
+_PREREQS = [(_PERSON_IDX[p], _PERSON_IDX[info["prereq"]]) for p, info in PARTICIPANTS.items() if "prereq" in info]
+
+# N x N travel matrix indexed by location id (60 = get_travel_time fallback)
+TRAVEL_MATRIX = np.full((len(LOCATIONS), len(LOCATIONS)), 60, dtype=np.int64)
+for (_a, _b), _t in TRAVEL_TIMES.items():
+    TRAVEL_MATRIX[_LOC_IDX[_a], _LOC_IDX[_b]] = _t
+
+_parse_time_memo = lru_cache(maxsize=4096)(_parse_time)  # LLM plans reuse a small set of "HH:MM" strings
+_MAX_MINUTES = 10 ** 9  # larger times would overflow int64 arithmetic; scored by evaluate()
+
+
+class _Fallback(Exception):
+    """Plan needs the scalar evaluate() path (exotic input)."""
+
+
+def _parse_for_batch(plan, b, rows, raw_days):
+    """
+    First pass of evaluate_plan() for one parsed plan: same format, C10 and validity
+    checks. Appends valid meetings to `rows` as (plan, person, day, start, end) and
+    returns either a final EvalResult or (entries, people_met), where entries holds
+    Violations and row indices in input order.
+    """
+    meetings, error = _plan_meetings(plan)
+    if error:
+        return error, None
+
+    entries = []
+    new_rows = []
+    people_seen = set()
+    for m in meetings:
+        if not isinstance(m, dict):
+            raise _Fallback
+        person = m.get("person", "")
+        try:
+            known = person in PARTICIPANTS
+        except TypeError:
+            raise _Fallback
+        if not known:
+            entries.append(Violation("PERSONA", "unknown_person", person))
+            continue
         if person in people_seen:
-            violations.append(f"C10: {person} duplicado")
+            entries.append(Violation("C10", "duplicate", person))
             continue
         people_seen.add(person)
 
         day = m.get("day", 0)
-        start = _parse_time(m.get("start", ""))
-        end = _parse_time(m.get("end", ""))
-
+        start_raw, end_raw = m.get("start", ""), m.get("end", "")
+        if not isinstance(start_raw, str) or not isinstance(end_raw, str):
+            raise _Fallback
+        start = _parse_time_memo(start_raw)
+        end = _parse_time_memo(end_raw)
         if start < 0 or end < 0:
-            violations.append(f"Hora invalida para {person}")
+            entries.append(Violation("HORA", "bad_time", person))
             continue
-        if day not in (1, 2):
-            violations.append(f"C7: {person} dia {day} invalido (debe ser 1 o 2)")
+        if day not in DAYS:
+            entries.append(Violation("C7", "bad_day", person, day))
             continue
+        if start > _MAX_MINUTES or end > _MAX_MINUTES:
+            raise _Fallback
 
-        info = PARTICIPANTS[person]
-
-        # C7: Correct day
-        if info["day"] != 0 and info["day"] != day:
-            violations.append(f"C7: {person} debe ser dia {info['day']}, no dia {day}")
-
-        # C1: Within availability window
-        if start < info["avail_start"]:
-            violations.append(f"C1: {person} empieza {_time_str(start)}, disponible desde {_time_str(info['avail_start'])}")
-        if end > info["avail_end"]:
-            violations.append(f"C1: {person} termina {_time_str(end)}, disponible hasta {_time_str(info['avail_end'])}")
-
-        # C4: Duration
-        actual_dur = end - start
-        if actual_dur < info["duration"]:
-            violations.append(f"C4: {person} dura {actual_dur}min, necesita {info['duration']}min")
-
-        # C5: Day bounds
-        if start < DAY_START:
-            violations.append(f"C5: {person} antes de 08:00")
-        if end > DAY_END:
-            violations.append(f"C5: {person} despues de 20:00")
-
-        valid_meetings.append({
-            "person": person,
-            "day": day,
-            "start": start,
-            "end": end,
-            "location": info["location"],
-        })
-
-    # Split by day
-    day1 = sorted([m for m in valid_meetings if m["day"] == 1], key=lambda x: x["start"])
-    day2 = sorted([m for m in valid_meetings if m["day"] == 2], key=lambda x: x["start"])
-
-    # C3: No overlapping meetings (per day)
-    for day_meetings, day_label in [(day1, "D1"), (day2, "D2")]:
-        for i in range(len(day_meetings) - 1):
-            curr = day_meetings[i]
-            nxt = day_meetings[i + 1]
-            if curr["end"] > nxt["start"]:
-                violations.append(
-                    f"C3: {day_label} {curr['person']}({_time_str(curr['end'])}) solapa {nxt['person']}({_time_str(nxt['start'])})"
-                )
-
-    # C2: Travel time (per day)
-    # C8: Start from Cafe Central each day at 08:00
-    for day_meetings, day_label in [(day1, "D1"), (day2, "D2")]:
-        prev_loc = "Cafe Central"
-        prev_end = DAY_START
-        for m in day_meetings:
-            travel = get_travel_time(prev_loc, m["location"])
-            earliest = prev_end + travel
-            if m["start"] < earliest:
-                violations.append(
-                    f"C2: {day_label} llegas a {m['location']} a {_time_str(earliest)} "
-                    f"(travel {travel}min desde {prev_loc}), "
-                    f"pero {m['person']} empieza {_time_str(m['start'])}"
-                )
-            prev_loc = m["location"]
-            prev_end = m["end"]
-
-    # C6: Meet at least 7 of 10
-    people_met = len(people_seen)
-    if people_met < 7:
-        violations.append(f"C6: Solo {people_met} reuniones, minimo 7")
-
-    # C9: Prerequisites
-    meeting_order = {}
-    for m in day1 + day2:
-        meeting_order[m["person"]] = (m["day"], m["start"])
-
-    for person, info in PARTICIPANTS.items():
-        if "prereq" in info and person in meeting_order:
-            prereq = info["prereq"]
-            if prereq not in meeting_order:
-                violations.append(f"C9: {person} requiere {prereq}, pero {prereq} no programado")
-            else:
-                p_day, p_start = meeting_order[prereq]
-                m_day, m_start = meeting_order[person]
-                # prereq must be earlier (same day before, or earlier day)
-                if (p_day, p_start) >= (m_day, m_start):
-                    violations.append(f"C9: {person} requiere {prereq} antes, pero {prereq} es D{p_day}/{_time_str(p_start)}")
-
-    # C11: At least 4 meetings on day 1 AND at least 3 on day 2
-    d1_count = len([m for m in valid_meetings if m["day"] == 1])
-    d2_count = len([m for m in valid_meetings if m["day"] == 2])
-    if d1_count < 4:
-        violations.append(f"C11: Solo {d1_count} reuniones dia 1, minimo 4")
-    if d2_count < 3:
-        violations.append(f"C11: Solo {d2_count} reuniones dia 2, minimo 3")
-
-    # ── Score ──
-    if people_met == 0:
-        return 0.0, "Ninguna reunion valida"
+        entries.append(len(rows) + len(new_rows))
+        new_rows.append((b, _PERSON_IDX[person], int(day), start, end))
+        raw_days.append(day)
 
-    coverage = people_met / 10.0
-    penalty = len(violations) * 0.06
-    score = max(0.0, coverage - penalty)
+    rows.extend(new_rows)
+    return None, (entries, len(people_seen))
 
-    if not violations and people_met == 10:
-        score = 1.0
 
-    feedback = "; ".join(violations) if violations else f"Plan perfecto: {people_met} reuniones sin violaciones"
-    return round(score, 3), feedback
+def evaluate_batch(solutions: list[str]) -> list[EvalResult]:
+    """
+    Score a whole population at once. Plans are encoded as flat integer arrays
+    (plan, person, day, start, end) and C1-C11 are checked with NumPy across
+    every meeting of every plan. Returns exactly what evaluate() returns for
+    each solution, in order.
+    """
+    parsed = [parse_plan(sol) for sol in solutions]
+    valid = [i for i, (ok, _) in enumerate(parsed) if ok]
+    results = [INVALID_JSON] * len(solutions)
+    for i, result in zip(valid, evaluate_plans([parsed[i][1] for i in valid])):
+        results[i] = result
+    return results
+
+
+def evaluate_plans(plans: list) -> list[EvalResult]:
+    """evaluate_batch() for already-parsed plans."""
+    n = len(plans)
+    results = [None] * n
+    parsed = {}
+    rows, raw_days = [], []
+
+    for b, plan in enumerate(plans):
+        mark = len(rows), len(raw_days)
+        try:
+            final, info = _parse_for_batch(plan, b, rows, raw_days)
+        except _Fallback:
+            del rows[mark[0]:], raw_days[mark[1]:]
+            results[b] = evaluate_plan(plan)
+            continue
+        if final is not None:
+            results[b] = final
+        else:
+            parsed[b] = info
+
+    if not parsed:
+        return results
+
+    seq = {b: [] for b in parsed}  # C3 then C2 per plan
+    present = np.zeros((n, len(_PERSONS)), dtype=bool)
+    g_day = np.zeros((n, len(_PERSONS)), dtype=np.int64)
+    g_start = np.zeros((n, len(_PERSONS)), dtype=np.int64)
+    g_row = np.zeros((n, len(_PERSONS)), dtype=np.int64)
+    day_count = np.zeros((n, len(DAYS)), dtype=np.int64)
+    flags = flagged = None
+    if rows:
+        arr = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        plan, pidx, day, start, end = arr.T
+
+        # Per-meeting checks, in evaluate()'s order: C7, C1 start, C1 end, C4, C5 start, C5 end
+        p_day = _P_DAY[pidx]
+        flags = np.stack([
+            (p_day != 0) & (p_day != day),
+            start < _P_AVAIL_START[pidx],
+            end > _P_AVAIL_END[pidx],
+            (end - start) < _P_DURATION[pidx],
+            start < DAY_START,
+            end > DAY_END,
+        ], axis=1)
+        flagged = flags.any(axis=1)
+
+        # Sequence checks on meetings sorted by (plan, day, start); lexsort is stable,
+        # matching sorted() tie order.
+        order = np.lexsort((start, day, plan))
+        s_plan, s_day, s_start, s_end = plan[order], day[order], start[order], end[order]
+        s_pidx = pidx[order]
+        s_loc = _P_LOC[s_pidx]
+        same_next = (s_plan[:-1] == s_plan[1:]) & (s_day[:-1] == s_day[1:])
+
+        # C3: overlaps between consecutive meetings of the same day
+        overlaps = np.nonzero(same_next & (s_end[:-1] > s_start[1:]))[0]
+
+        # C2 / C8: travel from the previous meeting (or START_LOCATION at DAY_START)
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ~same_next
+        prev_loc = np.where(first, _START_LOC, np.roll(s_loc, 1))
+        prev_end = np.where(first, DAY_START, np.roll(s_end, 1))
+        travel = TRAVEL_MATRIX[prev_loc, s_loc]
+        earliest = prev_end + travel
+        late = np.nonzero(s_start < earliest)[0]
+
+        for i in overlaps:
+            a, c = i, i + 1
+            seq[int(s_plan[a])].append(Violation(
+                "C3", "overlap", _PERSONS[s_pidx[a]], int(s_day[a]),
+                (int(s_end[a]), _PERSONS[s_pidx[c]], int(s_start[c]))))
+        c2 = {}
+        for i in late:
+            c2.setdefault(int(s_plan[i]), []).append(Violation(
+                "C2", "travel", _PERSONS[s_pidx[i]], int(s_day[i]),
+                (LOCATIONS[s_loc[i]], int(earliest[i]), int(travel[i]), LOCATIONS[prev_loc[i]], int(s_start[i]))))
+        for b, found in c2.items():
+            seq[b].extend(found)
+
+        # C9 / C11 on a (plan x person) grid
+        present[plan, pidx] = True
+        g_day[plan, pidx] = day
+        g_start[plan, pidx] = start
+        g_row[plan, pidx] = np.arange(len(plan))
+        day_count = np.bincount(plan * len(DAYS) + day - 1, minlength=n * len(DAYS)).reshape(n, len(DAYS))
+
+    c9 = {}
+    for p, q in _PREREQS:
+        has = present[:, p]
+        missing = has & ~present[:, q]
+        later = (g_day[:, q] > g_day[:, p]) | ((g_day[:, q] == g_day[:, p]) & (g_start[:, q] >= g_start[:, p]))
+        bad = has & present[:, q] & later
+        for b in np.nonzero(missing | bad)[0]:
+            b = int(b)
+            if missing[b]:
+                v = Violation("C9", "prereq_missing", _PERSONS[p], values=(_PERSONS[q],))
+            else:
+                v = Violation("C9", "prereq_late", _PERSONS[p], raw_days[g_row[b, q]], (_PERSONS[q], int(g_start[b, q])))
+            c9.setdefault(b, []).append(v)
+
+    for b, (entries, people_met) in parsed.items():
+        violations = []
+        for e in entries:
+            if isinstance(e, Violation):
+                violations.append(e)
+            elif flagged[e]:
+                violations.extend(_meeting_violations(flags[e], rows[e], raw_days[e]))
+        violations += seq[b]
+        if people_met < MIN_PEOPLE:
+            violations.append(Violation("C6", "few_people", values=(people_met,)))
+        violations += c9.get(b, [])
+        for d, day in enumerate(DAYS):
+            if day_count[b, d] < MIN_PER_DAY[day]:
+                violations.append(Violation("C11", "few_on_day", day=day, values=(int(day_count[b, d]), MIN_PER_DAY[day])))
+        results[b] = EvalResult(_score(people_met, len(violations)), tuple(violations), people_met)
+
+    return results
+
+
+def _meeting_violations(row_flags, row, raw_day):
+    _, p, _, start, end = row
+    person = _PERSONS[p]
+    info = PARTICIPANTS[person]
+    out = []
+    if row_flags[0]:
+        out.append(Violation("C7", "wrong_day", person, raw_day, (info["day"],)))
+    if row_flags[1]:
+        out.append(Violation("C1", "early", person, raw_day, (start, info["avail_start"])))
+    if row_flags[2]:
+        out.append(Violation("C1", "late", person, raw_day, (end, info["avail_end"])))
+    if row_flags[3]:
+        out.append(Violation("C4", "short", person, raw_day, (end - start, info["duration"])))
+    if row_flags[4]:
+        out.append(Violation("C5", "before_day", person, raw_day))
+    if row_flags[5]:
+        out.append(Violation("C5", "after_day", person, raw_day))
+    return out
+
+
+# ── Fitness memoization ──
+
+def canonicalize_plan(solution_json: str) -> str:
+    """
+    Canonical cache key for a plan: compact sorted-key JSON of its meeting list,
+    with meetings sorted. Plans that repeat a person keep their original order,
+    since C10 keeps whichever duplicate comes first, and so do plans with two
+    meetings at the same (day, start): each day is a stable sort on start time,
+    so their order decides the C2 / C3 results. Unparseable text is keyed on
+    its stripped form.
+    """
+    ok, plan = parse_plan(solution_json)
+    if not ok:
+        return solution_json.strip() if isinstance(solution_json, str) else repr(solution_json)
+    return plan_key(plan)
+
+
+def plan_key(plan) -> str:
+    """canonicalize_plan() for an already-parsed plan."""
+    meetings = plan.get("meetings") if isinstance(plan, dict) else plan
+    if isinstance(meetings, list) and meetings and all(isinstance(m, dict) for m in meetings):
+        try:
+            persons = [m.get("person", "") for m in meetings]
+            slots = [(m.get("day", 0), _parse_time(m["start"]) if isinstance(m.get("start"), str) else m.get("start"))
+                     for m in meetings]
+            if len(set(persons)) == len(persons) and len(set(slots)) == len(slots):
+                meetings = sorted(meetings, key=lambda m: json.dumps(m, sort_keys=True))
+        except TypeError:
+            pass
+        return json.dumps({"meetings": meetings}, sort_keys=True, separators=(",", ":"))
+    return json.dumps(plan, sort_keys=True, separators=(",", ":"))
+
+
+class FitnessCache:
+    """Bounded LRU of canonical plan -> EvalResult, with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def evaluate(self, solution_json: str) -> EvalResult:
+        key = canonicalize_plan(solution_json)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        result = evaluate(solution_json)
+        with self._lock:
+            self._data[key] = result
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return result
+
+    def evaluate_many(self, solutions: list[str]) -> list[EvalResult]:
+        """Cached lookups for a population; all misses are scored in one evaluate_batch call."""
+        return self._lookup_many([canonicalize_plan(sol) for sol in solutions], solutions, evaluate_batch)
+
+    def evaluate_plans(self, plans: list) -> list[EvalResult]:
+        """evaluate_many() for already-parsed plans (misses go through evaluate_plans)."""
+        return self._lookup_many([plan_key(plan) for plan in plans], plans, evaluate_plans)
+
+    def _lookup_many(self, keys, items, score_batch):
+        results = [None] * len(items)
+        pending = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    results[i] = self._data[key]
+                elif key in pending:
+                    self.hits += 1
+                    pending[key].append(i)
+                else:
+                    self.misses += 1
+                    pending[key] = [i]
+        if pending:
+            firsts = [idxs[0] for idxs in pending.values()]
+            scored = score_batch([items[i] for i in firsts])
+            with self._lock:
+                for (key, idxs), result in zip(pending.items(), scored):
+                    for i in idxs:
+                        results[i] = result
+                    self._data[key] = result
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+FITNESS_CACHE = FitnessCache()
+
+
+def evaluate_many_cached(solutions: list[str]) -> list[EvalResult]:
+    """Memoized evaluate_batch() over a population."""
+    return FITNESS_CACHE.evaluate_many(solutions)
+
+
+def evaluate_plans_cached(plans: list) -> list[EvalResult]:
+    """Memoized evaluate_plans() over already-parsed plans."""
+    return FITNESS_CACHE.evaluate_plans(plans)
+
+
+def evaluate_cached(solution_json: str) -> EvalResult:
+    """
+    Memoized evaluate(). Plans that differ only in meeting order (where the
+    order cannot change the result, see canonicalize_plan) or JSON formatting
+    share one entry: same score, same violations (the feedback may list
+    per-meeting violations in the order first seen).
+    """
+    return FITNESS_CACHE.evaluate(solution_json)
@@ -1,15 +1,19 @@
 """
 LangGraph StateGraph definition for the Mind Evolution pipeline.
-Topology: init → eval → [evolve ↔ eval loop] → migrate → eval → select_best
+Topology: init → eval → [(local_search →) evolve ↔ eval loop] → migrate → eval → select_best
 """
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
 from state import MindEvolutionState
+from instrumentation import instrument_node
+from run_config import get_run_config
 from nodes import (
     init_node,
     eval_node,
     evolution_node,
+    local_search_node,
     migration_node,
     select_best_node,
 )
@@ -18,33 +22,57 @@ from nodes import (
 def should_evolve_or_migrate(state: MindEvolutionState) -> str:
     """
     Conditional edge after evaluation:
+    - If eval_node (or local_search) recorded a stop_reason (target reached,
+      stagnation, LLM-call or wall-clock budget) → migrate
     - If generation < max_generations → evolve
     - Else → migrate (final phase)
     """
+    if state.get("stop_reason"):
+        return "migrate"
     if state["generation"] < state["max_generations"]:
         return "evolve"
     return "migrate"
 
 
-def build_graph():
-    """Build and compile the Mind Evolution LangGraph pipeline."""
+def after_evaluate(state: MindEvolutionState, config: RunnableConfig) -> str:
+    """should_evolve_or_migrate(), with a local search step before evolving when the run enables it."""
+    route = should_evolve_or_migrate(state)
+    if route == "evolve" and get_run_config(config).local_search:
+        return "local_search"
+    return route
+
+
+def build_graph(checkpointer=None):
+    """Build and compile the Mind Evolution LangGraph pipeline (optionally checkpointed after every node)."""
     graph = StateGraph(MindEvolutionState)
 
     # --- Add Nodes ---
-    graph.add_node("init", init_node)
-    graph.add_node("evaluate", eval_node)
-    graph.add_node("evolve", evolution_node)
-    graph.add_node("migrate", migration_node)
-    graph.add_node("select_best", select_best_node)
+    graph.add_node("init", instrument_node("init", init_node))
+    graph.add_node("evaluate", instrument_node("evaluate", eval_node))
+    graph.add_node("evolve", instrument_node("evolve", evolution_node))
+    graph.add_node("local_search", instrument_node("local_search", local_search_node))
+    graph.add_node("migrate", instrument_node("migrate", migration_node))
+    graph.add_node("select_best", instrument_node("select_best", select_best_node))
 
     # --- Add Edges ---
     # START → init → evaluate
     graph.add_edge(START, "init")
     graph.add_edge("init", "evaluate")
 
-    # evaluate → (evolve OR migrate) based on generation count
+    # evaluate → (evolve OR migrate) based on generation count, via local_search if enabled
     graph.add_conditional_edges(
         "evaluate",
+        after_evaluate,
+        {
+            "local_search": "local_search",
+            "evolve": "evolve",
+            "migrate": "migrate",
+        }
+    )
+
+    # local_search → evolve (or migrate once it reached the target)
+    graph.add_conditional_edges(
+        "local_search",
         should_evolve_or_migrate,
         {
             "evolve": "evolve",
@@ -59,4 +87,4 @@ def build_graph():
     graph.add_edge("migrate", "select_best")
     graph.add_edge("select_best", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
@@ -0,0 +1,236 @@
+"""
+Per-call and per-node performance instrumentation for Mind Evolution v4.
+
+Every LLM call records latency, prompt/completion tokens, estimated cost,
+retries and cache hits, tagged with node / island / generation / prompt type
+(tags travel through contextvars, so concurrent asyncio tasks keep their own).
+Every graph node records its wall time. Events are appended to perf.csv (or
+<run dir>/perf.csv when the run's RunConfig has an output_dir) and summarized
+in an end-of-run table.
+"""
+
+import atexit
+import contextvars
+import csv
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from run_config import get_run_config
+
+PERF_FILE = os.path.join(os.path.dirname(__file__), "perf.csv")
+
+# USD per 1M tokens: (input, cached input, output). Other models (e.g. the mock) have no cost: "" in perf.csv, n/a in the summary
+PRICES = {
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 30]  # seconds; last bucket is open-ended
+
+_HEADERS = [
+    "timestamp", "run_id", "kind", "node", "island", "generation", "prompt_type",
+    "latency_s", "prompt_tokens", "completion_tokens", "cost_usd", "retries", "cache_hit",
+]
+
+_tags = contextvars.ContextVar("perf_tags", default={})
+_events = []        # all events of the runs in this process (for the summary)
+_pending = []       # (perf file, event) not written yet
+_lock = threading.Lock()
+_run_id = "default"
+
+
+def init(run_id: str = "default"):
+    global _run_id
+    _run_id = run_id
+    with _lock:
+        _events[:] = [e for e in _events if e["run_id"] != run_id]
+
+
+@contextmanager
+def tags(**kw):
+    """Attach tags (node, island, generation, prompt_type) to events recorded inside the block."""
+    token = _tags.set({**_tags.get(), **kw})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+def set_tags(**kw):
+    """Like tags(), for the rest of the current task/context (e.g. inside an asyncio task)."""
+    _tags.set({**_tags.get(), **kw})
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float | None:
+    """USD for one call, or None for a model without a price."""
+    if model not in PRICES:
+        return None
+    price_in, price_cached, price_out = PRICES[model]
+    fresh = max(0, prompt_tokens - cached_tokens)
+    return (fresh * price_in + cached_tokens * price_cached + completion_tokens * price_out) / 1e6
+
+
+def _record(kind: str, **fields):
+    t = _tags.get()
+    event = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "run_id": t.get("run_id", _run_id),
+        "kind": kind,
+        "node": t.get("node", ""),
+        "island": t.get("island", ""),
+        "generation": t.get("generation", ""),
+        "prompt_type": t.get("prompt_type", ""),
+        "latency_s": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+        "cost_usd": 0.0, "retries": 0, "cache_hit": False,
+    }
+    event.update(fields)
+    with _lock:
+        _events.append(event)
+        _pending.append((t.get("perf_file") or PERF_FILE, event))
+
+
+def record_llm_call(model: str, latency: float, prompt_tokens: int, completion_tokens: int,
+                    retries: int = 0, cache_hit: bool = False, cached_tokens: int = 0, **extra_tags):
+    cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+    if cache_hit and cost is not None:
+        cost = 0.0
+    with tags(**extra_tags):
+        _record(
+            "llm",
+            latency_s=round(latency, 4),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd="" if cost is None else round(cost, 8),
+            retries=retries,
+            cache_hit=cache_hit,
+        )
+
+
+def usage_tokens(response, prompt: str, text: str) -> tuple[int, int, int]:
+    """(prompt, completion, cached prompt) tokens from usage metadata, or a chars/4 estimate."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage:
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0), cached
+    return len(prompt) // 4, len(text) // 4, 0
+
+
+def instrument_node(name: str, fn):
+    """Wrap a graph node: tag everything inside with the run, node name + generation, and time it."""
+    takes_config = len(inspect.signature(fn).parameters) > 1
+
+    @wraps(fn)
+    def wrapper(state, config):
+        cfg = get_run_config(config)
+        run_dir = cfg.run_dir()
+        perf_file = os.path.join(run_dir, "perf.csv") if run_dir else ""
+        with tags(run_id=cfg.run_id, perf_file=perf_file, node=name, generation=state.get("generation", ""),
+                  island="", prompt_type=""):
+            t0 = time.perf_counter()
+            try:
+                return fn(state, config) if takes_config else fn(state)
+            finally:
+                _record("node", latency_s=round(time.perf_counter() - t0, 4))
+    wrapper.__signature__ = inspect.signature(wrapper, follow_wrapped=False)  # LangGraph must see `config`
+    return wrapper
+
+
+def take_pending() -> list:
+    """Unwritten (perf file, event) pairs, removed from this process (to hand them to another one)."""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, []
+    return pending
+
+
+def add_pending(pending: list):
+    """Adopt events recorded by another process: flush() writes them and summary() counts them."""
+    with _lock:
+        _pending.extend(pending)
+        _events.extend(event for _, event in pending)
+
+
+def flush():
+    global _pending
+    with _lock:
+        pending, _pending = _pending, []
+    by_file = {}
+    for path, event in pending:
+        by_file.setdefault(path, []).append(event)
+    for path, rows in by_file.items():
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=_HEADERS)
+            if new_file:
+                w.writeheader()
+            w.writerows(rows)
+
+
+atexit.register(flush)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _histogram(values: list[float]) -> str:
+    counts = [0] * (len(LATENCY_BUCKETS) + 1)
+    for v in values:
+        i = 0
+        while i < len(LATENCY_BUCKETS) and v > LATENCY_BUCKETS[i]:
+            i += 1
+        counts[i] += 1
+    return " ".join(str(c) for c in counts)
+
+
+def _cost(costs: list) -> str:
+    """Summed cost column; n/a when no call had a priced model."""
+    priced = [c for c in costs if c != ""]
+    return f"{sum(priced):>10.4f}" if priced else f"{'n/a':>10}"
+
+
+def summary(run_id: str = None) -> str:
+    """End-of-run table: node wall time, then LLM calls grouped by prompt type (one run, or all)."""
+    with _lock:
+        events = [e for e in _events if run_id is None or e["run_id"] == run_id]
+    lines = []
+
+    nodes = {}
+    for e in events:
+        if e["kind"] == "node":
+            nodes.setdefault(e["node"], []).append(e["latency_s"])
+    lines.append(f"{'node':<12}{'runs':>6}{'total s':>10}{'mean s':>10}{'max s':>10}")
+    for name, lat in nodes.items():
+        lines.append(f"{name:<12}{len(lat):>6}{sum(lat):>10.2f}{sum(lat) / len(lat):>10.2f}{max(lat):>10.2f}")
+
+    calls = {}
+    for e in events:
+        if e["kind"] == "llm":
+            calls.setdefault(e["prompt_type"] or "other", []).append(e)
+    bucket_labels = " ".join(f"<={b}" for b in LATENCY_BUCKETS) + " >"
+    lines.append("")
+    lines.append(f"{'prompt':<12}{'calls':>6}{'cache':>6}{'retry':>6}{'p50 s':>8}{'p95 s':>8}"
+                 f"{'tok in':>9}{'tok out':>9}{'cost $':>10}  latency histogram ({bucket_labels})")
+    totals, all_costs = [0, 0, 0, 0, 0], []
+    for ptype, evs in calls.items():
+        lat = [e["latency_s"] for e in evs if not e["cache_hit"]]
+        row = [
+            len(evs), sum(e["cache_hit"] for e in evs), sum(e["retries"] for e in evs),
+            sum(e["prompt_tokens"] for e in evs), sum(e["completion_tokens"] for e in evs),
+        ]
+        costs = [e["cost_usd"] for e in evs]
+        totals = [a + b for a, b in zip(totals, row)]
+        all_costs += costs
+        lines.append(f"{ptype:<12}{row[0]:>6}{row[1]:>6}{row[2]:>6}{_percentile(lat, 0.5):>8.2f}{_percentile(lat, 0.95):>8.2f}"
+                     f"{row[3]:>9}{row[4]:>9}{_cost(costs)}  {_histogram(lat)}")
+    lines.append(f"{'TOTAL':<12}{totals[0]:>6}{totals[1]:>6}{totals[2]:>6}{'':>8}{'':>8}"
+                 f"{totals[3]:>9}{totals[4]:>9}{_cost(all_costs)}")
+    return "\n".join(lines)
@@ -0,0 +1,265 @@
+"""
+Asynchronous island model for Mind Evolution v4 (main.py --async-islands).
+
+The graph moves every island in lock-step: each generation waits at the
+evaluate barrier for the slowest island (e.g. one stuck in rate-limit
+backoff), and migration happens once, at the end. Here every island is its own
+worker process that seeds, evolves and scores at its own pace. Every
+`migration_interval` of its generations it sends its best `migration_size`
+individuals to the broker (this process), and before each generation it takes
+whatever migrants are waiting in its inbox, replacing its worst individuals.
+
+The broker routes elites by topology:
+  ring    island i -> i+1 (the last one -> island 1)
+  star    island 1 is the hub: leaves send to it, it sends to every leaf
+  random  one other island picked at random for each migration
+
+It also logs every island generation to the metrics file, tracks the global
+best / LLM calls and stops all islands (shared event) once the target score,
+the LLM-call budget or the time budget is reached. All islands share one LLM
+concurrency budget (cross-process semaphore) and split LLM_RPM / LLM_TPM.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import random
+import time
+import traceback
+from dataclasses import replace
+
+from run_config import RunConfig
+
+TOPOLOGIES = ("ring", "star", "random")
+POLL_SECONDS = 0.5
+
+
+def destinations(topology: str, source: int, n: int, rng: random.Random) -> list[int]:
+    """Islands that receive the elites of island `source` (1-based, n islands)."""
+    if n < 2:
+        return []
+    if topology == "ring":
+        return [source % n + 1]
+    if topology == "star":
+        return [1] if source != 1 else list(range(2, n + 1))
+    if topology == "random":
+        return [rng.choice([i for i in range(1, n + 1) if i != source])]
+    raise ValueError(f"unknown migration topology: {topology}")
+
+
+# ── Island worker (child process) ──
+
+def _take_migrants(inbox) -> list:
+    migrants = []
+    while True:
+        try:
+            migrants.extend(inbox.get_nowait())
+        except queue.Empty:
+            return migrants
+
+
+def _admit(island: list, migrants: list) -> list:
+    """Replace the worst individuals with the migrants (best first, at most half the island)."""
+    from state import new_uid
+    island = list(island)
+    migrants = sorted(migrants, key=lambda m: m.score, reverse=True)[:len(island) // 2]
+    worst = sorted(range(len(island)), key=lambda i: island[i].score)
+    for idx, m in zip(worst, migrants):
+        island[idx] = replace(m, origin="migrant", parents=(m.uid,), uid=new_uid())
+    return island
+
+
+async def _evolve_alone(cfg: RunConfig, island_num: int, inbox, outbox, stop) -> dict:
+    from instrumentation import set_tags
+    from local_search import improve_islands
+    from nodes import PLAN_COUNTERS, _add_counts, _evolve_island, _score_individuals, _seed_slot
+    from state import Individual
+
+    run_dir = cfg.run_dir()
+    set_tags(run_id=cfg.run_id, perf_file=os.path.join(run_dir, "perf.csv") if run_dir else "", node="island",
+             island=island_num, generation=0, prompt_type="")
+    semaphore = asyncio.Semaphore(cfg.llm_concurrency)
+
+    seeds = await asyncio.gather(*(_seed_slot(cfg, island_num, i, semaphore) for i in range(cfg.pop_size)))
+    island = _score_individuals([Individual.from_text(text, origin="init", born=0) for text, _, _ in seeds])
+    calls, stats = 0, {"repair_attempts": 0, "repair_successes": 0, "local_search_evals": 0, "local_search_improved": 0,
+                       **dict.fromkeys(PLAN_COUNTERS, 0)}
+    for _, slot_calls, slot_counts in seeds:
+        calls += slot_calls
+        _add_counts(stats, slot_counts)
+    outbox.put(("progress", island_num, 0, island, calls))
+
+    generation, best, stale, reason = 0, max(ind.score for ind in island), 0, "max_generations"
+    while generation < cfg.max_generations:
+        if stop.is_set():
+            reason = "stopped"
+            break
+        migrants = _take_migrants(inbox)
+        if migrants:
+            island = _admit(island, migrants)
+        if cfg.local_search:  # in-process: island workers are daemonic and cannot start a pool
+            (island,), ls = improve_islands(cfg, [island], generation)
+            stats["local_search_evals"] += ls["evaluations"]
+            stats["local_search_improved"] += ls["improved"]
+
+        set_tags(generation=generation)
+        _, island, gen_calls, gen_stats = await _evolve_island(cfg, island, island_num, generation, semaphore)
+        island = _score_individuals(island)
+        generation += 1
+        calls += gen_calls
+        _add_counts(stats, gen_stats)
+
+        if generation % cfg.migration_interval == 0:
+            elites = sorted(island, key=lambda ind: ind.score, reverse=True)[:cfg.migration_size]
+            outbox.put(("migrants", island_num, generation, elites))
+        outbox.put(("progress", island_num, generation, island, calls))
+
+        island_best = max(ind.score for ind in island)
+        stale = 0 if island_best > best else stale + 1
+        best = max(best, island_best)
+        if cfg.stagnation_limit is not None and stale >= cfg.stagnation_limit:
+            reason = "stagnation"
+            break
+    return {"island": island, "generation": generation, "calls": calls, "stats": stats, "stop_reason": reason}
+
+
+def _island_main(cfg_dict: dict, island_num: int, islands: int, inbox, outbox, stop, slots):
+    """Worker process entry point: evolve one island, then report its final population and perf events."""
+    import instrumentation
+    import nodes
+    import rate_limiter
+    from llm_cache import get_cache
+    nodes.set_global_slots(slots)
+    rate_limiter.share_limits(islands)
+    # Every island starts with fresh sample ordinals; without a scope an unseeded OpenAI run
+    # would replay (and in record mode overwrite) the same samples on every island.
+    get_cache().set_scope(f"island{island_num}")
+
+    cfg = RunConfig.from_dict(cfg_dict)
+    # Separate processes don't share the mock's per-prompt counters: give each island its own seed.
+    # An unseeded OpenAI run stays unseeded (the seed would be sent as OpenAI's best-effort seed).
+    if cfg.seed is not None:
+        cfg = replace(cfg, seed=cfg.seed * 1000 + island_num)
+    elif cfg.backend != "openai":
+        cfg = replace(cfg, seed=island_num)
+    try:
+        result = asyncio.run(_evolve_alone(cfg, island_num, inbox, outbox, stop))
+        outbox.put(("done", island_num, result, instrumentation.take_pending()))
+    except BaseException as e:
+        outbox.put(("error", island_num, "".join(traceback.format_exception(e)), instrumentation.take_pending()))
+
+
+# ── Broker (parent process) ──
+
+def run_async_islands(cfg: RunConfig) -> dict:
+    """Run cfg.islands island processes to completion; returns a final state like the graph's."""
+    import instrumentation
+    from metrics import log_row
+
+    if cfg.migration_topology not in TOPOLOGIES:
+        raise ValueError(f"unknown migration topology: {cfg.migration_topology}")
+    n = cfg.islands
+    ctx = multiprocessing.get_context("spawn")
+    outbox = ctx.Queue()
+    inboxes = {i: ctx.Queue() for i in range(1, n + 1)}
+    stop = ctx.Event()
+    slots = ctx.BoundedSemaphore(cfg.llm_concurrency)
+    rng = random.Random(cfg.seed)
+
+    procs = {i: ctx.Process(target=_island_main, name=f"island-{i}", daemon=True,
+                            args=(cfg.to_dict(), i, n, inboxes[i], outbox, stop, slots))
+             for i in range(1, n + 1)}
+    started = time.time()
+    for p in procs.values():
+        p.start()
+
+    calls = dict.fromkeys(procs, 0)
+    generations = dict.fromkeys(procs, 0)
+    finals, errors = {}, {}
+    best_score, best_solution, calls_to_target, stop_reason = 0.0, "", None, ""
+    migrations = 0
+
+    def halt(reason: str):
+        nonlocal stop_reason
+        if not stop.is_set():
+            stop_reason = reason
+            print(f"  [stop] {reason} (all islands)")
+            stop.set()
+
+    while len(finals) + len(errors) < n:
+        try:
+            msg = outbox.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            for i, p in procs.items():  # a worker killed without reporting
+                if i not in finals and i not in errors and not p.is_alive() and outbox.empty():
+                    errors[i] = f"exit code {p.exitcode}"
+                    print(f"  [island {i}] died ({errors[i]})")
+            msg = None
+        if cfg.max_wall_seconds is not None and time.time() - started >= cfg.max_wall_seconds:
+            halt("time_budget")
+        if msg is None:
+            continue
+
+        kind, island_num = msg[0], msg[1]
+        if kind == "progress":
+            _, _, generation, island, island_calls = msg
+            calls[island_num], generations[island_num] = island_calls, generation
+            total = sum(calls.values())
+            best = max(island, key=lambda ind: ind.score)
+            if best.score > best_score:
+                best_score, best_solution = best.score, best.text
+            print(f"  [island {island_num}] Gen {generation} | {[f'{ind.score:.2f}' for ind in island]} | "
+                  f"Best:{best_score:.2f} | calls:{total}")
+            for i, ind in enumerate(island):
+                log_row(generation, island_num, i, ind.score, ind.violations, total, "eval",
+                        run_id=cfg.run_id, run_dir=cfg.run_dir(), counts=ind.violation_counts)
+            if cfg.target_score is not None and best_score >= cfg.target_score:
+                calls_to_target = total if calls_to_target is None else calls_to_target
+                halt("target_score")
+            if cfg.max_llm_calls is not None and total >= cfg.max_llm_calls:
+                halt("llm_budget")
+        elif kind == "migrants":
+            _, _, generation, elites = msg
+            for dest in destinations(cfg.migration_topology, island_num, n, rng):
+                if dest not in finals and dest not in errors:
+                    inboxes[dest].put(elites)
+                    migrations += 1
+        elif kind == "done":
+            finals[island_num] = msg[2]
+            instrumentation.add_pending(msg[3])
+        elif kind == "error":
+            errors[island_num] = msg[2]
+            instrumentation.add_pending(msg[3])
+            print(f"  [island {island_num}] failed:\n{msg[2]}")
+
+    for p in procs.values():
+        p.join(timeout=10)
+    if not finals:
+        raise RuntimeError(f"all {n} islands failed")
+
+    stats = {}
+    for final in finals.values():
+        for k, v in final["stats"].items():
+            stats[k] = stats.get(k, 0) + v
+    if not stop_reason:
+        reasons = {final["stop_reason"] for final in finals.values()}
+        stop_reason = "stagnation" if reasons == {"stagnation"} else "max_generations"
+    print(f"  [migrate] {migrations} migrations ({cfg.migration_topology}, every {cfg.migration_interval} gens)")
+
+    result = {
+        **stats,
+        "islands": [finals[i]["island"] for i in sorted(finals)],
+        "generation": max(generations.values()),
+        "max_generations": cfg.max_generations,
+        "llm_call_count": sum(calls.values()),
+        "llm_calls_saved": 2 * stats.get("repair_successes", 0),
+        "target_score": cfg.target_score,
+        "started_at": started,
+        "stop_reason": stop_reason,
+        "best_solution": best_solution,
+        "best_score": best_score,
+    }
+    if calls_to_target is not None:
+        result["calls_to_target"] = calls_to_target
+    return result
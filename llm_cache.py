@@ -0,0 +1,146 @@
+"""
+Persistent content-addressed LLM response cache (sqlite).
+
+Modes (env LLM_CACHE_MODE):
+  off          - no caching (default)
+  record       - always call the LLM, store every response
+  replay       - never call the LLM; a miss raises CacheMiss (offline, deterministic)
+  read-through - serve hits from disk, call + store on miss
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), "llm_cache.sqlite")
+MODES = ("off", "record", "replay", "read-through")
+
+
+class CacheMiss(RuntimeError):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+
+class LLMCache:
+    def __init__(self, path: str = CACHE_FILE, mode: str = "off", max_bytes: int = 200 * 1024 * 1024):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode '{mode}', expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Identical requests within a run (e.g. INIT_PROMPT at the same temperature
+        # for every island) are distinct samples, so each gets its own ordinal.
+        self._ordinals = {}
+        # Processes sampling the same prompts independently (async islands) each get their
+        # own scope, so they neither share samples nor overwrite each other's recordings.
+        self.scope = ""
+        self._conn = None
+        self._total_bytes = 0
+        if mode != "off":
+            self._open()
+
+    def _open(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, temperature REAL, max_tokens INTEGER,"
+            " response TEXT, size INTEGER, created REAL, last_used REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON responses(last_used)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def reset_ordinals(self):
+        """Start a new run: the next request for each prompt maps to sample 0 again."""
+        with self._lock:
+            self._ordinals.clear()
+
+    def ordinals(self) -> dict:
+        """Snapshot of the per-prompt sample counters, for checkpoints (empty when caching is off)."""
+        if self.mode == "off":
+            return {}
+        with self._lock:
+            return dict(self._ordinals)
+
+    def set_ordinals(self, ordinals: dict):
+        """Continue a run from a checkpointed snapshot: resumed prompts get the samples they had."""
+        with self._lock:
+            self._ordinals = dict(ordinals)
+
+    def set_scope(self, scope: str):
+        """Key this process's requests apart from other processes of the same run ("" = unscoped)."""
+        self.scope = scope
+
+    def make_key(self, model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        base = f"{model}|{temperature}|{max_tokens}|{prompt_hash}"
+        if self.scope:
+            base += f"|{self.scope}"
+        with self._lock:
+            ordinal = self._ordinals.get(base, 0)
+            self._ordinals[base] = ordinal + 1
+        return hashlib.sha256(f"{base}|{ordinal}".encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str):
+        """Return the cached response, or None if the LLM should be called."""
+        if self.mode in ("off", "record"):
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+        if self.mode == "replay":
+            raise CacheMiss(f"No recorded LLM response for key {key[:12]} (replay mode)")
+        return None
+
+    def store(self, key: str, model: str, temperature: float, max_tokens: int, response: str):
+        if self.mode not in ("record", "read-through"):
+            return
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, temperature, max_tokens, response, size, now, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+
+# ── Cache singleton ──
+_cache = None
+
+
+def get_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        _cache = LLMCache(
+            path=os.environ.get("LLM_CACHE_PATH", CACHE_FILE),
+            mode=os.environ.get("LLM_CACHE_MODE", "off"),
+            max_bytes=int(float(os.environ.get("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024),
+        )
+    return _cache
@@ -0,0 +1,196 @@
+"""
+Memetic local search (NO LLM).
+Between LLM generations, each island's best individuals are hill-climbed with
+cheap mutation operators: shift a meeting's times, swap two meetings of a day,
+move a flexible participant (day 0, e.g. Elena) to the next day, drop a
+meeting, or insert a missing participant. Every candidate differs from the
+current plan in one or two meetings, so it is scored with evaluate_delta().
+Climbs run in a pool of worker processes; a climb that ends above its
+starting score replaces its individual in the island.
+"""
+
+import atexit
+import json
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from evaluator import PARTICIPANTS, DAYS, DAY_START, MeetingDiff, _parse_time, _time_str, evaluate_delta, evaluate_detailed
+
+SHIFTS = (-30, -15, -10, -5, 5, 10, 15, 30)  # minutes a time is moved by
+
+_pools = {}  # worker count -> ProcessPoolExecutor
+
+
+# ── Mutation operators ──
+# Each takes the current meeting tuple and returns a MeetingDiff, or None when it does not apply.
+
+def _times(m):
+    start, end = m.get("start"), m.get("end")
+    if not isinstance(start, str) or not isinstance(end, str):
+        return -1, -1
+    return _parse_time(start), _parse_time(end)
+
+
+def _shift(meetings, rng):
+    """Move one meeting's start, end, or both (keeping its length)."""
+    i = rng.randrange(len(meetings))
+    start, end = _times(meetings[i])
+    if start < 0 or end < 0:
+        return None
+    d = rng.choice(SHIFTS)
+    which = rng.randrange(3)
+    if which != 1:
+        start += d
+    if which != 0:
+        end += d
+    if start < 0 or end <= start:
+        return None
+    return MeetingDiff(replaced={i: dict(meetings[i], start=_time_str(start), end=_time_str(end))})
+
+
+def _swap(meetings, rng):
+    """Exchange the slots of two meetings of the same day (each keeps its length)."""
+    i, j = rng.randrange(len(meetings)), rng.randrange(len(meetings))
+    a, b = meetings[i], meetings[j]
+    if i == j or a.get("day") != b.get("day"):
+        return None
+    (a_start, a_end), (b_start, b_end) = _times(a), _times(b)
+    if min(a_start, a_end, b_start, b_end) < 0:
+        return None
+    return MeetingDiff(replaced={
+        i: dict(a, start=_time_str(b_start), end=_time_str(b_start + a_end - a_start)),
+        j: dict(b, start=_time_str(a_start), end=_time_str(a_start + b_end - b_start)),
+    })
+
+
+def _move_day(meetings, rng):
+    """Move a flexible participant's meeting to the next day (cyclically: repeated moves reach every day)."""
+    flexible = [i for i, m in enumerate(meetings)
+                if PARTICIPANTS.get(m.get("person"), {}).get("day") == 0 and m.get("day") in DAYS]
+    if len(DAYS) < 2 or not flexible:
+        return None
+    i = rng.choice(flexible)
+    return MeetingDiff(replaced={i: dict(meetings[i], day=DAYS[int(meetings[i]["day"]) % len(DAYS)])})
+
+
+def _drop(meetings, rng):
+    if len(meetings) < 2:
+        return None
+    return MeetingDiff(removed=frozenset((rng.randrange(len(meetings)),)))
+
+
+def _insert(meetings, rng):
+    """Add a participant the plan is missing, on their day, inside their availability."""
+    present = {m.get("person") for m in meetings}
+    missing = [p for p in PARTICIPANTS if p not in present]
+    if not missing:
+        return None
+    person = rng.choice(missing)
+    info = PARTICIPANTS[person]
+    latest = info["avail_end"] - info["duration"]
+    start = max(info["avail_start"], DAY_START)
+    if latest > start:
+        start += rng.randrange(0, latest - start + 1, 5)
+    day = info["day"] or rng.choice(DAYS)
+    return MeetingDiff(added=({"person": person, "day": day, "start": _time_str(start),
+                               "end": _time_str(start + info["duration"])},))
+
+
+OPERATORS = (_shift, _shift, _swap, _move_day, _drop, _insert)  # shifts are the most useful moves: drawn twice as often
+
+
+# ── Hill climbing ──
+
+def climb(meetings: list, seed, evaluations: int):
+    """
+    Hill-climb a meeting list for `evaluations` candidate evaluations (sideways
+    moves allowed). Returns (best meetings, its EvalResult, evaluations used), or
+    (None, None, evaluations used) when nothing beat the starting plan.
+    """
+    rng = random.Random(seed)
+    current = evaluate_detailed(meetings)
+    start_score = current.result.score
+    used = tries = 0
+    while used < evaluations and tries < 4 * evaluations and current.result.score < 1.0 and current.meetings:
+        tries += 1
+        diff = rng.choice(OPERATORS)(current.meetings, rng)
+        if not diff:
+            continue
+        used += 1
+        child = evaluate_delta(current, diff)
+        if child.result.score >= current.result.score:
+            current = child
+    if current.result.score <= start_score:
+        return None, None, used
+    return list(current.meetings), current.result, used
+
+
+def _climb_task(task):
+    key, meetings, seed, evaluations = task
+    return key, *climb(meetings, seed, evaluations)
+
+
+def _climbable(ind):
+    """The individual's meeting list if local search can work on it, else None."""
+    plan = ind.plan
+    meetings = plan.get("meetings") if isinstance(plan, dict) else plan
+    if not ind.json_ok or not isinstance(meetings, list) or not meetings:
+        return None
+    if not all(isinstance(m, dict) and isinstance(m.get("person"), str) for m in meetings):
+        return None
+    return meetings
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    if workers not in _pools:
+        ctx = multiprocessing.get_context("spawn")  # same as sweep.py: no inherited clients or event loops
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+    return _pools[workers]
+
+
+@atexit.register
+def shutdown():
+    for pool in _pools.values():
+        pool.shutdown(cancel_futures=True)
+    _pools.clear()
+
+
+def improve_islands(cfg, islands: list, generation: int) -> tuple[list, dict]:
+    """
+    Climb the `local_search_top` best scored individuals of every island.
+    Returns (islands with improved individuals replaced, {"evaluations", "climbs", "improved"}).
+    """
+    from state import Individual
+
+    tasks = []
+    for k, island in enumerate(islands):
+        ranked = sorted(range(len(island)), key=lambda i: island[i].score, reverse=True)
+        for i in ranked[:cfg.local_search_top]:
+            meetings = _climbable(island[i])
+            if meetings is not None and island[i].score < 1.0:
+                tasks.append(((k, i), meetings, f"{cfg.seed}:{generation}:{k}:{i}", cfg.local_search_evals))
+
+    workers = cfg.local_search_workers
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if multiprocessing.current_process().daemon:
+        workers = 0  # daemonic processes (async islands) cannot have children
+    if workers and len(tasks) > 1:
+        pool = get_pool(min(workers, len(islands) * cfg.local_search_top))  # one pool per run size, reused every generation
+        results = list(pool.map(_climb_task, tasks))
+    else:
+        results = [_climb_task(task) for task in tasks]
+
+    islands = [list(island) for island in islands]
+    stats = {"evaluations": 0, "climbs": len(tasks), "improved": 0}
+    for (k, i), meetings, result, used in results:
+        stats["evaluations"] += used
+        if meetings is None:
+            continue
+        parent = islands[k][i]
+        text = json.dumps({"meetings": meetings}, ensure_ascii=False)
+        islands[k][i] = Individual.from_text(text, origin="local", parents=(parent.uid,), born=generation).scored(result)
+        stats["improved"] += 1
+    return islands, stats
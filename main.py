@@ -1,57 +1,168 @@
 """
 Mind Evolution v4 -- Entry Point
-2-Day Meeting Planner (10 participants, 11 constraints)
-Configurable islands / pop / generations via CLI args.
+Meeting Planner (default instance: 2 days, 10 participants, 11 constraints)
+Configurable islands / pop / generations via CLI args; --problem picks another instance.
 """
 
+import argparse
 import json
-import sys
 import os
+import time
+import uuid
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
 def main():
-    # --- Config (override via CLI: python main.py <islands> <pop> <gens> <run_id>) ---
-    num_islands = int(sys.argv[1]) if len(sys.argv) > 1 else 3
-    pop_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4
-    max_gens = int(sys.argv[3]) if len(sys.argv) > 3 else 6
-    run_id = sys.argv[4] if len(sys.argv) > 4 else f"run_{num_islands}isl_{max_gens}gen"
-
-    # Patch nodes config before importing
-    import nodes
-    nodes.NUM_ISLANDS = num_islands
-    nodes.POP_SIZE = pop_size
-    nodes.MAX_GENERATIONS = max_gens
+    # --- Config (override via CLI: python main.py <islands> <pop> <gens> <run_id> [options]) ---
+    parser = argparse.ArgumentParser(description="Mind Evolution v4 - 2-Day Meeting Planner")
+    parser.add_argument("islands", nargs="?", type=int, default=3)
+    parser.add_argument("pop", nargs="?", type=int, default=4)
+    parser.add_argument("gens", nargs="?", type=int, default=6)
+    parser.add_argument("run_id", nargs="?", default=None)
+    parser.add_argument("--target-score", type=float, default=None,
+                        help="stop once best score reaches this (default: the optimum, when known)")
+    parser.add_argument("--no-target", action="store_true", help="never stop early on score")
+    parser.add_argument("--stagnation", type=int, default=None,
+                        help="stop after K generations without best-score improvement")
+    parser.add_argument("--max-llm-calls", type=int, default=None, help="stop once this many LLM calls were made")
+    parser.add_argument("--max-seconds", type=float, default=None, help="stop once the run has taken this long")
+    parser.add_argument("--structured", action="store_true",
+                        help="request schema-constrained JSON output (OpenAI json_schema) instead of free text")
+    parser.add_argument("--max-reasks", type=int, default=1,
+                        help="targeted re-asks for an unparseable plan before it enters the population")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream plan responses and stop reading once the JSON object is complete")
+    parser.add_argument("--compact-prompt", action="store_true",
+                        help="encode the problem as tables generated from the evaluator data (fewer input tokens)")
+    parser.add_argument("--backend", choices=("openai", "mock"), default=os.environ.get("LLM_BACKEND", "openai"),
+                        help="LLM backend; mock runs fully offline (tune it with the MOCK_* env vars)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="mock backend seed (default MOCK_SEED); passed to OpenAI as its best-effort seed")
+    parser.add_argument("--resume", metavar="RUN_ID", default=None,
+                        help="continue RUN_ID from its last checkpoint (restores its original config)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="do not write checkpoints")
+    parser.add_argument("--async-islands", action="store_true",
+                        help="one process per island, no generation barrier, periodic migration via a broker")
+    parser.add_argument("--topology", choices=("ring", "star", "random"), default="ring",
+                        help="migration topology for --async-islands")
+    parser.add_argument("--migration-interval", type=int, default=2,
+                        help="with --async-islands, an island sends its elites every N of its generations")
+    parser.add_argument("--migrants", type=int, default=1, help="elites sent per migration (--async-islands)")
+    parser.add_argument("--local-search", action="store_true",
+                        help="hill-climb each island's best plans on the CPU between LLM generations")
+    parser.add_argument("--ls-top", type=int, default=2, help="individuals climbed per island (--local-search)")
+    parser.add_argument("--ls-evals", type=int, default=2000, help="candidate evaluations per climb (--local-search)")
+    parser.add_argument("--ls-workers", type=int, default=None,
+                        help="local search worker processes (default: one per CPU; 0 = in-process)")
+    parser.add_argument("--problem", default=None,
+                        help="problem instance file (default: PROBLEM_FILE or problems/default.json, see problem.py)")
+    args = parser.parse_args()
+    if args.async_islands and args.resume:
+        parser.error("--async-islands runs are not checkpointed, so they cannot be resumed")
+    if args.migration_interval < 1 or args.migrants < 1:
+        parser.error("--migration-interval and --migrants must be at least 1")
+
+    # Checkpoints: every node's output is saved, so a crash loses at most the node in flight
+    saver = None
+    if (not args.no_checkpoint or args.resume) and not args.async_islands:
+        from checkpointer import SqliteDeltaSaver
+        saver = SqliteDeltaSaver()
+    run_keys = ("islands", "pop", "gens", "target_score", "no_target", "stagnation", "max_llm_calls", "max_seconds",
+                "structured", "max_reasks", "compact_prompt", "stream", "backend", "seed",
+                "local_search", "ls_top", "ls_evals", "ls_workers", "problem")
+    if args.resume:
+        saved = saver.load_run_config(args.resume)
+        if saved is None:
+            parser.error(f"no checkpointed run '{args.resume}'")
+        for k in run_keys:
+            setattr(args, k, saved.get(k, getattr(args, k)))
+        args.run_id = args.resume
+
+    num_islands = args.islands
+    pop_size = args.pop
+    max_gens = args.gens
+    # Default ids are unique: report.py aggregates and charts per run_id, and a fresh run replaces its id's checkpoints
+    run_id = args.run_id or f"run_{num_islands}isl_{max_gens}gen_{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:4]}"
+
+    # The instance is read once per process at import: set it before anything imports the evaluator
+    if args.problem:
+        os.environ["PROBLEM_FILE"] = os.path.abspath(args.problem)
+
+    # Known optimum (stored in the instance, or a best clean DP score of 1.0) → default stop target.
+    # Without one, the best clean score is only the reference for the gap: runs may beat it.
+    from solver import reference_score
+    reference, reference_kind = reference_score()
+    optimum = reference if reference_kind == "optimum" else None
+    target = None if args.no_target else (args.target_score if args.target_score is not None else optimum)
+
+    # Everything the nodes need travels with the invoke config (no module globals)
+    from run_config import RunConfig, graph_config
+    cfg = RunConfig(
+        run_id=run_id, islands=num_islands, pop_size=pop_size, max_generations=max_gens, seed=args.seed,
+        backend=args.backend, structured_output=args.structured, max_reasks=args.max_reasks,
+        stream_plans=args.stream, prompt_format="compact" if args.compact_prompt else os.environ.get("PROMPT_FORMAT", "full"),
+        target_score=target, stagnation_limit=args.stagnation, max_llm_calls=args.max_llm_calls,
+        max_wall_seconds=args.max_seconds, migration_topology=args.topology,
+        migration_interval=args.migration_interval, migration_size=args.migrants,
+        local_search=args.local_search, local_search_top=args.ls_top, local_search_evals=args.ls_evals,
+        local_search_workers=args.ls_workers,
+    )
 
     from graph import build_graph
-    from metrics import init_csv, generate_chart
+    from metrics import init_csv, generate_chart, log_run
 
     print("=" * 70)
     print(f"  MIND EVOLUTION v4 - 2-Day Meeting Planner")
-    print(f"  Model: GPT-4.1 nano | Islands: {num_islands} | Pop: {pop_size} | Gen: {max_gens}")
+    print(f"  Model: GPT-4.1 nano{' (mock backend)' if args.backend == 'mock' else ''} | Islands: {num_islands} | Pop: {pop_size} | Gen: {max_gens}")
     print(f"  Run ID: {run_id}")
+    from evaluator import PROBLEM
+    print(f"  Problem: {PROBLEM.name} ({len(PROBLEM.participants)} participants, {PROBLEM.days} days)")
     print("=" * 70)
 
+    import instrumentation
+    import metrics
+    if metrics.BACKGROUND_WRITER:
+        metrics.start_background_writer()
     init_csv(run_id=run_id)
-    app = build_graph()
+    instrumentation.init(run_id=run_id)
+    app = build_graph(checkpointer=saver)
+    config = graph_config(cfg, thread_id=run_id)
 
     # Build initial state dynamically
     initial_state = {
         "generation": 0,
         "max_generations": max_gens,
+        "target_score": target,
         "llm_call_count": 0,
         "best_solution": "",
         "best_score": 0.0,
+        "started_at": time.time(),
+        "islands": [],
     }
-    for i in range(1, num_islands + 1):
-        initial_state[f"island_{i}"] = []
-        initial_state[f"scores_{i}"] = []
-        initial_state[f"feedback_{i}"] = []
 
-    print(f"\n>> Starting evolution...\n")
-    result = app.invoke(initial_state)
+    if args.async_islands:
+        from island_model import run_async_islands
+        print(f"\n>> Starting asynchronous islands ({args.topology} migration every {args.migration_interval} gens)...\n")
+        result = run_async_islands(cfg)
+    elif args.resume:
+        snapshot = app.get_state(config)
+        if snapshot.next:
+            print(f"\n>> Resuming {run_id} at generation {snapshot.values.get('generation', 0)} (next: {', '.join(snapshot.next)})...\n")
+            result = app.invoke(None, config)
+        else:
+            print(f"\n>> Run {run_id} already completed, reporting its final state\n")
+            result = snapshot.values
+    else:
+        if saver is not None:
+            saver.delete_thread(run_id)  # a fresh run replaces an older run with the same id
+            saver.save_run_config(run_id, {k: getattr(args, k) for k in run_keys})
+        print(f"\n>> Starting evolution...\n")
+        result = app.invoke(initial_state, config)
+    if saver is not None:
+        saver.prune_thread(run_id)  # finished: only the final checkpoint is needed to report it again
 
     # --- Results ---
     print("\n" + "=" * 70)
@@ -64,6 +175,23 @@ def main():
 
     print(f"\n[SCORE] Best Score: {best_score:.3f}")
     print(f"[CALLS] Total LLM Calls: {total_calls}")
+    print(f"[STOP] {result.get('stop_reason') or 'max_generations'} after generation {result['generation']}")
+    if optimum is not None:
+        print(f"[OPTIMUM] Optimum: {optimum:.3f} | Gap: {optimum - best_score:.3f} | "
+              f"Calls to optimum: {result.get('calls_to_target', 'not reached')}")
+    elif reference is not None:
+        print(f"[OPTIMUM] Optimum: unknown | Best clean (violation-free) score: {reference:.3f} | "
+              f"Gap: {reference - best_score:.3f} | Calls to target: {result.get('calls_to_target', 'not reached')}")
+    else:
+        print(f"[OPTIMUM] Optimum: unknown (instance too large) | Calls to target: {result.get('calls_to_target', 'not reached')}")
+    if result.get("repair_attempts"):
+        rate = result["repair_successes"] / result["repair_attempts"]
+        print(f"[REPAIR] {result['repair_successes']}/{result['repair_attempts']} children repaired ({rate:.0%}) | {result['llm_calls_saved']} LLM calls saved")
+    if args.local_search:
+        print(f"[LOCAL] {result.get('local_search_improved', 0)} individuals improved by local search | "
+              f"{result.get('local_search_evals', 0)} evaluations")
+    print(f"[JSON] {'structured' if args.structured else 'free-text'} output | {result.get('invalid_outputs', 0)} unparseable responses | "
+          f"{result.get('reasks', 0)} re-asks | {result.get('invalid_children', 0)} unparseable plans admitted")
 
     try:
         parsed = json.loads(best_json)
@@ -72,18 +200,30 @@ def main():
     except (json.JSONDecodeError, TypeError):
         print(f"\n[PLAN] Best Solution (raw): {best_json[:500]}")
 
-    from evaluator import evaluate
-    final_score, final_feedback = evaluate(best_json)
+    from evaluator import evaluate_cached, FITNESS_CACHE
+    final = evaluate_cached(best_json)
+    final_score = final.score
     print(f"\n[VERIFY] Final: score={final_score:.3f}")
-    print(f"         Feedback: {final_feedback}")
+    print(f"         Feedback: {final.feedback}")
+    if final.counts:
+        print(f"         Violations: {', '.join(f'{code}={n}' for code, n in final.counts.items())}")
+    print(f"[CACHE] Fitness cache: {FITNESS_CACHE.hits} hits / {FITNESS_CACHE.misses} misses")
 
     if final_score == 1.0:
         print("\n>>> PERFECT PLAN! <<<")
 
     print(f"[COST] {total_calls} LLM calls | Run: {run_id}")
+    log_run(num_islands, pop_size, max_gens, result["generation"], best_score,
+            reference, reference_kind, total_calls, result.get("calls_to_target"), result.get("stop_reason", ""))
+
+    print("\n[PERF] Per-node wall time and LLM calls by prompt type:")
+    print(instrumentation.summary(run_id))
+    instrumentation.flush()
+
+    metrics.stop_background_writer()  # no-op without METRICS_BACKGROUND; flushes the last rows
 
     print("\n[CHART] Generating metrics chart...")
-    generate_chart()
+    generate_chart(run_id=run_id)
     print("=" * 70)
 
 
@@ -1,117 +1,193 @@
 """
 Metrics logger for Mind Evolution v4 pipeline.
-Supports N islands. Writes CSV + generates matplotlib chart.
+Supports N islands. Writes CSV + generates a matplotlib chart of the current run (report.py).
+Rows are buffered in memory and flushed in batches (size, age, explicit
+flush() or interpreter exit), optionally from a background writer thread
+(METRICS_BACKGROUND=1 in main.py / sweep.py).
+A run with a run_dir (RunConfig.output_dir set) writes metrics.csv, runs.csv
+and the chart into that directory instead of the shared files.
 """
 
+import atexit
 import csv
 import os
+import threading
+import time
 from datetime import datetime
 
+from evaluator import CONSTRAINTS
+
 METRICS_FILE = os.path.join(os.path.dirname(__file__), "metrics.csv")
 CHART_FILE = os.path.join(os.path.dirname(__file__), "metrics_chart.png")
+RUNS_FILE = os.path.join(os.path.dirname(__file__), "runs.csv")
 
 _HEADERS = [
     "timestamp", "run_id", "generation", "island", "individual",
     "score", "violations", "llm_calls_total", "phase",
+    *CONSTRAINTS,  # violations per constraint (C1..C11); unusable input only counts in "violations"
 ]
 
-_initialized = False
-_run_id = "default"
+_RUN_HEADERS = [
+    "timestamp", "run_id", "islands", "pop_size", "max_generations", "generations_run",
+    "best_score", "reference_score", "reference", "reference_gap", "llm_calls_total", "calls_to_optimum",
+    "stop_reason",
+]  # reference: "optimum" (known optimum) or "best_clean" (best violation-free plan, may be beaten), see solver.reference_score
 
+FLUSH_ROWS = 500       # flush once this many rows are buffered
+FLUSH_SECONDS = 2.0    # ...or once the oldest buffered row is this old
+BACKGROUND_WRITER = os.environ.get("METRICS_BACKGROUND", "0") == "1"  # flush from a daemon thread
+
+_initialized = set()  # metrics files with a header
+_run_id = "default"
 
-def init_csv(run_id: str = "default"):
-    """Initialize CSV. Only writes headers if file doesn't exist. Appends otherwise."""
-    global _initialized, _run_id
+_buffer = []                      # (metrics file, row)
+_buffer_lock = threading.Lock()   # guards _buffer / _last_flush
+_write_lock = threading.Lock()    # serializes file appends
+_last_flush = time.monotonic()
+_writer_thread = None
+_writer_stop = threading.Event()
+
+
+def _path(run_dir: str, name: str, default: str) -> str:
+    if not run_dir:
+        return default
+    os.makedirs(run_dir, exist_ok=True)
+    return os.path.join(run_dir, name)
+
+
+def _rotate_stale(path: str, headers: list) -> bool:
+    """
+    Move a file written with other columns (an older version of this logger) to
+    <name>.v1.csv (.v2, ... if taken), so new rows never go under a mismatched
+    header. Returns True when `path` needs a header (missing, empty or rotated).
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, newline="", encoding="utf-8") as f:
+        if next(csv.reader(f), []) == headers:
+            return False
+    base, ext = os.path.splitext(path)
+    n = 1
+    while os.path.exists(f"{base}.v{n}{ext}"):
+        n += 1
+    os.replace(path, f"{base}.v{n}{ext}")
+    print(f"[metrics] {os.path.basename(path)} has an older header: moved to {os.path.basename(base)}.v{n}{ext}")
+    return True
+
+
+def init_csv(run_id: str = "default", run_dir: str = None):
+    """Initialize CSV. Writes the header to a new file (or after rotating one with other columns); appends otherwise."""
+    global _run_id
     _run_id = run_id
-    if not os.path.exists(METRICS_FILE) or os.path.getsize(METRICS_FILE) == 0:
-        with open(METRICS_FILE, "w", newline="", encoding="utf-8") as f:
-            csv.writer(f).writerow(_HEADERS)
-    _initialized = True
-
-
-def log_row(generation, island, individual, score, violations, llm_calls_total, phase):
-    global _initialized
-    if not _initialized:
-        init_csv()
-    with open(METRICS_FILE, "a", newline="", encoding="utf-8") as f:
-        csv.writer(f).writerow([
+    path = _path(run_dir, "metrics.csv", METRICS_FILE)
+    with _write_lock:
+        if _rotate_stale(path, _HEADERS):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(_HEADERS)
+    _initialized.add(path)
+
+
+def log_row(generation, island, individual, score, violations, llm_calls_total, phase, run_id=None, run_dir=None,
+            counts=None):
+    """Buffer one individual's row; `counts` is its violations per constraint code (EvalResult.counts)."""
+    path = _path(run_dir, "metrics.csv", METRICS_FILE)
+    if path not in _initialized:
+        init_csv(_run_id, run_dir)
+    row = [
+        datetime.now().isoformat(timespec="seconds"),
+        run_id or _run_id, generation, island, individual,
+        round(score, 3), violations, llm_calls_total, phase,
+        *(counts.get(code, 0) if counts else 0 for code in CONSTRAINTS),
+    ]
+    with _buffer_lock:
+        _buffer.append((path, row))
+        due = len(_buffer) >= FLUSH_ROWS or time.monotonic() - _last_flush >= FLUSH_SECONDS
+    if due and _writer_thread is None:
+        flush()
+
+
+def flush():
+    """Write all buffered rows with a single append."""
+    global _buffer, _last_flush
+    with _write_lock:
+        with _buffer_lock:
+            pending, _buffer = _buffer, []
+            _last_flush = time.monotonic()
+        by_file = {}
+        for path, row in pending:
+            by_file.setdefault(path, []).append(row)
+        for path, rows in by_file.items():
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(rows)
+
+
+def _writer_loop(interval: float):
+    while not _writer_stop.wait(interval):
+        flush()
+    flush()
+
+
+def start_background_writer(interval: float = FLUSH_SECONDS):
+    """Move flushing off the logging threads: a daemon thread flushes every `interval` seconds."""
+    global _writer_thread
+    if _writer_thread is not None:
+        return
+    _writer_stop.clear()
+    _writer_thread = threading.Thread(target=_writer_loop, args=(interval,), name="metrics-writer", daemon=True)
+    _writer_thread.start()
+    atexit.register(stop_background_writer)
+
+
+def stop_background_writer():
+    """Stop the writer thread after a last flush of the buffer."""
+    global _writer_thread
+    if _writer_thread is None:
+        return
+    _writer_stop.set()
+    _writer_thread.join()
+    _writer_thread = None
+
+
+atexit.register(flush)
+
+
+def log_run(islands, pop_size, max_generations, generations_run, best_score,
+            reference_score, reference, llm_calls_total, calls_to_optimum, stop_reason="", run_id=None, run_dir=None):
+    """Append one end-of-run summary row to runs.csv (gap to solver.reference_score(): the optimum or the best clean score)."""
+    path = _path(run_dir, "runs.csv", RUNS_FILE)
+    new_file = _rotate_stale(path, _RUN_HEADERS)
+    gap = round(reference_score - best_score, 3) if reference_score is not None else ""
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if new_file:
+            w.writerow(_RUN_HEADERS)
+        w.writerow([
             datetime.now().isoformat(timespec="seconds"),
-            _run_id, generation, island, individual,
-            round(score, 3), violations, llm_calls_total, phase,
+            run_id or _run_id, islands, pop_size, max_generations, generations_run,
+            round(best_score, 3), "" if reference_score is None else reference_score, reference, gap,
+            llm_calls_total, "" if calls_to_optimum is None else calls_to_optimum,
+            stop_reason,
         ])
 
 
-def _count_violations(feedback: str) -> int:
-    if not feedback or "perfecto" in feedback.lower():
-        return 0
-    return len(feedback.split(";"))
-
-
-def log_population(
-    generation, scores_1, scores_2, feedback_1, feedback_2,
-    llm_calls, phase,
-    scores_3=None, feedback_3=None,
-):
-    """Log all individuals from islands."""
-    for i, (s, f) in enumerate(zip(scores_1, feedback_1)):
-        log_row(generation, 1, i, s, _count_violations(f), llm_calls, phase)
-    for i, (s, f) in enumerate(zip(scores_2, feedback_2)):
-        log_row(generation, 2, i, s, _count_violations(f), llm_calls, phase)
-    if scores_3 and feedback_3:
-        for i, (s, f) in enumerate(zip(scores_3, feedback_3)):
-            log_row(generation, 3, i, s, _count_violations(f), llm_calls, phase)
-
-
-def generate_chart():
-    try:
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
-    except ImportError:
-        print("[metrics] matplotlib not installed")
-        return
+def log_population(generation, islands, llm_calls, phase, run_id=None, run_dir=None):
+    """Log all individuals from every island. islands: one list of scored Individuals per island (island 1 first)."""
+    for island, individuals in enumerate(islands, start=1):
+        for i, ind in enumerate(individuals):
+            log_row(generation, island, i, ind.score, ind.violations, llm_calls, phase, run_id, run_dir,
+                    ind.violation_counts)
 
-    if not os.path.exists(METRICS_FILE):
-        return
 
-    rows = []
-    with open(METRICS_FILE, "r", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            rows.append(row)
+def generate_chart(run_dir=None, run_id=None):
+    """Chart of one run (default: the current one), streamed from the metrics file via report.py."""
+    import report
 
-    if not rows:
+    flush()
+    metrics_file = _path(run_dir, "metrics.csv", METRICS_FILE)
+    chart_file = _path(run_dir, "metrics_chart.png", CHART_FILE)
+    run_id = run_id or _run_id
+    run = report.aggregate(metrics_file, [run_id]).get(run_id)
+    if run is None:
         return
-
-    # Group by generation
-    gens = {}
-    for row in rows:
-        gen = int(row["generation"])
-        score = float(row["score"])
-        gens.setdefault(gen, []).append(score)
-
-    gen_nums = sorted(gens.keys())
-    if not gen_nums: return
-    
-    best_scores = [max(gens[g]) for g in gen_nums]
-    avg_scores = [sum(gens[g]) / len(gens[g]) for g in gen_nums]
-    worst_scores = [min(gens[g]) for g in gen_nums]
-
-    fig, ax1 = plt.subplots(figsize=(10, 6))
-
-    # Chart: Score evolution
-    ax1.plot(gen_nums, best_scores, "g-o", label="Best", linewidth=2)
-    ax1.plot(gen_nums, avg_scores, "b-s", label="Average", linewidth=1.5)
-    ax1.plot(gen_nums, worst_scores, "r-^", label="Worst", linewidth=1)
-    ax1.fill_between(gen_nums, worst_scores, best_scores, alpha=0.1, color="blue")
-    
-    ax1.set_xlabel("Generation")
-    ax1.set_ylabel("Score")
-    ax1.set_title("Mind Evolution - Score Progress")
-    ax1.legend()
-    ax1.set_ylim(0, 1.05)
-    ax1.grid(True, alpha=0.3)
-
-    plt.tight_layout()
-    plt.savefig(CHART_FILE, dpi=150)
-    plt.close()
-    print(f"[metrics] Chart saved to {CHART_FILE}")
+    if report.render_chart(run_id, run, chart_file):
+        print(f"[metrics] Chart saved to {chart_file}")
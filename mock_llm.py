@@ -0,0 +1,254 @@
+"""
+Offline stand-in for the OpenAI chat model (LLM_BACKEND=mock).
+
+A LangChain chat model that answers each prompt type plausibly without the
+network: INIT gets a random, roughly feasible plan built from
+evaluator.PARTICIPANTS; CROSSOVER mixes the two parents; AUTHOR re-times (or
+sometimes fully repairs) the previous plan; CRITIC lists the detected violations
+as bullets. Latency, malformed output, server errors and 429s (with a
+Retry-After header) are injected at configurable rates, so concurrency, rate
+limiting and island/population scaling can be load-tested offline.
+
+Every call draws from its own RNG seeded by (seed, prompt, temperature, how many
+times that prompt was asked before), so a run is reproducible for a fixed seed.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+import httpx
+import openai
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from evaluator import PARTICIPANTS, DAYS, DAY_START, MIN_PEOPLE, START_LOCATION, _time_str, get_travel_time
+from repair import repair
+
+_API_URL = "https://api.openai.com/v1/chat/completions"
+
+# Role lines of the prompt templates (prompts.py), most specific first
+_PROMPT_TYPES = [
+    ("reask", "Tu respuesta anterior no es un plan JSON valido"),
+    ("critic", "Eres un auditor"),
+    ("author", "Eres un planificador que corrige"),
+    ("crossover", "Eres un optimizador"),
+    ("init", "Genera un plan"),
+]
+
+
+def prompt_type(prompt: str) -> str:
+    for name, marker in _PROMPT_TYPES:
+        if marker in prompt:
+            return name
+    return "init"
+
+
+def _section(prompt: str, start: str, end: str) -> str:
+    m = re.search(re.escape(start) + r"[^\n]*\n(.*?)\n\n" + re.escape(end), prompt, re.DOTALL)
+    return m.group(1).strip() if m else ""
+
+
+def _meetings(text: str) -> list[dict]:
+    try:
+        plan = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    meetings = plan.get("meetings", []) if isinstance(plan, dict) else plan
+    return [m for m in meetings if isinstance(m, dict) and m.get("person") in PARTICIPANTS] if isinstance(meetings, list) else []
+
+
+# ── Plan generation ──
+
+def _retime(meetings: list[dict], rng: random.Random, noise: float) -> list[dict]:
+    """Lay each day out in availability order with travel; `noise` is the chance of a sloppy slot."""
+    out = []
+    for day in DAYS:
+        todays = sorted((m for m in meetings if m.get("day") == day), key=lambda m: PARTICIPANTS[m["person"]]["avail_start"])
+        if rng.random() < noise and len(todays) > 1:
+            i = rng.randrange(len(todays) - 1)
+            todays[i], todays[i + 1] = todays[i + 1], todays[i]
+        t, loc = DAY_START, START_LOCATION
+        for m in todays:
+            info = PARTICIPANTS[m["person"]]
+            start = max(t + get_travel_time(loc, info["location"]), info["avail_start"])
+            duration = info["duration"]
+            if rng.random() < noise:
+                start += rng.choice([-20, -10, 10, 30])
+            if rng.random() < noise / 2:
+                duration -= 15
+            out.append({"person": m["person"], "day": day, "start": _time_str(start), "end": _time_str(start + duration)})
+            t, loc = start + duration, info["location"]
+    return out
+
+
+def _random_plan(rng: random.Random, noise: float) -> list[dict]:
+    people = rng.sample(list(PARTICIPANTS), rng.randint(max(1, min(MIN_PEOPLE, len(PARTICIPANTS))), len(PARTICIPANTS)))
+    meetings = []
+    for person in people:
+        day = PARTICIPANTS[person]["day"] or rng.choice(DAYS)
+        if rng.random() < noise / 3:
+            day = DAYS[day % len(DAYS)]  # wrong day: the next one
+        meetings.append({"person": person, "day": day})
+    return _retime(meetings, rng, noise)
+
+
+def _crossover(prompt: str, rng: random.Random, noise: float) -> list[dict]:
+    a = {m["person"]: m for m in _meetings(_section(prompt, "PADRE A", "PADRE B"))}
+    b = {m["person"]: m for m in _meetings(_section(prompt, "PADRE B", "Recalcula"))}
+    if not a and not b:
+        return _random_plan(rng, noise)
+    child = []
+    for person in list(a) + [p for p in b if p not in a]:
+        pick = a.get(person) if person in a and (person not in b or rng.random() < 0.6) else b[person]
+        if rng.random() > 0.1:  # occasionally drop someone
+            child.append(dict(pick))
+    if rng.random() < 0.7:
+        return _retime([m for m in child if m.get("day") in DAYS], rng, noise)
+    return child
+
+
+def _author(prompt: str, rng: random.Random, noise: float, fix_rate: float) -> list[dict]:
+    previous = _section(prompt, "PLAN ANTERIOR", "CAMBIOS NECESARIOS")
+    if rng.random() < fix_rate:
+        fixed = repair(previous)
+        if fixed is not None:
+            return json.loads(fixed)["meetings"]
+    meetings = _meetings(previous)
+    if not meetings:
+        return _random_plan(rng, noise)
+    return _retime([m for m in meetings if m.get("day") in DAYS], rng, noise / 2)
+
+
+def _critique(prompt: str) -> str:
+    violations = [v.strip() for v in _section(prompt, "VIOLACIONES DETECTADAS", "Analiza").split(";") if v.strip()]
+    if not violations:
+        return "- El plan no tiene violaciones, mantener tal cual."
+    bullets = []
+    for v in violations[:6]:
+        person = next((p for p in PARTICIPANTS if p in v), None)
+        fix = f"mover {person} despues de llegar, respetando su ventana" if person else "ajustar el horario del dia"
+        bullets.append(f"- {v} -> {fix}.")
+    return "\n".join(bullets)
+
+
+def _error(cls, status: int, message: str, headers: dict = None):
+    response = httpx.Response(status, headers=headers or {}, request=httpx.Request("POST", _API_URL))
+    return cls(message, response=response, body=None)
+
+
+class MockChatModel(BaseChatModel):
+    """Offline chat model; see the module docstring. Fields are the knobs for load tests."""
+
+    seed: int = 0
+    latency: float = 0.3              # seconds to first token
+    seconds_per_token: float = 0.002  # generation speed (~4 chars per token)
+    noise: float = 0.3                # chance of each sloppy choice in a generated plan
+    fix_rate: float = 0.5             # chance AUTHOR returns a fully repaired plan
+    malformed_rate: float = 0.03      # chance a plan comes back truncated
+    chatty_rate: float = 0.5          # chance a plan is fenced and followed by an explanation
+    error_rate: float = 0.0           # chance of a 500 error
+    rate_limit_rate: float = 0.0      # chance of a 429
+    retry_after: float = 1.0          # Retry-After header on injected 429s
+
+    _ordinals: dict = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock"
+
+    @classmethod
+    def from_env(cls, seed: int = None) -> "MockChatModel":
+        """Knobs from the MOCK_* env vars; an explicit `seed` (e.g. a sweep run's) wins over MOCK_SEED."""
+        env = {
+            "seed": ("MOCK_SEED", int), "latency": ("MOCK_LATENCY", float),
+            "seconds_per_token": ("MOCK_SECONDS_PER_TOKEN", float), "noise": ("MOCK_NOISE", float),
+            "fix_rate": ("MOCK_FIX_RATE", float), "malformed_rate": ("MOCK_MALFORMED_RATE", float),
+            "chatty_rate": ("MOCK_CHATTY_RATE", float), "error_rate": ("MOCK_ERROR_RATE", float),
+            "rate_limit_rate": ("MOCK_429_RATE", float), "retry_after": ("MOCK_RETRY_AFTER", float),
+        }
+        kwargs = {field: cast(os.environ[var]) for field, (var, cast) in env.items() if os.environ.get(var)}
+        if seed is not None:
+            kwargs["seed"] = seed
+        return cls(**kwargs)
+
+    # ── One response ──
+
+    def _rng(self, prompt: str, temperature) -> random.Random:
+        base = f"{self.seed}|{temperature}|{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}"
+        with self._lock:
+            ordinal = self._ordinals.get(base, 0)
+            self._ordinals[base] = ordinal + 1
+        return random.Random(hashlib.sha256(f"{base}|{ordinal}".encode("utf-8")).digest())
+
+    def _respond(self, messages, kwargs) -> tuple[str, float, float]:
+        """(content, seconds to first token, seconds for the rest); raises injected errors."""
+        prompt = "\n".join(str(m.content) for m in messages)
+        rng = self._rng(prompt, kwargs.get("temperature"))
+        first = self.latency * rng.uniform(0.5, 1.5)
+        if rng.random() < self.rate_limit_rate:
+            raise _error(openai.RateLimitError, 429, "Rate limit reached (mock)", {"retry-after": f"{self.retry_after:g}"})
+        if rng.random() < self.error_rate:
+            raise _error(openai.InternalServerError, 500, "Server error (mock)")
+
+        kind = prompt_type(prompt)
+        if kind == "critic":
+            content = _critique(prompt)
+        else:
+            if kind == "crossover":
+                meetings = _crossover(prompt, rng, self.noise)
+            elif kind == "author":
+                meetings = _author(prompt, rng, self.noise, self.fix_rate)
+            else:
+                meetings = _random_plan(rng, self.noise)
+            content = json.dumps({"meetings": meetings}, ensure_ascii=False)
+            structured = kwargs.get("response_format") is not None
+            if rng.random() < self.malformed_rate:
+                content = content[: rng.randint(10, len(content) - 1)]
+            elif not structured and rng.random() < self.chatty_rate:
+                content = f"```json\n{content}\n```\n\nExplicacion: " + "Cada reunion respeta el viaje y la ventana. " * rng.randint(5, 30)
+        return content, first, len(content) / 4 * self.seconds_per_token
+
+    def _message(self, messages, content: str) -> AIMessage:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        })
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, first, rest = self._respond(messages, kwargs)
+        time.sleep(first + rest)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, first, rest = self._respond(messages, kwargs)
+        await asyncio.sleep(first + rest)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, content))])
+
+    # Streaming: ~8-char chunks paced at the generation speed, so an early cutoff saves real time
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        content, first, rest = self._respond(messages, kwargs)
+        time.sleep(first)
+        chunks = [content[i:i + 8] for i in range(0, len(content), 8)] or [""]
+        for piece in chunks:
+            time.sleep(rest / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        content, first, rest = self._respond(messages, kwargs)
+        await asyncio.sleep(first)
+        chunks = [content[i:i + 8] for i in range(0, len(content), 8)] or [""]
+        for piece in chunks:
+            await asyncio.sleep(rest / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
@@ -2,57 +2,250 @@
 LangGraph nodes for Mind Evolution v4 pipeline.
 """
 
+import asyncio
 import json
 import re
 import time
+from contextlib import aclosing, asynccontextmanager, nullcontext
+from dataclasses import replace
 from langchain_openai import ChatOpenAI
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage
-
-from state import MindEvolutionState
-from evaluator import evaluate
-from prompts import INIT_PROMPT, CRITIC_PROMPT, AUTHOR_PROMPT, CROSSOVER_PROMPT
-from metrics import log_population, log_row, _count_violations
-
-# ── Config (patched from main) ──
-POP_SIZE = 4
-NUM_ISLANDS = 3
-MAX_GENERATIONS = 6
-
-# ── LLM singleton ──
-_llm = None
-
-
-def get_llm() -> ChatOpenAI:
-    global _llm
-    if _llm is None:
-        _llm = ChatOpenAI(
-            model="gpt-4.1-nano",
-            temperature=0.9,
-            max_tokens=1200,
-        )
-    return _llm
-
-
-def _call_llm(prompt: str, temperature: float = None) -> str:
-    """Single LLM call with retry on rate limit."""
-    llm = get_llm()
+from langchain_core.runnables import RunnableConfig
+from openai import ContentFilterFinishReasonError, LengthFinishReasonError
+from pydantic import ValidationError
+
+from state import MindEvolutionState, Individual, new_uid
+from evaluator import INVALID_JSON, evaluate_plans_cached
+from prompts import prompt_set
+from run_config import RunConfig, get_run_config
+from schemas import MeetingPlan, plan_error
+from metrics import log_population
+from llm_cache import get_cache
+from repair import repair
+from local_search import improve_islands
+from rate_limiter import get_limiter, is_rate_limit, is_transient, retry_after, backoff_delay, estimate_tokens
+from instrumentation import record_llm_call, set_tags, usage_tokens
+
+# Per-run settings (islands, population, stopping rules, LLM options...) come from the
+# RunConfig in config["configurable"]["run"]; see run_config.py.
+STREAM_MAX_PREAMBLE = 300  # chars of streamed text allowed before the opening brace
+
+# ── LLM clients (one per backend + seed) ──
+MODEL_NAME = "gpt-4.1-nano"
+DEFAULT_TEMPERATURE = 0.9
+MAX_TOKENS = 1200
+MAX_RETRIES = 6
+_llms = {}
+_global_slots = None  # cross-process LLM concurrency budget (a multiprocessing semaphore), see set_global_slots()
+
+
+def _openai_llm(seed: int = None) -> BaseChatModel:
+    return ChatOpenAI(
+        model=MODEL_NAME,
+        temperature=DEFAULT_TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        seed=seed,
+    )
+
+
+def _mock_llm(seed: int = None) -> BaseChatModel:
+    from mock_llm import MockChatModel
+    return MockChatModel.from_env(seed=seed)
+
+
+BACKENDS = {"openai": _openai_llm, "mock": _mock_llm}
+
+
+def get_llm(backend: str = "openai", seed: int = None) -> BaseChatModel:
+    key = (backend, seed)
+    if key not in _llms:
+        _llms[key] = BACKENDS[backend](seed)
+    return _llms[key]
+
+
+def set_global_slots(slots):
+    """Share one LLM concurrency budget between processes (each call holds a slot while in flight)."""
+    global _global_slots
+    _global_slots = slots
+
+
+@asynccontextmanager
+async def _aglobal_slot():
+    if _global_slots is None:
+        yield
+        return
+    await asyncio.to_thread(_global_slots.acquire)  # don't block the event loop while waiting
+    try:
+        yield
+    finally:
+        _global_slots.release()
+
+
+def _bound_llm(cfg: RunConfig, temperature: float, structured: bool):
+    llm = get_llm(cfg.backend, cfg.seed)
+    kwargs = {}
     if temperature is not None:
-        llm = llm.bind(temperature=temperature)
-
-    max_retries = 4
-    for attempt in range(max_retries):
+        kwargs["temperature"] = temperature
+    if structured:
+        kwargs["response_format"] = MeetingPlan
+    return llm.bind(**kwargs) if kwargs else llm
+
+
+def _model_name(cfg: RunConfig) -> str:
+    """The model actually answering: MODEL_NAME on OpenAI, "<backend>:MODEL_NAME" for offline backends (unpriced)."""
+    return MODEL_NAME if cfg.backend == "openai" else f"{cfg.backend}:{MODEL_NAME}"
+
+
+def _cache_model(cfg: RunConfig, structured: bool) -> str:
+    model = _model_name(cfg)
+    if cfg.seed is not None:
+        model += f"@{cfg.seed}"
+    return f"{model}+schema" if structured else model
+
+
+def _cache_key(cfg: RunConfig, prompt: str, temperature: float, structured: bool = False) -> str:
+    t = DEFAULT_TEMPERATURE if temperature is None else temperature
+    return get_cache().make_key(_cache_model(cfg, structured), t, MAX_TOKENS, prompt)
+
+
+def _cache_store(cfg: RunConfig, key: str, temperature: float, text: str, structured: bool = False):
+    t = DEFAULT_TEMPERATURE if temperature is None else temperature
+    get_cache().store(key, _cache_model(cfg, structured), t, MAX_TOKENS, text)
+
+
+def _rate_limit_wait(e: Exception, attempt: int) -> float:
+    """Seconds to back off after a 429; pauses every caller sharing the limiter."""
+    wait = retry_after(e)
+    if wait is None:
+        wait = backoff_delay(attempt)
+    get_limiter().pause(wait)
+    print(f"    [rate-limit] Waiting {wait:.1f}s (retry {attempt+1}/{MAX_RETRIES})...")
+    return wait
+
+
+def _transient_wait(e: Exception, attempt: int) -> float:
+    """Seconds to back off after a 5xx / timeout; only the failed caller waits."""
+    wait = backoff_delay(attempt, base=0.5)
+    print(f"    [retry] {type(e).__name__}, waiting {wait:.1f}s (retry {attempt+1}/{MAX_RETRIES})...")
+    return wait
+
+
+def _record_response(cfg: RunConfig, response, prompt: str, text: str, latency: float, retries: int, prompt_type: str):
+    prompt_tokens, completion_tokens, cached_tokens = usage_tokens(response, prompt, text)
+    record_llm_call(_model_name(cfg), latency, prompt_tokens, completion_tokens, retries=retries,
+                    cached_tokens=cached_tokens, prompt_type=prompt_type)
+
+
+class _JsonCutoff:
+    """
+    Incremental brace-depth scan (like _extract_json, but string-aware) over a streamed
+    response. feed() returns "more", "done" once the first top-level object has closed,
+    or "abort" when the stream cannot produce one (a stray closing brace, or too much
+    text before the opening brace).
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape = False
+        self.seen = 0
+
+    def feed(self, chunk: str) -> str:
+        for ch in chunk:
+            self.seen += 1
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"' and self.started:
+                self.in_string = True
+            elif ch == "{":
+                self.started = True
+                self.depth += 1
+            elif ch == "}":
+                if not self.started:
+                    return "abort"
+                self.depth -= 1
+                if self.depth == 0:
+                    return "done"
+            elif not self.started and self.seen > STREAM_MAX_PREAMBLE:
+                return "abort"
+        return "more"
+
+
+def _stream_complete(status: str, last) -> bool:
+    """
+    Whether a streamed response may be cached as the model's answer: its JSON object
+    closed, or the stream ended on its own without hitting max_tokens. Aborted
+    streams are partial text.
+    """
+    if status == "done":
+        return True
+    finish = (getattr(last, "response_metadata", None) or {}).get("finish_reason")
+    return status == "more" and finish != "length"
+
+
+async def _astream_json(llm, prompt: str):
+    """Stream a plan response, closing the stream once the JSON is complete. Returns (text, last chunk, complete)."""
+    cutoff, parts, last, status = _JsonCutoff(), [], None, "more"
+    async with aclosing(llm.astream([HumanMessage(content=prompt)])) as stream:
+        async for chunk in stream:
+            last = chunk
+            parts.append(chunk.content)
+            status = cutoff.feed(chunk.content)
+            if status != "more":
+                break
+    return "".join(parts), last, _stream_complete(status, last)
+
+
+async def _acall_llm(cfg: RunConfig, prompt: str, temperature: float = None, semaphore: asyncio.Semaphore = None,
+                     prompt_type: str = "", structured: bool = False, stream: bool = False) -> str:
+    """
+    Async LLM call with retry on rate limit. `semaphore` caps in-flight calls of this run,
+    the global slots (if set) those of every process.
+    `stream` reads a JSON-producing response incrementally and stops at the closing brace.
+    """
+    key = _cache_key(cfg, prompt, temperature, structured)
+    cached = get_cache().lookup(key)
+    if cached is not None:
+        record_llm_call(_model_name(cfg), 0.0, 0, 0, cache_hit=True, prompt_type=prompt_type)
+        return cached
+
+    llm = _bound_llm(cfg, temperature, structured)
+
+    tokens = estimate_tokens(prompt, MAX_TOKENS)
+    for attempt in range(MAX_RETRIES):
+        await get_limiter().aacquire(tokens)
         try:
-            response = llm.invoke([HumanMessage(content=prompt)])
-            return response.content.strip()
+            async with semaphore or nullcontext(), _aglobal_slot():
+                t0 = time.perf_counter()
+                complete = True
+                if stream:
+                    text, response, complete = await _astream_json(llm, prompt)
+                else:
+                    response = await llm.ainvoke([HumanMessage(content=prompt)])
+                    text = response.content
+                latency = time.perf_counter() - t0
+            text = text.strip()
+            if complete:  # never replay a cut-off stream as the model's full answer
+                _cache_store(cfg, key, temperature, text, structured)
+            _record_response(cfg, response, prompt, text, latency, attempt, prompt_type)
+            return text
         except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str or "rate" in error_str.lower():
-                wait = 35 + attempt * 15
-                print(f"    [rate-limit] Waiting {wait}s (retry {attempt+1}/{max_retries})...")
-                time.sleep(wait)
-            else:
+            if not (is_rate_limit(e) or is_transient(e)):
                 raise
-    raise RuntimeError("Max retries exceeded for LLM call")
+            if attempt == MAX_RETRIES - 1:
+                raise RuntimeError("Max retries exceeded for LLM call") from e  # no backoff: nothing left to retry
+            if is_rate_limit(e):
+                # The limiter pause makes the next aacquire() wait; the semaphore slot is already free
+                _rate_limit_wait(e, attempt)
+            else:
+                await asyncio.sleep(_transient_wait(e, attempt))
 
 def _extract_json(text: str) -> str:
     """Extract JSON from LLM response, stripping comments and markdown."""
@@ -75,142 +268,299 @@ def _extract_json(text: str) -> str:
     return match.group(0).strip() if match else text
 
 
-def init_node(state: MindEvolutionState) -> dict:
-    """Generate initial population."""
-    islands = {i: [] for i in range(1, NUM_ISLANDS + 1)}
-    call_count = 0
-    temps = [0.7, 0.8, 0.9, 1.0]
+PLAN_COUNTERS = ("invalid_outputs", "reasks", "invalid_children")
 
-    for island_num in range(1, NUM_ISLANDS + 1):
-        for i in range(POP_SIZE):
-            t = temps[i % len(temps)]
-            raw = _call_llm(INIT_PROMPT, temperature=t)
-            islands[island_num].append(_extract_json(raw))
-            call_count += 1
 
-    result = {
+async def _acall_plan(cfg: RunConfig, prompt: str, temperature: float = None, semaphore: asyncio.Semaphore = None,
+                      prompt_type: str = "") -> tuple[str, int, dict]:
+    """
+    LLM call that must return a meeting plan: schema-constrained when cfg.structured_output,
+    otherwise extracted from free text. An unparseable plan gets up to cfg.max_reasks cheap
+    re-asks (bad output + parse error, no problem description) before it is admitted.
+    Returns (plan JSON, LLM calls made, PLAN_COUNTERS deltas).
+    """
+    structured = cfg.structured_output
+    counts = dict.fromkeys(PLAN_COUNTERS, 0)
+    calls = 0
+    for attempt in range(cfg.max_reasks + 1):
+        try:
+            # Schema-constrained output has no trailing prose to cut, so it is not streamed
+            raw = await _acall_llm(cfg, prompt, temperature=temperature, semaphore=semaphore,
+                                   prompt_type=prompt_type if attempt == 0 else "reask", structured=structured,
+                                   stream=cfg.stream_plans and not structured)
+            text = raw if structured else _extract_json(raw)
+            error = plan_error(text)
+        except ValidationError as e:
+            # Structured mode: the client's own typed parse rejected the response
+            bad = e.errors()[0].get("input")
+            text = bad if isinstance(bad, str) else ""
+            error = plan_error(text) if text else e.errors()[0]["msg"]
+        except (LengthFinishReasonError, ContentFilterFinishReasonError) as e:
+            text, error = "", type(e).__name__
+        calls += 1
+        if not error:
+            return text, calls, counts
+        counts["invalid_outputs"] += 1
+        if attempt < cfg.max_reasks:
+            counts["reasks"] += 1
+            if text:  # nothing to correct after a truncated/filtered response: re-send the original prompt
+                prompt = prompt_set(cfg.prompt_format)["reask"].replace("<<error>>", error).replace("<<response>>", text[:4000])
+                temperature = 0.0
+    counts["invalid_children"] += 1
+    return text, calls, counts
+
+
+def _add_counts(total: dict, counts: dict):
+    for k, v in counts.items():
+        total[k] = total.get(k, 0) + v
+
+
+async def _seed_slot(cfg: RunConfig, island_num: int, i: int, semaphore: asyncio.Semaphore) -> tuple[str, int, dict]:
+    temps = [0.7, 0.8, 0.9, 1.0]
+    set_tags(island=island_num)  # own task context, so tags don't leak across slots
+    return await _acall_plan(cfg, prompt_set(cfg.prompt_format)["init"], temperature=temps[i % len(temps)],
+                             semaphore=semaphore, prompt_type="init")
+
+
+async def _seed_population(cfg: RunConfig) -> tuple[list[list[Individual]], int, dict]:
+    """Fire all islands x pop_size init calls concurrently, llm_concurrency at a time. Returns (islands, calls, counters)."""
+    semaphore = asyncio.Semaphore(cfg.llm_concurrency)
+    slots = [(island_num, i) for island_num in range(1, cfg.islands + 1) for i in range(cfg.pop_size)]
+
+    seeds = await asyncio.gather(*(_seed_slot(cfg, island_num, i, semaphore) for island_num, i in slots))
+
+    # gather preserves order, so each slot keeps its position and temperature
+    islands = [[] for _ in range(cfg.islands)]
+    calls, counts = 0, {}
+    for (island_num, _), (text, slot_calls, slot_counts) in zip(slots, seeds):
+        islands[island_num - 1].append(Individual.from_text(text, origin="init", born=0))
+        calls += slot_calls
+        _add_counts(counts, slot_counts)
+    return islands, calls, counts
+
+
+def init_node(state: MindEvolutionState, config: RunnableConfig) -> dict:
+    """Generate initial population (concurrent LLM seeding)."""
+    cfg = get_run_config(config)
+    get_cache().reset_ordinals()
+    islands, call_count, counts = asyncio.run(_seed_population(cfg))
+
+    return {
+        **{k: counts.get(k, 0) for k in PLAN_COUNTERS},
+        "cache_ordinals": get_cache().ordinals(),
+        "islands": islands,
         "generation": 0,
-        "max_generations": MAX_GENERATIONS,
+        "max_generations": cfg.max_generations,
+        "target_score": cfg.target_score,
         "llm_call_count": call_count,
         "best_solution": "",
         "best_score": 0.0,
+        "stale_generations": 0,
+        "started_at": state.get("started_at") or time.time(),
+        "stop_reason": "",
     }
-    for i in range(1, NUM_ISLANDS + 1):
-        result[f"island_{i}"] = islands[i]
-        result[f"scores_{i}"] = [0.0] * POP_SIZE
-        result[f"feedback_{i}"] = [""] * POP_SIZE
-    return result
-
 
-def eval_node(state: MindEvolutionState) -> dict:
-    """Evaluate all individuals across all islands."""
-    all_scores = {}
-    all_feedback = {}
 
-    for island_num in range(1, NUM_ISLANDS + 1):
-        key_island = f"island_{island_num}"
-        key_scores = f"scores_{island_num}"
-        key_fb = f"feedback_{island_num}"
-        scores, feedbacks = [], []
-
-        for sol in state[key_island]:
-            s, f = evaluate(sol)
-            scores.append(s)
-            feedbacks.append(f)
-
-        all_scores[key_scores] = scores
-        all_feedback[key_fb] = feedbacks
-
-    combined_scores = []
-    combined_sols = []
-    for i in range(1, NUM_ISLANDS + 1):
-        combined_scores += all_scores[f"scores_{i}"]
-        combined_sols += state[f"island_{i}"]
-    
-    best_idx = max(range(len(combined_scores)), key=lambda i: combined_scores[i])
-    best_score = combined_scores[best_idx]
-    best_solution = combined_sols[best_idx]
-    
-    if state.get("best_score", 0.0) > best_score:
+def _score_individuals(individuals: list[Individual]) -> list[Individual]:
+    """Fill in fitness for records not scored yet; parsed plans go to the evaluator as-is."""
+    todo = [i for i, ind in enumerate(individuals) if not ind.evaluated and ind.json_ok]
+    out = list(individuals)
+    for i, result in zip(todo, evaluate_plans_cached([individuals[i].plan for i in todo])):
+        out[i] = individuals[i].scored(result)
+    for i, ind in enumerate(out):
+        if not ind.evaluated:
+            out[i] = ind.scored(INVALID_JSON)
+    return out
+
+
+def _stop_reason(cfg: RunConfig, state: MindEvolutionState, best_score: float, stale: int) -> str:
+    """First stopping rule that fires after this evaluation, or "" to keep evolving."""
+    target = state.get("target_score")
+    if target is not None and best_score >= target:
+        return "target_score"
+    if state["generation"] >= state["max_generations"]:
+        return "max_generations"
+    if cfg.stagnation_limit is not None and stale >= cfg.stagnation_limit:
+        return "stagnation"
+    if cfg.max_llm_calls is not None and state.get("llm_call_count", 0) >= cfg.max_llm_calls:
+        return "llm_budget"
+    if cfg.max_wall_seconds is not None and time.time() - state.get("started_at", time.time()) >= cfg.max_wall_seconds:
+        return "time_budget"
+    return ""
+
+
+def eval_node(state: MindEvolutionState, config: RunnableConfig) -> dict:
+    """Evaluate the individuals not scored yet, across all islands in one batch."""
+    cfg = get_run_config(config)
+    sizes = [len(island) for island in state["islands"]]
+    flat = _score_individuals([ind for island in state["islands"] for ind in island])
+    islands, pos = [], 0
+    for n in sizes:
+        islands.append(flat[pos:pos + n])
+        pos += n
+
+    best = max(flat, key=lambda ind: ind.score)
+    best_score, best_solution = best.score, best.text
+
+    prev_best = state.get("best_score", 0.0)
+    if prev_best > best_score:
         best_score = state["best_score"]
         best_solution = state["best_solution"]
+    stale = 0 if state["generation"] == 0 or best_score > prev_best else state.get("stale_generations", 0) + 1
 
-    parts = [f"I{i}:{[f'{s:.2f}' for s in all_scores[f'scores_{i}']]}" for i in range(1, NUM_ISLANDS + 1)]
-    print(f"  [eval] Gen {state['generation']} | {' | '.join(parts)} | Best:{best_score:.2f}")
+    parts = [f"I{i}:{[f'{ind.score:.2f}' for ind in island]}" for i, island in enumerate(islands, start=1)]
+    target = state.get("target_score")
+    gap = f" | Gap:{target - best_score:.2f}" if target is not None else ""
+    print(f"  [eval] Gen {state['generation']} | {' | '.join(parts)} | Best:{best_score:.2f}{gap}")
 
     # Metrics
-    for i in range(1, NUM_ISLANDS + 1):
-        for j, (s, f) in enumerate(zip(all_scores[f"scores_{i}"], all_feedback[f"feedback_{i}"])):
-            log_row(state["generation"], i, j, s, _count_violations(f), state.get("llm_call_count", 0), "eval")
-
-    result = {**all_scores, **all_feedback, "best_solution": best_solution, "best_score": best_score}
-    return result
+    log_population(state["generation"], islands, state.get("llm_call_count", 0), "eval",
+                   run_id=cfg.run_id, run_dir=cfg.run_dir())
 
+    stop_reason = _stop_reason(cfg, state, best_score, stale)
+    if stop_reason and stop_reason != "max_generations":
+        print(f"  [stop] {stop_reason} after generation {state['generation']}")
 
-def evolution_node(state: MindEvolutionState) -> dict:
-    """LLM crossover + RCC refinement per island."""
-    call_count = state["llm_call_count"]
-    new_islands = {}
-
-    for island_num in range(1, NUM_ISLANDS + 1):
-        key = f"island_{island_num}"
-        scores = state[f"scores_{island_num}"]
-        island = list(state[key])
-        label = f"I{island_num}"
+    result = {"islands": islands, "best_solution": best_solution, "best_score": best_score,
+              "stale_generations": stale, "stop_reason": stop_reason}
+    if target is not None and best_score >= target and state.get("calls_to_target") is None:
+        result["calls_to_target"] = state.get("llm_call_count", 0)
+    return result
 
-        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
-        best_idx, second_idx, worst_idx = ranked[0], ranked[1], ranked[-1]
 
-        # Crossover
-        crossover_prompt = (CROSSOVER_PROMPT.replace("<<parent_a>>", island[best_idx])
-                            .replace("<<score_a>>", f"{scores[best_idx]:.2f}")
-                            .replace("<<parent_b>>", island[second_idx])
-                            .replace("<<score_b>>", f"{scores[second_idx]:.2f}"))
-        child_raw = _call_llm(crossover_prompt, temperature=0.5)
-        child_json = _extract_json(child_raw)
-        call_count += 1
-        child_score, child_feedback = evaluate(child_json)
+async def _evolve_island(cfg: RunConfig, island: list[Individual], island_num: int, generation: int,
+                         semaphore: asyncio.Semaphore) -> tuple[int, list[Individual], int, dict]:
+    """Crossover + repair/RCC for one island. Returns (island number, new population, LLM calls made, repair stats)."""
+    set_tags(island=island_num)
+    prompts = prompt_set(cfg.prompt_format)
+    island = list(island)
+    born = generation + 1
+    calls = 0
+    stats = {"repair_attempts": 0, "repair_successes": 0, **dict.fromkeys(PLAN_COUNTERS, 0)}
+
+    ranked = sorted(range(len(island)), key=lambda i: island[i].score, reverse=True)
+    parent_a, parent_b, worst_idx = island[ranked[0]], island[ranked[1]], ranked[-1]
+    parents = (parent_a.uid, parent_b.uid)
+
+    # Crossover
+    crossover_prompt = (prompts["crossover"].replace("<<parent_a>>", parent_a.text)
+                        .replace("<<score_a>>", f"{parent_a.score:.2f}")
+                        .replace("<<parent_b>>", parent_b.text)
+                        .replace("<<score_b>>", f"{parent_b.score:.2f}"))
+    child_json, calls, counts = await _acall_plan(cfg, crossover_prompt, temperature=0.5, semaphore=semaphore, prompt_type="crossover")
+    _add_counts(stats, counts)
+    child = Individual.from_text(child_json, origin="crossover", parents=parents, born=born)
+    child = _score_individuals([child])[0]
+
+    # Local repair: mechanical fixes (C1-C4, C7, C9, C10) without the LLM
+    if child.score < 1.0 and cfg.use_repair:
+        stats["repair_attempts"] += 1
+        repaired = repair(child.text)
+        if repaired is not None:
+            fixed = _score_individuals([Individual.from_text(repaired, origin="repair", parents=parents, born=born)])[0]
+            if fixed.score > child.score:
+                child = fixed
+            if fixed.score >= cfg.repair_target:
+                stats["repair_successes"] += 1
+
+    # RCC (the refined child is scored by the next eval_node)
+    if child.score < 1.0 and not (cfg.use_repair and child.score >= cfg.repair_target):
+        critique = await _acall_llm(cfg, prompts["critic"].replace("<<solution>>", child.text).replace("<<feedback>>", child.feedback), temperature=0.3, semaphore=semaphore, prompt_type="critic")
+        calls += 1
+        fixed_json, author_calls, counts = await _acall_plan(cfg, prompts["author"].replace("<<solution>>", child.text).replace("<<critique>>", critique), temperature=0.4, semaphore=semaphore, prompt_type="author")
+        _add_counts(stats, counts)
+        child = Individual.from_text(fixed_json, origin="rcc", parents=parents, born=born)
+        calls += author_calls
+
+    island[worst_idx] = child
+    return island_num, island, calls, stats
+
+
+def _merge_island_updates(updates: list[tuple[int, list[Individual], int, dict]]) -> tuple[list, int, dict]:
+    """Reduce per-island branch results into the new islands list, summed LLM call delta and repair stats."""
+    new_islands = [island for _, island, _, _ in sorted(updates, key=lambda u: u[0])]
+    stats = {}
+    for _, _, _, island_stats in updates:
+        _add_counts(stats, island_stats)
+    return new_islands, sum(calls for _, _, calls, _ in updates), stats
+
+
+async def _evolve_all_islands(cfg: RunConfig, state: MindEvolutionState) -> list[tuple[int, list[Individual], int, dict]]:
+    semaphore = asyncio.Semaphore(cfg.llm_concurrency)
+    return await asyncio.gather(*(
+        _evolve_island(cfg, island, island_num, state["generation"], semaphore)
+        for island_num, island in enumerate(state["islands"], start=1)
+    ))
+
+
+def evolution_node(state: MindEvolutionState, config: RunnableConfig) -> dict:
+    """LLM crossover + repair/RCC refinement, all islands evolved concurrently."""
+    cfg = get_run_config(config)
+    # A resumed run starts here in a fresh process: continue the cache samples of the checkpoint
+    get_cache().set_ordinals(state.get("cache_ordinals") or {})
+    new_islands, calls, stats = _merge_island_updates(asyncio.run(_evolve_all_islands(cfg, state)))
+
+    # Each successful repair skips one CRITIC + one AUTHOR call
+    saved = 2 * stats["repair_successes"]
+    if stats["repair_attempts"]:
+        print(f"  [repair] Gen {state['generation']} | {stats['repair_successes']}/{stats['repair_attempts']} children repaired | {saved} LLM calls saved")
+
+    return {
+        "islands": new_islands,
+        "generation": state["generation"] + 1,
+        "llm_call_count": state["llm_call_count"] + calls,
+        "repair_attempts": state.get("repair_attempts", 0) + stats["repair_attempts"],
+        "repair_successes": state.get("repair_successes", 0) + stats["repair_successes"],
+        "llm_calls_saved": state.get("llm_calls_saved", 0) + saved,
+        **{k: state.get(k, 0) + stats[k] for k in PLAN_COUNTERS},
+        "cache_ordinals": get_cache().ordinals(),
+    }
 
-        # RCC
-        if child_score < 1.0:
-            critique = _call_llm(CRITIC_PROMPT.replace("<<solution>>", child_json).replace("<<feedback>>", child_feedback), temperature=0.3)
-            call_count += 1
-            fixed_raw = _call_llm(AUTHOR_PROMPT.replace("<<solution>>", child_json).replace("<<critique>>", critique), temperature=0.4)
-            child_json = _extract_json(fixed_raw)
-            call_count += 1
 
-        island[worst_idx] = child_json
-        new_islands[key] = island
+def local_search_node(state: MindEvolutionState, config: RunnableConfig) -> dict:
+    """Memetic inner loop: hill-climb each island's best individuals on the CPU before the next LLM generation."""
+    cfg = get_run_config(config)
+    islands, stats = improve_islands(cfg, state["islands"], state["generation"])
+    best = max((ind for island in islands for ind in island), key=lambda ind: ind.score)
+    print(f"  [local] Gen {state['generation']} | {stats['improved']}/{stats['climbs']} climbs improved | "
+          f"{stats['evaluations']} evaluations | Best:{max(best.score, state.get('best_score', 0.0)):.2f}")
 
-    return {**new_islands, "generation": state["generation"] + 1, "llm_call_count": call_count}
+    result = {
+        "islands": islands,
+        "local_search_evals": state.get("local_search_evals", 0) + stats["evaluations"],
+        "local_search_improved": state.get("local_search_improved", 0) + stats["improved"],
+    }
+    if best.score > state.get("best_score", 0.0):
+        result["best_score"], result["best_solution"] = best.score, best.text
+        target = state.get("target_score")
+        if target is not None and best.score >= target:
+            print(f"  [stop] target_score after local search (generation {state['generation']})")
+            result["stop_reason"] = "target_score"
+            if state.get("calls_to_target") is None:
+                result["calls_to_target"] = state.get("llm_call_count", 0)
+    return result
 
 
 def migration_node(state: MindEvolutionState) -> dict:
     """Ring migration."""
-    islands = [list(state[f"island_{i}"]) for i in range(1, NUM_ISLANDS + 1)]
-    scores = [state[f"scores_{i}"] for i in range(1, NUM_ISLANDS + 1)]
-    bests = [max(range(len(s)), key=lambda i: s[i]) for s in scores]
-    worsts = [min(range(len(s)), key=lambda i: s[i]) for s in scores]
+    islands = [list(island) for island in state["islands"]]
+    n = len(islands)
+    bests = [max(range(len(isl)), key=lambda i: isl[i].score) for isl in islands]
+    worsts = [min(range(len(isl)), key=lambda i: isl[i].score) for isl in islands]
 
-    migrants = [islands[i][bests[i]] for i in range(NUM_ISLANDS)]
-    for i in range(NUM_ISLANDS):
-        target = (i + 1) % NUM_ISLANDS
-        islands[target][worsts[target]] = migrants[i]
+    migrants = [islands[i][bests[i]] for i in range(n)]
+    for i in range(n):
+        target = (i + 1) % n
+        m = migrants[i]
+        islands[target][worsts[target]] = replace(m, origin="migrant", parents=(m.uid,), uid=new_uid())
 
-    result = {f"island_{i+1}": islands[i] for i in range(NUM_ISLANDS)}
-    return result
+    return {"islands": islands}
 
 
 def select_best_node(state: MindEvolutionState) -> dict:
     """Pick final best."""
-    all_sols = []
-    all_scores = []
-    for i in range(1, NUM_ISLANDS + 1):
-        all_sols += state[f"island_{i}"]
-        all_scores += state[f"scores_{i}"]
-    best_idx = max(range(len(all_scores)), key=lambda i: all_scores[i])
-    best = all_sols[best_idx]
-    best_score = all_scores[best_idx]
+    best_ind = max((ind for island in state["islands"] for ind in island), key=lambda ind: ind.score)
+    best, best_score = best_ind.text, best_ind.score
 
     if state.get("best_score", 0.0) > best_score:
         best = state["best_solution"]
@@ -0,0 +1,263 @@
+"""
+Problem instances for the meeting planner.
+
+An instance (participants, locations, travel times, days and the coverage
+minimums of C6 / C11) is a JSON file; the evaluator tables, the exact solver
+and the prompt text are all derived from it. The active instance is read once
+per process from PROBLEM_FILE (default: problems/default.json, the original
+10-person, 2-day instance), so worker processes started by sweep.py, the async
+islands or local search inherit it through the environment.
+
+generate() builds random instances of any size around a planted perfect plan,
+so their optimum (1.0) and a plan reaching it are known without running the
+exponential solver.
+
+Usage:
+  python problem.py generate --people 100 --locations 20 --days 4 --density 0.5 --out problems/p100.json
+  python problem.py show problems/p100.json
+  PROBLEM_FILE=problems/p100.json python main.py 3 4 6 p100_run --backend mock
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+from dataclasses import dataclass, field
+
+PROBLEM_DIR = os.path.join(os.path.dirname(__file__), "problems")
+DEFAULT_FILE = os.path.join(PROBLEM_DIR, "default.json")
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+@dataclass(frozen=True)
+class Problem:
+    name: str
+    participants: dict          # person -> {"location", "day" (0 = any day), "avail_start", "avail_end", "duration"[, "prereq"]}
+    locations: list
+    travel: dict                # (a, b) -> minutes, symmetric, 0 on the diagonal
+    days: int = 2
+    day_start: int = 480        # 08:00
+    day_end: int = 1200         # 20:00
+    start_location: str = ""    # where every day starts (default: the first location)
+    min_people: int = 7         # C6
+    min_per_day: tuple = ()     # C11: minimum meetings on day 1, 2, ...
+    optimum: float | None = None  # best achievable score when known (generated instances: 1.0)
+    solution: dict | None = None  # a plan reaching `optimum` (generated instances: the planted plan)
+    meta: dict = field(default_factory=dict)  # generator settings, free-form notes
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Problem":
+        locations = list(d["locations"])
+        known = set(locations)
+        travel = {}
+        for a, b, minutes in d.get("travel", []):
+            if a not in known or b not in known:
+                raise ValueError(f"travel time between unknown locations: {a} / {b}")
+            travel[(a, b)] = travel[(b, a)] = minutes
+        for loc in locations:
+            travel[(loc, loc)] = 0
+
+        days = d.get("days", 2)
+        participants = {}
+        for p in d["participants"]:
+            name = p["name"]
+            if p["location"] not in known:
+                raise ValueError(f"{name}: unknown location {p['location']}")
+            if not 0 <= p.get("day", 0) <= days:
+                raise ValueError(f"{name}: day {p['day']} outside 0..{days}")
+            start, end = p["window"]
+            info = {"location": p["location"], "day": p.get("day", 0), "avail_start": _minutes(start),
+                    "avail_end": _minutes(end), "duration": p["duration"]}
+            if p.get("prereq"):
+                info["prereq"] = p["prereq"]
+            participants[name] = info
+        for name, info in participants.items():
+            if "prereq" in info and info["prereq"] not in participants:
+                raise ValueError(f"{name}: unknown prerequisite {info['prereq']}")
+
+        min_per_day = tuple(d.get("min_per_day", [0] * days))
+        if len(min_per_day) != days:
+            raise ValueError(f"min_per_day has {len(min_per_day)} entries for {days} days")
+        start_location = d.get("start_location") or locations[0]
+        if start_location not in known:
+            raise ValueError(f"unknown start location {start_location}")
+        return cls(
+            name=d.get("name", "unnamed"), participants=participants, locations=locations, travel=travel,
+            days=days, day_start=_minutes(d.get("day_start", "08:00")), day_end=_minutes(d.get("day_end", "20:00")),
+            start_location=start_location, min_people=d.get("min_people", 0), min_per_day=min_per_day,
+            optimum=d.get("optimum"), solution=d.get("solution"), meta=d.get("meta", {}),
+        )
+
+    def to_dict(self) -> dict:
+        pairs = [[a, b, self.travel[(a, b)]] for i, a in enumerate(self.locations)
+                 for b in self.locations[i + 1:] if (a, b) in self.travel]
+        participants = []
+        for name, info in self.participants.items():
+            p = {"name": name, "location": info["location"], "day": info["day"],
+                 "window": [_hhmm(info["avail_start"]), _hhmm(info["avail_end"])], "duration": info["duration"]}
+            if "prereq" in info:
+                p["prereq"] = info["prereq"]
+            participants.append(p)
+        return {
+            "name": self.name, "days": self.days, "day_start": _hhmm(self.day_start), "day_end": _hhmm(self.day_end),
+            "start_location": self.start_location, "min_people": self.min_people,
+            "min_per_day": list(self.min_per_day), "optimum": self.optimum, "meta": self.meta, "solution": self.solution,
+            "locations": self.locations, "participants": participants, "travel": pairs,
+        }
+
+
+def load_problem(path: str) -> Problem:
+    with open(path, encoding="utf-8") as f:
+        return Problem.from_dict(json.load(f))
+
+
+def save_problem(problem: Problem, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    d = problem.to_dict()
+    # One participant / travel pair per line: instance files stay diffable
+    lines = [json.dumps({k: v for k, v in d.items() if k not in ("participants", "travel")},
+                        ensure_ascii=False)[:-1] + ","]
+    for key in ("participants", "travel"):
+        rows = [json.dumps(row, ensure_ascii=False) for row in d[key]]
+        lines.append(f' "{key}": [\n  ' + ",\n  ".join(rows) + "\n ]" + ("," if key == "participants" else ""))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n}\n")
+
+
+# ── Active instance ──
+_problem = None
+
+
+def get_problem() -> Problem:
+    """The instance of this process: PROBLEM_FILE, or the default 10-person instance."""
+    global _problem
+    if _problem is None:
+        _problem = load_problem(os.environ.get("PROBLEM_FILE") or DEFAULT_FILE)
+    return _problem
+
+
+# ── Random instances ──
+
+DURATIONS = (15, 20, 30, 45, 60)
+
+
+def generate(people: int, locations: int, days: int, density: float = 0.5, seed: int = 0,
+             name: str = None) -> Problem:
+    """
+    Random instance with a planted perfect plan. Participants are split over the
+    days and visited in a nearest-neighbour tour of their locations; windows are
+    cut around each planted meeting. `density` (0..1) tightens the instance:
+    narrower windows (density 1 = exactly the planted slot), more participants
+    with a fixed day (the rest may meet on any day), and more prerequisites
+    (up to 30% of participants, always satisfiable by the planted order).
+    """
+    if people < 1 or locations < 1 or days < 1:
+        raise ValueError("people, locations and days must be at least 1")
+    rng = random.Random(seed)
+    day_start, day_end = 480, 1200
+    names = ["Cafe Central"] + [f"Lugar {i}" for i in range(1, locations)]
+    points = {loc: (rng.random(), rng.random()) for loc in names}
+    travel = {}
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            travel[(a, b)] = travel[(b, a)] = 5 * round((5 + 40 * math.dist(points[a], points[b])) / 5)
+        travel[(a, a)] = 0
+
+    order = [f"P{i:03d}" for i in range(1, people + 1)]
+    rng.shuffle(order)
+    per_day = [order[d::days] for d in range(days)]
+    homes = {p: rng.choice(names) for p in order}
+
+    participants, planted = {}, {}
+    for day, todays in enumerate(per_day, start=1):
+        # Nearest-neighbour tour from the start location keeps travel short
+        tour, loc, left = [], names[0], list(todays)
+        while left:
+            nxt = min(left, key=lambda p: travel[(loc, homes[p])])
+            left.remove(nxt)
+            tour.append(nxt)
+            loc = homes[nxt]
+        legs = [travel[(a, b)] for a, b in zip([names[0]] + [homes[p] for p in tour], [homes[p] for p in tour])]
+        budget = (day_end - day_start - sum(legs)) // max(1, len(tour))
+        if budget < DURATIONS[0]:
+            raise ValueError(f"{len(tour)} meetings do not fit in one day: use more days or fewer people")
+        t = day_start
+        for person, leg in zip(tour, legs):
+            duration = rng.choice([d for d in DURATIONS if d <= budget])
+            start = t + leg + rng.randrange(0, budget - duration + 1, 5)
+            planted[person] = (day, start, start + duration)
+            t = start + duration
+
+    slack = round((1 - density) * 120)
+    for person in sorted(order):
+        day, start, end = planted[person]
+        before = 5 * (rng.randint(0, slack) // 5)
+        after = 5 * (rng.randint(0, slack) // 5)
+        participants[person] = {
+            "location": homes[person],
+            "day": day if rng.random() < 0.5 + 0.5 * density else 0,
+            "avail_start": max(day_start, start - before),
+            "avail_end": min(day_end, end + after),
+            "duration": end - start,
+        }
+    planted_order = sorted(order, key=lambda p: planted[p][:2])
+    for i in rng.sample(range(1, people), min(people - 1, round(0.3 * density * people))):
+        participants[planted_order[i]]["prereq"] = planted_order[rng.randrange(i)]
+
+    solution = [{"person": p, "day": planted[p][0], "start": _hhmm(planted[p][1]), "end": _hhmm(planted[p][2])}
+                for p in planted_order]
+    counts = [len(todays) for todays in per_day]
+    return Problem(
+        name=name or f"gen_{people}p_{locations}l_{days}d_s{seed}",
+        participants=participants, locations=names, travel=travel, days=days,
+        day_start=day_start, day_end=day_end, start_location=names[0],
+        min_people=math.ceil(0.7 * people), min_per_day=tuple(math.ceil(0.6 * c) for c in counts),
+        optimum=1.0, solution={"meetings": solution}, meta={"generator": {"people": people, "locations": locations, "days": days,
+                                         "density": density, "seed": seed}},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mind Evolution v4 - problem instances")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="write a random instance with a planted perfect plan")
+    gen.add_argument("--people", type=int, default=50)
+    gen.add_argument("--locations", type=int, default=12)
+    gen.add_argument("--days", type=int, default=3)
+    gen.add_argument("--density", type=float, default=0.5, help="0 = loose windows, few fixed days / prerequisites; 1 = tight")
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--name", default=None)
+    gen.add_argument("--out", default=None, help="output file (default: problems/<name>.json)")
+    show = sub.add_parser("show", help="summarize an instance file")
+    show.add_argument("path", nargs="?", default=None)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        problem = generate(args.people, args.locations, args.days, args.density, args.seed, args.name)
+        path = args.out or os.path.join(PROBLEM_DIR, f"{problem.name}.json")
+        save_problem(problem, path)
+        print(f"[problem] {problem.name}: {len(problem.participants)} participants, {len(problem.locations)} locations, "
+              f"{problem.days} days -> {path}")
+        return
+
+    problem = load_problem(args.path) if args.path else get_problem()
+    fixed = sum(1 for info in problem.participants.values() if info["day"])
+    prereqs = sum(1 for info in problem.participants.values() if "prereq" in info)
+    print(f"[problem] {problem.name}: {len(problem.participants)} participants ({fixed} on a fixed day, "
+          f"{prereqs} with a prerequisite), {len(problem.locations)} locations, {problem.days} days "
+          f"{_hhmm(problem.day_start)}-{_hhmm(problem.day_end)}")
+    print(f"          C6 minimum {problem.min_people} | C11 minimum per day {list(problem.min_per_day)} | "
+          f"optimum {problem.optimum if problem.optimum is not None else 'unknown (solver.py)'}")
+
+
+if __name__ == "__main__":
+    main()
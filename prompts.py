@@ -1,65 +1,128 @@
 """
 Prompt templates for Mind Evolution v4 pipeline.
+
+Every prompt starts with the same static problem text (PROBLEM_DESCRIPTION +
+blank line), and all per-call content comes after it, so the provider's
+automatic prompt caching can reuse the shared prefix. The problem text is
+generated from the active problem instance (problem.py): the full format
+spells everything out in prose, PROMPT_FORMAT=compact uses tables instead.
 """
 
-PROBLEM_DESCRIPTION = """Planificar reuniones con 10 amigos en 2 dias (08:00-20:00 cada dia). Empiezas en Cafe Central cada dia.
-
-PERSONAS, UBICACION, DIA, DISPONIBILIDAD Y DURACION:
-DIA 1:
-- Ana: Cafe Central, 09:00-12:00, 45min
-- Bruno: Parque Norte, 10:00-13:00, 30min (PREREQUISITO: reunirse con Ana antes)
-- Carla: Biblioteca Sur, 08:00-11:00, 60min
-- Diego: Oficina Este, 14:00-17:00, 45min
-- Elena: Centro Comercial, 15:00-19:00, 30min (puede ser dia 1 O dia 2)
-- Felipe: Restaurante Oeste, 11:00-14:00, 60min
-
-DIA 2:
-- Gaby: Hotel Plaza, 09:00-12:00, 45min
-- Hugo: Museo Central, 10:00-14:00, 30min (PREREQUISITO: reunirse con Gaby antes)
-- Isabel: Parque Norte, 13:00-16:00, 60min
-- Javier: Estacion Sur, 16:00-19:00, 45min (PREREQUISITO: reunirse con Isabel antes)
-
-TIEMPOS DE VIAJE (minutos):
-Cafe Central <-> Parque Norte: 20, Biblioteca Sur: 30, Oficina Este: 25, Centro Comercial: 35, Restaurante Oeste: 15, Hotel Plaza: 10, Museo Central: 20, Estacion Sur: 40
-Parque Norte <-> Biblioteca Sur: 40, Oficina Este: 15, Centro Comercial: 25, Restaurante Oeste: 30, Hotel Plaza: 25, Museo Central: 15, Estacion Sur: 35
-Biblioteca Sur <-> Oficina Este: 35, Centro Comercial: 45, Restaurante Oeste: 25, Hotel Plaza: 35, Museo Central: 30, Estacion Sur: 20
-Oficina Este <-> Centro Comercial: 20, Restaurante Oeste: 30, Hotel Plaza: 30, Museo Central: 25, Estacion Sur: 35
-Centro Comercial <-> Restaurante Oeste: 40, Hotel Plaza: 30, Museo Central: 20, Estacion Sur: 25
-Restaurante Oeste <-> Hotel Plaza: 20, Museo Central: 25, Estacion Sur: 30
-Hotel Plaza <-> Museo Central: 15, Estacion Sur: 35
-Museo Central <-> Estacion Sur: 30
-
-11 RESTRICCIONES:
-C1: Cada reunion dentro de ventana de disponibilidad
-C2: Respetar tiempo de viaje entre reuniones consecutivas
-C3: No reuniones solapadas (por dia)
-C4: Duracion minima respetada
-C5: Horario 08:00-20:00
-C6: Reunirse con al menos 7 de 10 personas
-C7: Cada persona en su dia correcto (Elena puede ser cualquier dia)
-C8: Empezar en Cafe Central cada dia
-C9: Prerequisites: Bruno DESPUES de Ana, Hugo DESPUES de Gaby, Javier DESPUES de Isabel
-C10: No repetir persona
-C11: Minimo 4 reuniones dia 1 Y minimo 3 reuniones dia 2"""
+import os
+import sys
+from functools import lru_cache
+
+from evaluator import (PARTICIPANTS, LOCATIONS, DAYS, DAY_START, DAY_END, MIN_PEOPLE, MIN_PER_DAY, START_LOCATION,
+                       _DAY_CHOICES, _time_str, get_travel_time)
+
+PROMPT_FORMAT = os.environ.get("PROMPT_FORMAT", "full")  # full | compact
+
+# ── Problem text (generated from the active instance, see problem.py) ──
+
+def _days_text() -> str:
+    return f"{len(DAYS)} dias" if len(DAYS) > 1 else "1 dia"
+
+
+def _prereq_pairs(sep: str) -> str:
+    return ", ".join(f"{person}{sep}{info['prereq']}" for person, info in PARTICIPANTS.items() if "prereq" in info)
+
+
+def constraints_text() -> str:
+    """The 11 constraints with the instance's hours, minimums, start location and prerequisites."""
+    flexible = [person for person, info in PARTICIPANTS.items() if info["day"] == 0]
+    if not flexible:
+        c7 = ""
+    elif len(flexible) == 1:
+        c7 = f" ({flexible[0]} puede ser cualquier dia)"
+    elif len(flexible) <= 3:
+        c7 = f" ({', '.join(flexible)} pueden ser cualquier dia)"
+    else:
+        c7 = " (las personas sin dia fijo pueden ser cualquier dia)"
+    c11 = " Y ".join(f"minimo {MIN_PER_DAY[day]} reuniones dia {day}" for day in DAYS)
+    return "\n".join([
+        "11 RESTRICCIONES:",
+        "C1: Cada reunion dentro de ventana de disponibilidad",
+        "C2: Respetar tiempo de viaje entre reuniones consecutivas",
+        "C3: No reuniones solapadas (por dia)",
+        "C4: Duracion minima respetada",
+        f"C5: Horario {_time_str(DAY_START)}-{_time_str(DAY_END)}",
+        f"C6: Reunirse con al menos {MIN_PEOPLE} de {len(PARTICIPANTS)} personas",
+        f"C7: Cada persona en su dia correcto{c7}",
+        f"C8: Empezar en {START_LOCATION} cada dia",
+        f"C9: Prerequisites: {_prereq_pairs(' DESPUES de ') or 'ninguno'}",
+        "C10: No repetir persona",
+        f"C11: {c11[:1].upper()}{c11[1:]}",
+    ])
+
+
+def full_problem_description() -> str:
+    """Participants grouped by day (flexible ones under the first) and every travel time spelled out."""
+    lines = [f"Planificar reuniones con {len(PARTICIPANTS)} amigos en {_days_text()} "
+             f"({_time_str(DAY_START)}-{_time_str(DAY_END)} cada dia). Empiezas en {START_LOCATION} cada dia.",
+             "", "PERSONAS, UBICACION, DIA, DISPONIBILIDAD Y DURACION:"]
+    for day in DAYS:
+        todays = [(name, p) for name, p in PARTICIPANTS.items() if p["day"] == day or (p["day"] == 0 and day == DAYS[0])]
+        if not todays:
+            continue
+        lines.append(f"DIA {day}:")
+        for name, p in todays:
+            notes = ""
+            if p["day"] == 0:
+                notes += f" (puede ser {' O '.join(f'dia {d}' for d in DAYS)})"
+            if "prereq" in p:
+                notes += f" (PREREQUISITO: reunirse con {p['prereq']} antes)"
+            lines.append(f"- {name}: {p['location']}, {_time_str(p['avail_start'])}-{_time_str(p['avail_end'])}, "
+                         f"{p['duration']}min{notes}")
+        lines.append("")
+    lines.append("TIEMPOS DE VIAJE (minutos):")
+    for i, a in enumerate(LOCATIONS[:-1]):
+        lines.append(f"{a} <-> " + ", ".join(f"{b}: {get_travel_time(a, b)}" for b in LOCATIONS[i + 1:]))
+    return "\n".join(lines) + "\n\n" + CONSTRAINTS
+
+
+CONSTRAINTS = constraints_text()
+FULL_PROBLEM_DESCRIPTION = full_problem_description()
+
+
+def compact_problem_description() -> str:
+    """Participants as one row each and travel times as a matrix, generated from evaluator data."""
+    codes = {loc: f"L{i}" for i, loc in enumerate(LOCATIONS)}
+    lines = [
+        f"Planificar reuniones con {len(PARTICIPANTS)} amigos en {_days_text()} ({_time_str(DAY_START)}-{_time_str(DAY_END)} "
+        f"cada dia). Empiezas en {START_LOCATION} ({codes[START_LOCATION]}) cada dia.",
+        "",
+        f"PERSONAS (persona lugar dia ventana min [prereq]; dia 0 = dia {_DAY_CHOICES}):",
+    ]
+    for name, p in PARTICIPANTS.items():
+        prereq = f" despues:{p['prereq']}" if "prereq" in p else ""
+        lines.append(f"{name} {codes[p['location']]} {p['day']} {_time_str(p['avail_start'])}-{_time_str(p['avail_end'])} {p['duration']}{prereq}")
+    lines += ["", "LUGARES: " + ", ".join(f"{code}={loc}" for loc, code in codes.items()), "",
+              "VIAJE (min):", "    " + " ".join(f"{c:>3}" for c in codes.values())]
+    for a in LOCATIONS:
+        lines.append(f"{codes[a]:<4}" + " ".join(f"{get_travel_time(a, b):>3}" for b in LOCATIONS))
+    return "\n".join(lines) + "\n\n" + CONSTRAINTS
+
+
+PROBLEM_DESCRIPTION = compact_problem_description() if PROMPT_FORMAT == "compact" else FULL_PROBLEM_DESCRIPTION
 
 JSON_FORMAT = '{"meetings": [{"person": "X", "day": 1, "start": "HH:MM", "end": "HH:MM"}, ...]}'
 
-INIT_PROMPT = f"""Eres un planificador experto. Genera un plan de reuniones de 2 dias.
+_INIT_PREREQS = f"- Respeta prerrequisitos: {_prereq_pairs(' despues de ')}\n" if _prereq_pairs("") else ""
+
+# Identical leading text of INIT / CRITIC / AUTHOR / CROSSOVER (cacheable prefix)
+PREFIX = f"{PROBLEM_DESCRIPTION}\n\n"
 
-{PROBLEM_DESCRIPTION}
+INIT_PROMPT = f"""{PREFIX}Eres un planificador experto. Genera un plan de reuniones de {_days_text()}.
 
 IMPORTANTE:
 - Calcula tiempos de viaje EXACTOS entre ubicaciones consecutivas
 - Verifica que cada reunion empiece DESPUES de llegar (fin anterior + viaje)
-- Respeta prerrequisitos: Bruno despues de Ana, Hugo despues de Gaby, Javier despues de Isabel
-- NO incluyas comentarios en el JSON
+{_INIT_PREREQS}- NO incluyas comentarios en el JSON
 
 Responde SOLO con JSON valido, sin comentarios.
 Formato: {JSON_FORMAT}"""
 
-CRITIC_PROMPT = f"""Eres un auditor de planes de reuniones de 2 dias.
-
-{PROBLEM_DESCRIPTION}
+CRITIC_PROMPT = f"""{PREFIX}Eres un auditor de planes de reuniones de {_days_text()}.
 
 PLAN A EVALUAR:
 <<solution>>
@@ -70,9 +133,7 @@ VIOLACIONES DETECTADAS:
 Analiza las violaciones. Para CADA una indica el cambio exacto: que persona mover, a que hora, teniendo en cuenta el tiempo de viaje. Max 6 bullet points.
 NO incluyas JSON."""
 
-AUTHOR_PROMPT = f"""Eres un planificador que corrige planes de reuniones de 2 dias.
-
-{PROBLEM_DESCRIPTION}
+AUTHOR_PROMPT = f"""{PREFIX}Eres un planificador que corrige planes de reuniones de {_days_text()}.
 
 PLAN ANTERIOR:
 <<solution>>
@@ -84,9 +145,7 @@ Aplica TODOS los cambios. Recalcula tiempos de viaje. Verifica prerrequisitos.
 Responde SOLO con JSON valido corregido.
 Formato: {JSON_FORMAT}"""
 
-CROSSOVER_PROMPT = f"""Eres un optimizador de planes de reuniones de 2 dias.
-
-{PROBLEM_DESCRIPTION}
+CROSSOVER_PROMPT = f"""{PREFIX}Eres un optimizador de planes de reuniones de {_days_text()}.
 
 Combina los mejores aspectos de dos planes. Toma reuniones sin violaciones de cada padre.
 
@@ -99,3 +158,79 @@ PADRE B (score <<score_b>>):
 Recalcula tiempos de viaje para el plan combinado. Verifica prerrequisitos.
 Responde SOLO con JSON valido.
 Formato: {JSON_FORMAT}"""
+
+# Targeted re-ask for an unparseable plan: no problem description, just the bad output and the error
+REASK_PROMPT = f"""Tu respuesta anterior no es un plan JSON valido.
+
+ERROR: <<error>>
+
+RESPUESTA ANTERIOR:
+<<response>>
+
+Devuelve el MISMO plan corregido. Responde SOLO con JSON valido, sin comentarios ni texto extra.
+Formato: {JSON_FORMAT}"""
+
+TEMPLATES = {"init": INIT_PROMPT, "critic": CRITIC_PROMPT, "author": AUTHOR_PROMPT,
+             "crossover": CROSSOVER_PROMPT, "reask": REASK_PROMPT}
+
+
+@lru_cache(maxsize=None)
+def prompt_set(fmt: str = PROMPT_FORMAT) -> dict[str, str]:
+    """TEMPLATES with the full or compact problem text as prefix (a run picks its format via RunConfig)."""
+    description = compact_problem_description() if fmt == "compact" else FULL_PROBLEM_DESCRIPTION
+    return {name: template.replace(PROBLEM_DESCRIPTION, description, 1) for name, template in TEMPLATES.items()}
+
+
+# ── Token report ──
+CACHE_MIN_TOKENS = 1024  # OpenAI only caches prompts (and prefixes) at least this long
+
+# Typical variable content per prompt type, for the report
+_SAMPLE_PLAN = '{"meetings": [' + ", ".join(
+    f'{{"person": "{name}", "day": {max(p["day"], 1)}, "start": "{_time_str(p["avail_start"])}", '
+    f'"end": "{_time_str(p["avail_start"] + p["duration"])}"}}' for name, p in PARTICIPANTS.items()) + "]}"
+_SAMPLE_FILL = {
+    "<<solution>>": _SAMPLE_PLAN, "<<parent_a>>": _SAMPLE_PLAN, "<<parent_b>>": _SAMPLE_PLAN,
+    "<<score_a>>": "0.82", "<<score_b>>": "0.76", "<<response>>": _SAMPLE_PLAN[:-2], "<<error>>": "Invalid JSON",
+    "<<feedback>>": "C2: Bruno llega tarde (viaje 20min); C9: Hugo antes de Gaby",
+    "<<critique>>": "- Mover Bruno a 10:20\n- Mover Hugo despues de Gaby (10:00)",
+}
+
+
+@lru_cache(maxsize=None)
+def _encoder():
+    """tiktoken's o200k_base (gpt-4.1), or None if tiktoken or its encoding file is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Exact gpt-4.1 token count via tiktoken, or a chars/4 estimate without it."""
+    enc = _encoder()
+    return len(enc.encode(text)) if enc is not None else len(text) // 4
+
+
+def token_report() -> str:
+    """Input tokens per prompt type (with sample content filled in), full vs compact problem text."""
+    full, compact = FULL_PROBLEM_DESCRIPTION, compact_problem_description()
+    lines = [f"{'prompt':<12}{'full':>8}{'compact':>9}{'saved':>8}"]
+    for name, template in TEMPLATES.items():
+        for key, value in _SAMPLE_FILL.items():
+            template = template.replace(key, value)
+        n_full = count_tokens(template.replace(PROBLEM_DESCRIPTION, full))
+        n_compact = count_tokens(template.replace(PROBLEM_DESCRIPTION, compact))
+        lines.append(f"{name:<12}{n_full:>8}{n_compact:>9}{n_full - n_compact:>8}")
+    prefix_full, prefix_compact = count_tokens(full + "\n\n"), count_tokens(compact + "\n\n")
+    lines.append(f"{'prefix':<12}{prefix_full:>8}{prefix_compact:>9}{prefix_full - prefix_compact:>8}")
+    lines.append(f"(shared prefix is cacheable by the provider once it reaches {CACHE_MIN_TOKENS} tokens; "
+                 f"active format: {PROMPT_FORMAT}; counts {'tiktoken o200k_base' if _encoder() else 'estimated, chars/4'})")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if "--show" in sys.argv:
+        print(PROBLEM_DESCRIPTION)
+    else:
+        print(token_report())
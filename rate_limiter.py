@@ -0,0 +1,122 @@
+"""
+Client-side rate limiter shared by every LLM caller (sync, threads, asyncio).
+
+Two token buckets (requests/minute and tokens/minute) are drawn down *before*
+each call so we stay under quota proactively. When the provider still answers
+429, its Retry-After header (or a jittered exponential backoff) pauses all
+callers, not just the one that was rejected.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0  # refill per second
+        self.level = per_minute
+        self.last = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` (the level may go negative) and return the seconds until it is covered."""
+        self.level = min(self.capacity, self.level + (now - self.last) * self.rate)
+        self.last = now
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+
+class RateLimiter:
+    def __init__(self, rpm: float = 500, tpm: float = 200_000):
+        self._requests = _Bucket(rpm)
+        self._tokens = _Bucket(tpm)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._requests.reserve(1, now), self._tokens.reserve(min(tokens, self._tokens.capacity), now))
+            return max(wait, self._blocked_until - now)
+
+    async def aacquire(self, tokens: int = 0):
+        """Wait until one request of ~`tokens` tokens fits in the quota."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (e.g. the provider's Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+def is_rate_limit(e: Exception) -> bool:
+    """HTTP 429, by status code or (for clients without one) in the message. Not any message mentioning "rate"."""
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status == 429
+    error_str = str(e)
+    return "429" in error_str or "RESOURCE_EXHAUSTED" in error_str
+
+
+def is_transient(e: Exception) -> bool:
+    """Server-side 5xx, timeouts and dropped connections: worth retrying, but not a quota signal."""
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status >= 500
+    return type(e).__name__ in ("APITimeoutError", "APIConnectionError", "TimeoutError", "ConnectTimeout", "ReadTimeout")
+
+
+def retry_after(e: Exception):
+    """Seconds from the Retry-After / retry-after-ms response headers, if present."""
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def backoff_delay(attempt: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    d = min(cap, base * 2 ** attempt)
+    return d / 2 + random.uniform(0, d / 2)
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough TPM charge: ~4 chars per prompt token plus the completion budget."""
+    return len(prompt) // 4 + max_tokens
+
+
+# ── Limiter singleton ──
+_limiter = None
+
+
+_share = 1  # processes splitting the quota (see share_limits)
+
+
+def get_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(
+            rpm=float(os.environ.get("LLM_RPM", "500")) / _share,
+            tpm=float(os.environ.get("LLM_TPM", "200000")) / _share,
+        )
+    return _limiter
+
+
+def share_limits(processes: int):
+    """This process gets 1/`processes` of LLM_RPM / LLM_TPM (each worker process has its own limiter)."""
+    global _share, _limiter
+    _share = max(1, processes)
+    _limiter = None
@@ -0,0 +1,140 @@
+"""
+Deterministic CPU repair operator (NO LLM).
+Re-times, reorders and drops meetings until a plan has no violations,
+using the evaluator's participant table and travel times.
+"""
+
+import json
+from functools import lru_cache
+from itertools import combinations, permutations
+
+from evaluator import PARTICIPANTS, DAYS, DAY_START, DAY_END, START_LOCATION, _parse_time, _time_str, get_travel_time
+
+MAX_ORDERINGS = 5040  # permutations tried per candidate subset of a day (7!)
+MAX_EXACT_PERSONS = 8  # larger days (generated instances) are repaired greedily
+
+
+def _schedule(order: list[str]):
+    """Earliest-start timing for a fixed visiting order. Returns [(person, start, end)] or None."""
+    t, loc = DAY_START, START_LOCATION
+    out = []
+    for person in order:
+        info = PARTICIPANTS[person]
+        start = max(t + get_travel_time(loc, info["location"]), info["avail_start"])
+        end = start + info["duration"]
+        if end > info["avail_end"] or end > DAY_END:
+            return None
+        out.append((person, start, end))
+        t, loc = end, info["location"]
+    return out
+
+
+def _respects_prereqs(order: tuple, earlier: set) -> bool:
+    """C9: each prerequisite is met on an earlier day or earlier in this day's order."""
+    pos = {p: i for i, p in enumerate(order)}
+    for person in order:
+        prereq = PARTICIPANTS[person].get("prereq")
+        if prereq and prereq not in earlier and pos.get(prereq, len(order)) > pos[person]:
+            return False
+    return True
+
+
+@lru_cache(maxsize=4096)
+def _best_day(persons: tuple, earlier: frozenset):
+    """
+    Feasible schedule keeping as many of `persons` as possible. The given order
+    is tried first, then other orderings, then subsets with fewer people.
+    Memoized: trying to move a flexible person only re-plans the days it changes.
+    """
+    if len(persons) > MAX_EXACT_PERSONS:
+        return _greedy_day(persons, earlier)
+    for size in range(len(persons), 0, -1):
+        for subset in combinations(persons, size):
+            for n, order in enumerate(permutations(subset)):
+                if n >= MAX_ORDERINGS:
+                    break
+                if not _respects_prereqs(order, earlier):
+                    continue
+                sched = _schedule(list(order))
+                if sched is not None:
+                    return sched
+    return []
+
+
+def _greedy_day(persons: tuple, earlier: frozenset):
+    """Keep each person, in the given order, whose meeting still fits after the ones kept so far."""
+    order = []
+    for person in persons:
+        trial = order + [person]
+        if _respects_prereqs(tuple(trial), earlier) and _schedule(trial) is not None:
+            order = trial
+    return _schedule(order) or []
+
+
+def _plan_days(days: dict[int, list[str]]) -> dict[int, list]:
+    schedule = {}
+    met = set()
+    for day in sorted(days):
+        # Only this day's prerequisites met earlier matter (and keep the cache key small)
+        needed = frozenset(PARTICIPANTS[p]["prereq"] for p in days[day] if "prereq" in PARTICIPANTS[p]) & met
+        schedule[day] = _best_day(tuple(days[day]), needed)
+        met |= {person for person, _, _ in schedule[day]}
+    return schedule
+
+
+def repair(solution_json: str):
+    """
+    Return a violation-free version of the plan as a JSON string, or None when
+    the text cannot be parsed into meetings. People already in the plan are
+    kept where possible; missing participants are not added.
+    """
+    try:
+        plan = json.loads(solution_json)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    meetings = plan.get("meetings") if isinstance(plan, dict) else plan
+    if not isinstance(meetings, list):
+        return None
+
+    # Keep the first occurrence of each known person (C10), in start-time order
+    days = {day: [] for day in DAYS}
+    seen = set()
+    keyed = []
+    for m in meetings:
+        if not isinstance(m, dict):
+            continue
+        person = m.get("person")
+        if not isinstance(person, str) or person not in PARTICIPANTS or person in seen:
+            continue
+        seen.add(person)
+        fixed = PARTICIPANTS[person]["day"]
+        day = m.get("day") if fixed == 0 else fixed  # C7: fixed days are forced
+        if day not in DAYS:
+            day = DAYS[0]
+        start = _parse_time(m.get("start", "")) if isinstance(m.get("start"), str) else -1
+        keyed.append((start if start >= 0 else DAY_END, person, day))
+    if not keyed:
+        return None
+    for _, person, day in sorted(keyed):
+        days[day].append(person)
+
+    schedule = _plan_days(days)
+
+    # Flexible people (day 0) may do better on another day
+    for person in [p for d in days for p in days[d] if PARTICIPANTS[p]["day"] == 0]:
+        here = next(d for d in days if person in days[d])
+        kept = sum(len(s) for s in schedule.values())
+        for there in DAYS:
+            if there == here:
+                continue
+            moved = {**days, here: [p for p in days[here] if p != person], there: days[there] + [person]}
+            alt = _plan_days(moved)
+            if sum(len(s) for s in alt.values()) > kept:
+                days, schedule = moved, alt
+                break
+
+    out = [
+        {"person": person, "day": day, "start": _time_str(start), "end": _time_str(end)}
+        for day in DAYS for person, start, end in schedule[day]
+    ]
+    return json.dumps({"meetings": out}, ensure_ascii=False)
@@ -0,0 +1,290 @@
+"""
+Per-run reports over metrics.csv files of any size.
+
+The metrics file is streamed in fixed-size chunks and folded into small
+per-run aggregates (per generation and per island: best / avg / worst, plus
+the LLM calls at which each score level was first reached), so memory grows
+with runs x generations x islands, never with the row count. The aggregates
+are cached next to the file together with the byte offset they cover; the
+next report only reads rows appended since, and rebuilds when the file was
+replaced or truncated.
+
+Usage:
+  python report.py                                # summary table of every run in metrics.csv
+  python report.py --runs run_a run_b --chart     # + one chart per requested run
+  python report.py --last 5 --islands             # 5 most recent runs, with per-island tables
+  python report.py --metrics sweeps/*/*/metrics.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+
+from metrics import METRICS_FILE
+
+REPORT_DIR = os.path.join(os.path.dirname(__file__), "reports")
+LEVELS = (0.5, 0.6, 0.7, 0.8, 0.9, 1.0)  # score levels for "LLM calls to reach"
+CHUNK_BYTES = 8 * 1024 * 1024
+CACHE_SUFFIX = ".report-cache.json"
+CACHE_VERSION = 1
+
+# Per-(generation | island+generation) stats: [best, total, count, worst, llm_calls]
+_BEST, _TOTAL, _COUNT, _WORST, _CALLS = range(5)
+
+
+# ── Aggregation ──
+
+def _new_run() -> dict:
+    return {"first_seen": "", "gens": {}, "islands": {}, "calls_to": {}}
+
+
+def _fold(stats: dict, key: str, score: float, calls: int):
+    s = stats.get(key)
+    if s is None:
+        stats[key] = [score, score, 1, score, calls]
+        return
+    if score > s[_BEST]:
+        s[_BEST] = score
+    elif score < s[_WORST]:
+        s[_WORST] = score
+    s[_TOTAL] += score
+    s[_COUNT] += 1
+    if calls > s[_CALLS]:
+        s[_CALLS] = calls
+
+
+_LEVEL_KEYS = [(level, f"{level:g}") for level in LEVELS]
+
+
+def _fold_rows(runs: dict, rows, columns: dict, run_ids: set = None):
+    """Fold csv rows into the per-run aggregates (keys are strings so the cache is plain JSON)."""
+    i_ts, i_run, i_gen = columns["timestamp"], columns["run_id"], columns["generation"]
+    i_island, i_score, i_calls = columns["island"], columns["score"], columns["llm_calls_total"]
+    low = LEVELS[0]
+    last_id, run = None, None
+    for row in rows:
+        try:
+            run_id = row[i_run]
+            if run_id != last_id:  # rows of one run are contiguous, so look the run up only on change
+                if run_ids is not None and run_id not in run_ids:
+                    continue
+                run = runs.get(run_id)
+                if run is None:
+                    run = runs[run_id] = _new_run()
+                    run["first_seen"] = row[i_ts]
+                last_id = run_id
+            gen, island = row[i_gen], row[i_island]
+            score, calls = float(row[i_score]), int(row[i_calls])
+        except (IndexError, ValueError):
+            continue  # header repeated by a concurrent writer, or a torn line
+        _fold(run["gens"], gen, score, calls)
+        _fold(run["islands"].setdefault(island, {}), gen, score, calls)
+        if score >= low:
+            calls_to = run["calls_to"]
+            for level, key in _LEVEL_KEYS:
+                if score < level:
+                    break
+                if calls < calls_to.get(key, calls + 1):
+                    calls_to[key] = calls
+
+
+def _scan(path: str, runs: dict, offset: int, columns: dict = None, run_ids: set = None) -> tuple[int, dict]:
+    """Stream complete lines from byte `offset` on. Returns (offset after the last complete line, columns)."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        carry = b""
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            data = carry + chunk
+            cut = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            lines = data[:cut].decode("utf-8").splitlines()
+            if columns is None and lines:
+                columns = {name: i for i, name in enumerate(next(csv.reader(lines[:1])))}
+                lines = lines[1:]
+            if lines:
+                _fold_rows(runs, csv.reader(lines), columns, run_ids)
+            offset += cut
+    return offset, columns or {}
+
+
+def _cache_path(path: str) -> str:
+    return path + CACHE_SUFFIX
+
+
+def _load_cache(path: str) -> dict:
+    try:
+        with open(_cache_path(path), encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    # Replaced or truncated file (e.g. deleted and re-created): the cached offset no longer applies
+    size = os.path.getsize(path)
+    if cache["offset"] > size or cache.get("head") != _head(path):
+        return {}
+    return cache
+
+
+def _head(path: str) -> str:
+    """First line of the file: identifies it across appends."""
+    with open(path, "rb") as f:
+        return f.readline(4096).decode("utf-8", "replace")
+
+
+def aggregate(path: str = METRICS_FILE, run_ids=None, use_cache: bool = True) -> dict:
+    """Per-run aggregates of one metrics file: {run_id: {"gens", "islands", "calls_to", "first_seen"}}."""
+    if not os.path.exists(path):
+        return {}
+    wanted = set(run_ids) if run_ids else None
+    if not use_cache:
+        runs = {}
+        _scan(path, runs, 0, run_ids=wanted)
+        return runs
+
+    cache = _load_cache(path)
+    runs = cache.get("runs", {})
+    offset, columns = _scan(path, runs, cache.get("offset", 0), cache.get("columns"))
+    if offset != cache.get("offset"):
+        tmp = _cache_path(path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "offset": offset, "head": _head(path),
+                       "columns": columns, "runs": runs}, f, separators=(",", ":"))
+        os.replace(tmp, _cache_path(path))
+    return {r: runs[r] for r in runs if wanted is None or r in wanted}
+
+
+def aggregate_files(paths: list[str], run_ids=None, use_cache: bool = True) -> dict:
+    """aggregate() over several files (e.g. every run dir of a sweep); a run_id spread over files is merged."""
+    merged = {}
+    for path in paths:
+        for run_id, run in aggregate(path, run_ids, use_cache).items():
+            if run_id not in merged:
+                merged[run_id] = run
+                continue
+            into = merged[run_id]
+            for gen, s in run["gens"].items():
+                _merge_stats(into["gens"], gen, s)
+            for island, gens in run["islands"].items():
+                for gen, s in gens.items():
+                    _merge_stats(into["islands"].setdefault(island, {}), gen, s)
+            for level, calls in run["calls_to"].items():
+                into["calls_to"][level] = min(calls, into["calls_to"].get(level, calls))
+    return merged
+
+
+def _merge_stats(stats: dict, key: str, s: list):
+    cur = stats.get(key)
+    if cur is None:
+        stats[key] = list(s)
+        return
+    cur[_BEST], cur[_WORST] = max(cur[_BEST], s[_BEST]), min(cur[_WORST], s[_WORST])
+    cur[_TOTAL] += s[_TOTAL]
+    cur[_COUNT] += s[_COUNT]
+    cur[_CALLS] = max(cur[_CALLS], s[_CALLS])
+
+
+# ── Series / tables ──
+
+def series(stats: dict) -> tuple[list[int], list[float], list[float], list[float]]:
+    """(generations, best, avg, worst) in generation order."""
+    gens = sorted(stats, key=int)
+    return ([int(g) for g in gens], [stats[g][_BEST] for g in gens],
+            [stats[g][_TOTAL] / stats[g][_COUNT] for g in gens], [stats[g][_WORST] for g in gens])
+
+
+def summary_table(runs: dict) -> str:
+    levels = [f"{level:g}" for level in LEVELS]
+    lines = [f"{'run_id':<28}{'gens':>5}{'best':>7}{'avg':>7}{'calls':>7}  calls to reach " + " ".join(f"{l:>5}" for l in levels)]
+    for run_id, run in runs.items():
+        gens, best, avg, _ = series(run["gens"])
+        last = run["gens"][str(gens[-1])] if gens else [0, 0, 1, 0, 0]
+        reach = " ".join(f"{run['calls_to'].get(l, '-'):>5}" for l in levels)
+        lines.append(f"{run_id[:27]:<28}{len(gens):>5}{max(best, default=0):>7.2f}"
+                     f"{avg[-1] if avg else 0:>7.2f}{last[_CALLS]:>7}                 {reach}")
+    return "\n".join(lines)
+
+
+def island_table(run: dict) -> str:
+    lines = [f"  {'island':<8}{'gens':>5}{'best':>7}{'final best':>12}{'final avg':>11}{'final worst':>13}"]
+    for island in sorted(run["islands"], key=int):
+        gens, best, avg, worst = series(run["islands"][island])
+        lines.append(f"  {island:<8}{len(gens):>5}{max(best):>7.2f}{best[-1]:>12.2f}{avg[-1]:>11.2f}{worst[-1]:>13.2f}")
+    return "\n".join(lines)
+
+
+# ── Charts ──
+
+def render_chart(run_id: str, run: dict, path: str) -> bool:
+    """Best/avg/worst per generation for one run, with each island's best as a thin line."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[report] matplotlib not installed")
+        return False
+
+    gens, best, avg, worst = series(run["gens"])
+    if not gens:
+        return False
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for island in sorted(run["islands"], key=int):
+        i_gens, i_best, _, _ = series(run["islands"][island])
+        ax.plot(i_gens, i_best, linewidth=0.8, alpha=0.5, label=f"Island {island} best")
+    ax.plot(gens, best, "g-o", label="Best", linewidth=2)
+    ax.plot(gens, avg, "b-s", label="Average", linewidth=1.5)
+    ax.plot(gens, worst, "r-^", label="Worst", linewidth=1)
+    ax.fill_between(gens, worst, best, alpha=0.1, color="blue")
+
+    ax.set_xlabel("Generation")
+    ax.set_ylabel("Score")
+    ax.set_title(f"Mind Evolution - {run_id}")
+    ax.legend(fontsize="small", ncol=2)
+    ax.set_ylim(0, 1.05)
+    ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close(fig)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mind Evolution v4 - per-run metrics report")
+    parser.add_argument("--metrics", nargs="+", default=[METRICS_FILE], help="metrics.csv file(s)")
+    parser.add_argument("--runs", nargs="+", default=None, help="only these run_ids")
+    parser.add_argument("--last", type=int, default=None, help="only the N most recent runs")
+    parser.add_argument("--islands", action="store_true", help="per-island table for each run")
+    parser.add_argument("--chart", action="store_true", help="one chart per run in --out")
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="re-read the files, don't read/write aggregate caches")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    runs = aggregate_files(args.metrics, args.runs, use_cache=not args.no_cache)
+    if args.last:
+        runs = dict(sorted(runs.items(), key=lambda kv: kv[1]["first_seen"])[-args.last:])
+    if not runs:
+        print("[report] No matching runs")
+        return
+    print(f"[report] {len(runs)} run(s) from {len(args.metrics)} file(s) in {time.perf_counter() - t0:.2f}s\n")
+    print(summary_table(runs))
+
+    for run_id, run in runs.items():
+        if args.islands:
+            print(f"\n{run_id}:")
+            print(island_table(run))
+        if args.chart:
+            os.makedirs(args.out, exist_ok=True)
+            path = os.path.join(args.out, f"{run_id}.png")
+            if render_chart(run_id, run, path):
+                print(f"[report] Chart saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Per-run configuration for Mind Evolution v4.
+
+A RunConfig travels with each graph invocation in config["configurable"]["run"],
+so nodes never read module globals and several configurations can run in one
+process (see sweep.py).
+"""
+
+import os
+from dataclasses import asdict, dataclass, field, fields
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    run_id: str = "default"
+    islands: int = 3
+    pop_size: int = 4
+    max_generations: int = 6
+    seed: int | None = None              # mock backend seed / OpenAI best-effort seed
+
+    # LLM
+    backend: str = field(default_factory=lambda: os.environ.get("LLM_BACKEND", "openai"))  # openai | mock
+    llm_concurrency: int = 8             # max in-flight async LLM calls
+    structured_output: bool = False      # schema-constrained JSON (OpenAI json_schema) instead of free text
+    max_reasks: int = 1                  # short re-asks for an unparseable plan before it enters the population
+    stream_plans: bool = False           # stream plan responses and stop reading once the JSON object closes
+    prompt_format: str = field(default_factory=lambda: os.environ.get("PROMPT_FORMAT", "full"))  # full | compact
+
+    # Repair operator
+    use_repair: bool = True              # try the CPU repair operator before RCC
+    repair_target: float = 1.0           # repaired children scoring at least this skip RCC
+
+    # Memetic local search (local_search.py) between LLM generations
+    local_search: bool = False           # hill-climb each island's best individuals with CPU mutation operators
+    local_search_top: int = 2            # individuals climbed per island
+    local_search_evals: int = 2000       # candidate evaluations per climb
+    local_search_workers: int | None = None  # worker processes (None = one per CPU, 0 = in this process)
+
+    # Stopping
+    target_score: float | None = None    # stop evolving once best_score reaches this (e.g. solver.known_optimum())
+    stagnation_limit: int | None = None  # stop after this many generations without a best_score improvement
+    max_llm_calls: int | None = None     # stop once llm_call_count reaches this budget
+    max_wall_seconds: float | None = None  # stop once the run has taken this long
+
+    # Asynchronous island model (island_model.py): one process per island, elites routed by a broker
+    migration_topology: str = "ring"     # ring | star (island 1 is the hub) | random
+    migration_interval: int = 2          # an island sends its elites every N of its own generations
+    migration_size: int = 1              # elites per migration
+
+    # Output: None = the shared metrics.csv / perf.csv; else <output_dir>/<run_id>/
+    output_dir: str | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunConfig":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in d.items() if k in names})
+
+    def run_dir(self) -> str | None:
+        return os.path.join(self.output_dir, self.run_id) if self.output_dir else None
+
+
+def get_run_config(config) -> RunConfig:
+    """The RunConfig of a graph invocation (defaults when none was passed)."""
+    return ((config or {}).get("configurable") or {}).get("run") or RunConfig()
+
+
+def graph_config(cfg: RunConfig, thread_id: str = None) -> dict:
+    """LangGraph invoke config for one run."""
+    configurable = {"run": cfg}
+    if thread_id is not None:
+        configurable["thread_id"] = thread_id
+    return {
+        "configurable": configurable,
+        # init + eval + (evolve, eval[, local_search]) per gen + migrate + select
+        "recursion_limit": (3 if cfg.local_search else 2) * cfg.max_generations + 10,
+    }
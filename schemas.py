@@ -0,0 +1,31 @@
+"""
+Typed schema for the meeting-plan output format.
+
+Used two ways: bound as the OpenAI `response_format` (strict json_schema, so the
+model can only emit {"meetings": [...]}) and to validate free-text responses
+before they are allowed into the population.
+"""
+
+from pydantic import BaseModel, ValidationError
+
+
+class Meeting(BaseModel):
+    person: str
+    day: int
+    start: str  # "HH:MM"
+    end: str    # "HH:MM"
+
+
+class MeetingPlan(BaseModel):
+    meetings: list[Meeting]
+
+
+def plan_error(text: str) -> str:
+    """Empty if `text` is a valid meeting plan, else a short description of the first problem."""
+    try:
+        MeetingPlan.model_validate_json(text)
+    except ValidationError as e:
+        err = e.errors()[0]
+        where = ".".join(str(p) for p in err["loc"])
+        return f"{where}: {err['msg']}" if where else err["msg"]
+    return ""
@@ -0,0 +1,189 @@
+"""
+Exact bitmask-DP solver for the meeting-planner instance (NO LLM).
+
+For each day, a subset DP over (visited set, last person) keeps the earliest
+finishing time; waiting is allowed, so the earliest end dominates. Every
+feasible day-1 set is combined with the feasible day-2 sets it enables
+(prerequisites may be met on an earlier day), and the best score wins.
+
+The search covers "clean" plans: every meeting inside its window, with
+travel, ordering and prerequisites respected. If the best clean score is 1.0
+it is the global optimum; otherwise it is only the best violation-free score
+(a plan meeting more people with a penalized violation may score higher).
+
+The DP is exponential in the participants available on a day, so instances
+with more than MAX_DP_CANDIDATES of them only have the optimum stored in their
+instance file (generated instances store 1.0).
+
+Usage: python solver.py [--json]
+"""
+
+import json
+import sys
+import time
+from functools import lru_cache
+
+from evaluator import (PARTICIPANTS, DAYS, DAY_START, DAY_END, MIN_PEOPLE, MIN_PER_DAY, PROBLEM, START_LOCATION,
+                       _time_str, _score, get_travel_time)
+
+MAX_DP_CANDIDATES = 16  # 2^16 subsets x 16^2 transitions per day is still seconds
+
+
+def _day_candidates(day: int) -> list[str]:
+    return [p for p, info in PARTICIPANTS.items() if info["day"] in (0, day)]
+
+
+@lru_cache(maxsize=None)
+def _solve_day(candidates: tuple, earlier: frozenset) -> dict[int, list]:
+    """
+    Subset DP for one day. Returns {mask: schedule} for every feasible set of
+    candidates, where schedule is [(person, start, end)] in visiting order.
+    """
+    n = len(candidates)
+    # best[(mask, last)] = (end time, parent key, start)
+    best = {}
+    for j, person in enumerate(candidates):
+        info = PARTICIPANTS[person]
+        prereq = info.get("prereq")
+        if prereq and prereq not in earlier:
+            continue
+        start = max(DAY_START + get_travel_time(START_LOCATION, info["location"]), info["avail_start"])
+        end = start + info["duration"]
+        if end <= info["avail_end"] and end <= DAY_END:
+            best[(1 << j, j)] = (end, None, start)
+
+    # Masks only grow, so visiting them in increasing order is a valid topological order
+    for mask in range(1, 1 << n):
+        for last in range(n):
+            key = (mask, last)
+            if key not in best:
+                continue
+            t, _, _ = best[key]
+            loc = PARTICIPANTS[candidates[last]]["location"]
+            for j, person in enumerate(candidates):
+                if mask & (1 << j):
+                    continue
+                info = PARTICIPANTS[person]
+                prereq = info.get("prereq")
+                if prereq and prereq not in earlier:
+                    if prereq not in candidates or not mask & (1 << candidates.index(prereq)):
+                        continue
+                start = max(t + get_travel_time(loc, info["location"]), info["avail_start"])
+                end = start + info["duration"]
+                if end > info["avail_end"] or end > DAY_END:
+                    continue
+                nkey = (mask | (1 << j), j)
+                if nkey not in best or end < best[nkey][0]:
+                    best[nkey] = (end, key, start)
+
+    schedules = {}
+    for key, (end, _, _) in best.items():
+        mask = key[0]
+        if mask in schedules:
+            continue
+        sched = []
+        k = key
+        while k is not None:
+            e, parent, s = best[k]
+            sched.append((candidates[k[1]], s, e))
+            k = parent
+        schedules[mask] = sched[::-1]
+    schedules[0] = []
+    return schedules
+
+
+def _persons(candidates: tuple, mask: int) -> frozenset:
+    return frozenset(p for j, p in enumerate(candidates) if mask & (1 << j))
+
+
+def solvable() -> bool:
+    return all(len(_day_candidates(day)) <= MAX_DP_CANDIDATES for day in DAYS)
+
+
+def solve():
+    """Return (best score, best plan JSON) over all clean plans."""
+    if not solvable():
+        raise ValueError(f"{PROBLEM.name}: more than {MAX_DP_CANDIDATES} participants on a day, too large for the exact solver")
+    best_score, best_plan = -1.0, None
+
+    def search(day_idx: int, met: frozenset, plan: list):
+        nonlocal best_score, best_plan
+        if day_idx == len(DAYS):
+            score = _score(len(met), len(_clean_violations(len(met), plan)))
+            if score > best_score:
+                best_score, best_plan = score, list(plan)
+            return
+        day = DAYS[day_idx]
+        candidates = tuple(p for p in _day_candidates(day) if p not in met)
+        # Only prerequisites met earlier matter to this day's DP
+        relevant = frozenset(p for p in met if any(PARTICIPANTS[c].get("prereq") == p for c in candidates))
+        for mask, sched in _solve_day(candidates, relevant).items():
+            search(day_idx + 1, met | _persons(candidates, mask), plan + [(day, sched)])
+            if best_score >= 1.0:
+                return
+
+    search(0, frozenset(), [])
+    meetings = [
+        {"person": person, "day": day, "start": _time_str(start), "end": _time_str(end)}
+        for day, sched in best_plan for person, start, end in sched
+    ]
+    return best_score, json.dumps({"meetings": meetings}, ensure_ascii=False)
+
+
+def _clean_violations(people_met: int, plan: list) -> list[str]:
+    """C6 and C11 are the only violations a clean plan can still have."""
+    per_day = {day: len(sched) for day, sched in plan}
+    violations = []
+    if people_met < MIN_PEOPLE:
+        violations.append("C6")
+    for day in DAYS:
+        if per_day.get(day, 0) < MIN_PER_DAY[day]:
+            violations.append("C11")
+    return violations
+
+
+@lru_cache(maxsize=1)
+def best_clean_score() -> float | None:
+    """Best violation-free score (computed once per process); None when the instance is too large for the DP."""
+    return solve()[0] if solvable() else None
+
+
+def known_optimum() -> float | None:
+    """
+    The instance's true optimum when it is known: stored in the instance file,
+    or a best clean score of 1.0 (nothing scores higher). None otherwise.
+    """
+    if PROBLEM.optimum is not None:
+        return PROBLEM.optimum
+    clean = best_clean_score()
+    return clean if clean == 1.0 else None
+
+
+def reference_score() -> tuple[float | None, str]:
+    """
+    What a run's best score is compared against in runs.csv / sweep.csv:
+    (score, "optimum") when the optimum is known, else (best clean score,
+    "best_clean"), a lower bound that runs may beat (negative gap).
+    """
+    optimum = known_optimum()
+    if optimum is not None:
+        return optimum, "optimum"
+    clean = best_clean_score()
+    return (clean, "best_clean") if clean is not None else (None, "")
+
+
+def main():
+    t0 = time.perf_counter()
+    score, plan = solve()
+    elapsed = (time.perf_counter() - t0) * 1000
+    if "--json" in sys.argv[1:]:
+        print(json.dumps({"best_clean_score": score, "optimal": score == 1.0, "plan": json.loads(plan),
+                          "elapsed_ms": round(elapsed, 2)}, ensure_ascii=False))
+        return
+    kind = "optimal" if score == 1.0 else "best violation-free; the optimum may be higher"
+    print(f"[SOLVER] Best clean score: {score:.3f} ({kind}) ({elapsed:.1f} ms)")
+    print(json.dumps(json.loads(plan), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
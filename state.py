@@ -2,35 +2,91 @@
 State definition for Mind Evolution v4 pipeline.
 """
 
-from typing import TypedDict
+import json
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Any, TypedDict
+
+
+def new_uid() -> str:
+    return uuid.uuid4().hex[:10]
+
+
+@dataclass(slots=True)
+class Individual:
+    """One candidate plan. The raw LLM text is parsed once, when the record is created."""
+    text: str
+    plan: Any = None            # json.loads(text), or None if json_ok is False
+    json_ok: bool = False
+    score: float = 0.0
+    result: Any = None          # evaluator.EvalResult once scored
+    evaluated: bool = False
+    origin: str = "init"        # init | crossover | repair | rcc | migrant | local
+    parents: tuple = ()         # uids of the parents this one was bred from
+    born: int = 0               # generation it was created in
+    uid: str = field(default_factory=new_uid)
+
+    def __post_init__(self):
+        self.parents = tuple(self.parents)  # checkpoints hand tuples back as lists
+
+    @classmethod
+    def from_text(cls, text: str, **kw) -> "Individual":
+        try:
+            return cls(text, json.loads(text), True, **kw)
+        except (json.JSONDecodeError, TypeError):
+            return cls(text, None, False, **kw)
+
+    def scored(self, result) -> "Individual":
+        """Copy with fitness filled in (records in state are never mutated in place)."""
+        return replace(self, score=result.score, result=result, evaluated=True)
+
+    @property
+    def feedback(self) -> str:
+        """Violation messages for the critic prompt, rendered on first use."""
+        return self.result.feedback if self.result is not None else ""
+
+    @property
+    def violations(self) -> int:
+        return len(self.result.violations) if self.result is not None else 0
+
+    @property
+    def violation_counts(self) -> dict:
+        """Violations per constraint code (see evaluator.EvalResult.counts)."""
+        return self.result.counts if self.result is not None else {}
 
 
 class MindEvolutionState(TypedDict, total=False):
-    # Population (JSON strings) - up to 5 islands
-    island_1: list[str]
-    island_2: list[str]
-    island_3: list[str]
-    island_4: list[str]
-    island_5: list[str]
-
-    # Fitness
-    scores_1: list[float]
-    scores_2: list[float]
-    scores_3: list[float]
-    scores_4: list[float]
-    scores_5: list[float]
-
-    # Feedback
-    feedback_1: list[str]
-    feedback_2: list[str]
-    feedback_3: list[str]
-    feedback_4: list[str]
-    feedback_5: list[str]
+    # Population: islands[k] is island k+1 (any number of islands)
+    islands: list[list[Individual]]
 
     # Control
     generation: int
     max_generations: int
     llm_call_count: int
+    target_score: float       # optional stop target (e.g. solver optimum)
+    calls_to_target: int      # llm_call_count when target_score was first reached
+
+    # Stopping
+    stale_generations: int    # generations since best_score last improved
+    started_at: float         # wall-clock start (time.time())
+    stop_reason: str          # "" while running; target_score | max_generations | stagnation | llm_budget | time_budget
+
+    # Repair operator
+    repair_attempts: int
+    repair_successes: int
+    llm_calls_saved: int
+
+    # Memetic local search
+    local_search_evals: int   # candidate evaluations made by hill climbing
+    local_search_improved: int  # climbs that replaced their individual
+
+    # Plan parsing (every LLM call that must return a plan)
+    invalid_outputs: int      # unparseable responses (each one triggers a re-ask while max_reasks allows)
+    reasks: int               # targeted re-ask calls made
+    invalid_children: int     # plans admitted to the population still unparseable
+
+    # LLM response cache: per-prompt sample counters after the last LLM node (llm_cache.py), restored on resume
+    cache_ordinals: dict
 
     # Best
     best_solution: str
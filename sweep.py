@@ -0,0 +1,202 @@
+"""
+Experiment sweep runner for Mind Evolution v4.
+
+Runs every (islands, pop, gens, seed) combination of a grid as an independent
+graph invocation in a pool of worker processes. Each run carries its own
+RunConfig (no module-global patching) and writes metrics.csv, perf.csv,
+runs.csv and its console log to <out>/<run_id>/; the sweep summary goes to
+<out>/sweep.csv.
+
+All workers share one LLM concurrency budget (a cross-process semaphore held
+by every in-flight call), and the client-side LLM_RPM / LLM_TPM limits are
+split evenly between them.
+
+Usage:
+  python sweep.py --islands 2 4 --pop 4 8 --gens 4 --seeds 0 1 2 --workers 4 --backend mock
+  python sweep.py --islands 3 --pop 4 --gens 6 --seeds 0 1 --llm-budget 16 --out sweeps/nano
+  python sweep.py --problem problems/p100.json --islands 4 --pop 6 --gens 8 --seeds 0 1 --backend mock --local-search
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SWEEP_DIR = os.path.join(os.path.dirname(__file__), "sweeps")
+
+_SUMMARY_HEADERS = [
+    "run_id", "islands", "pop_size", "max_generations", "seed", "generations_run", "best_score",
+    "reference", "reference_gap", "llm_calls_total", "calls_to_optimum", "stop_reason", "wall_s", "error",
+]
+
+
+# ── Worker process ──
+
+def _init_worker(slots, workers: int):
+    """Share the global LLM budget and give each worker its slice of the rate limits."""
+    import metrics
+    import nodes
+    import rate_limiter
+    nodes.set_global_slots(slots)
+    rate_limiter.share_limits(workers)
+    if metrics.BACKGROUND_WRITER:  # each run still flushes the buffer when it ends (_run_one)
+        metrics.start_background_writer()
+
+
+def _run_one(cfg_dict: dict, reference: tuple) -> dict:
+    """One graph invocation; console output goes to <run dir>/log.txt. Returns its sweep.csv row."""
+    from run_config import RunConfig, graph_config
+    cfg = RunConfig.from_dict(cfg_dict)
+    reference_score, reference_kind = reference
+    run_dir = cfg.run_dir()
+    os.makedirs(run_dir, exist_ok=True)
+    row = {"run_id": cfg.run_id, "islands": cfg.islands, "pop_size": cfg.pop_size,
+           "max_generations": cfg.max_generations, "seed": cfg.seed, "error": ""}
+
+    t0 = time.perf_counter()
+    with open(os.path.join(run_dir, "log.txt"), "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        import instrumentation
+        import metrics
+        import nodes
+        from graph import build_graph
+        from llm_cache import get_cache
+        # A pooled worker runs many configs: start each one with fresh mock models (their
+        # per-prompt counters) and cache ordinals so a seed gives the same run on any worker.
+        nodes._llms.clear()
+        get_cache().reset_ordinals()
+        try:
+            metrics.init_csv(run_id=cfg.run_id, run_dir=run_dir)
+            instrumentation.init(run_id=cfg.run_id)
+            state = {"generation": 0, "max_generations": cfg.max_generations, "target_score": cfg.target_score,
+                     "llm_call_count": 0, "best_solution": "", "best_score": 0.0, "started_at": time.time(),
+                     "islands": []}
+            result = build_graph().invoke(state, graph_config(cfg))
+        except Exception as e:
+            print(f"[sweep] {cfg.run_id} failed: {e!r}")
+            row["error"] = repr(e)
+            return {**row, "wall_s": round(time.perf_counter() - t0, 2)}
+        finally:
+            metrics.flush()
+            instrumentation.flush()
+
+        metrics.log_run(cfg.islands, cfg.pop_size, cfg.max_generations, result["generation"], result["best_score"],
+                        reference_score, reference_kind, result["llm_call_count"], result.get("calls_to_target"),
+                        result.get("stop_reason", ""), run_id=cfg.run_id, run_dir=run_dir)
+        print(instrumentation.summary(cfg.run_id))
+
+    return {
+        **row,
+        "generations_run": result["generation"],
+        "best_score": round(result["best_score"], 3),
+        "reference": reference_kind,
+        "reference_gap": "" if reference_score is None else round(reference_score - result["best_score"], 3),
+        "llm_calls_total": result["llm_call_count"],
+        "calls_to_optimum": result.get("calls_to_target", ""),
+        "stop_reason": result.get("stop_reason") or "max_generations",
+        "wall_s": round(time.perf_counter() - t0, 2),
+    }
+
+
+# ── Grid ──
+
+def build_grid(base, islands, pops, gens, seeds) -> list:
+    """One RunConfig per (islands, pop, gens, seed), run_id i<I>_p<P>_g<G>_s<S>."""
+    return [replace(base, run_id=f"i{i}_p{p}_g{g}_s{s}", islands=i, pop_size=p, max_generations=g, seed=s)
+            for i, p, g, s in itertools.product(islands, pops, gens, seeds)]
+
+
+def run_sweep(configs: list, workers: int, llm_budget: int, reference: tuple) -> list[dict]:
+    """Run the configs across `workers` processes sharing `llm_budget` in-flight LLM calls."""
+    ctx = multiprocessing.get_context("spawn")  # fresh interpreter per worker: no inherited clients or event loops
+    slots = ctx.BoundedSemaphore(llm_budget)
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(slots, workers)) as pool:
+        futures = {pool.submit(_run_one, cfg.to_dict(), reference): cfg for cfg in configs}
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            status = f"ERROR {row['error']}" if row["error"] else (
+                f"best {row['best_score']:.3f} | {row['llm_calls_total']} calls | {row['stop_reason']}")
+            print(f"  [sweep] {len(rows)}/{len(configs)} {row['run_id']:<20} {status} | {row['wall_s']:.1f}s")
+    order = {cfg.run_id: i for i, cfg in enumerate(configs)}
+    return sorted(rows, key=lambda r: order[r["run_id"]])
+
+
+def write_summary(rows: list[dict], path: str):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=_SUMMARY_HEADERS)
+        w.writeheader()
+        w.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mind Evolution v4 - parallel experiment sweep")
+    parser.add_argument("--islands", type=int, nargs="+", default=[3])
+    parser.add_argument("--pop", type=int, nargs="+", default=[4])
+    parser.add_argument("--gens", type=int, nargs="+", default=[6])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="worker processes")
+    parser.add_argument("--llm-budget", type=int, default=16,
+                        help="max in-flight LLM calls across ALL workers")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="max in-flight LLM calls per run")
+    parser.add_argument("--backend", choices=("openai", "mock"), default=os.environ.get("LLM_BACKEND", "openai"))
+    parser.add_argument("--no-target", action="store_true", help="never stop early on score")
+    parser.add_argument("--stagnation", type=int, default=None)
+    parser.add_argument("--max-llm-calls", type=int, default=None)
+    parser.add_argument("--structured", action="store_true")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--compact-prompt", action="store_true")
+    parser.add_argument("--local-search", action="store_true",
+                        help="memetic local search between generations (in each worker process: the sweep is already parallel)")
+    parser.add_argument("--problem", default=None, help="problem instance file (default: PROBLEM_FILE or problems/default.json)")
+    parser.add_argument("--out", default=None, help="output directory (default: sweeps/<timestamp>)")
+    args = parser.parse_args()
+    if args.problem:
+        os.environ["PROBLEM_FILE"] = os.path.abspath(args.problem)  # inherited by the spawned workers
+
+    from run_config import RunConfig
+    from solver import reference_score
+    reference = reference_score()
+    optimum = reference[0] if reference[1] == "optimum" else None  # stop target only when it is the true optimum
+    out = args.out or os.path.join(SWEEP_DIR, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(out, exist_ok=True)
+
+    base = RunConfig(
+        backend=args.backend, llm_concurrency=min(args.llm_concurrency, args.llm_budget),
+        structured_output=args.structured, stream_plans=args.stream,
+        prompt_format="compact" if args.compact_prompt else os.environ.get("PROMPT_FORMAT", "full"),
+        target_score=None if args.no_target else optimum, stagnation_limit=args.stagnation,
+        max_llm_calls=args.max_llm_calls, output_dir=out, local_search=args.local_search, local_search_workers=0,
+    )
+    configs = build_grid(base, args.islands, args.pop, args.gens, args.seeds)
+
+    print("=" * 70)
+    print(f"  MIND EVOLUTION v4 - Sweep: {len(configs)} runs | {args.workers} workers | "
+          f"LLM budget {args.llm_budget} | backend {args.backend}")
+    print(f"  Output: {out}")
+    print("=" * 70)
+
+    t0 = time.perf_counter()
+    rows = run_sweep(configs, args.workers, args.llm_budget, reference)
+    summary_file = os.path.join(out, "sweep.csv")
+    write_summary(rows, summary_file)
+
+    failed = sum(1 for r in rows if r["error"])
+    print(f"\n[sweep] {len(rows) - failed}/{len(rows)} runs finished in {time.perf_counter() - t0:.1f}s"
+          f"{f' ({failed} failed)' if failed else ''}")
+    print(f"[sweep] Summary written to {summary_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""The batch and delta evaluators must return exactly what evaluate() returns."""
+
+import json
+import random
+
+import pytest
+
+from evaluator import (DAYS, PARTICIPANTS, MeetingDiff, evaluate, evaluate_batch, evaluate_child, evaluate_delta,
+                       evaluate_detailed, evaluate_plan, evaluate_plans)
+from local_search import OPERATORS
+from solver import solve
+
+PERSONS = list(PARTICIPANTS)
+
+
+def _meeting(rng):
+    """A meeting near the instance's values; sometimes an unknown person, an odd day or an unreadable time."""
+    start = rng.randint(7 * 60, 19 * 60)
+    end = start + rng.choice([10, 15, 30, 45, 60, 90])
+    m = {"person": rng.choice(PERSONS + ["Nadie"]), "day": rng.choice(DAYS),
+         "start": f"{start // 60:02d}:{start % 60:02d}", "end": f"{end // 60:02d}:{end % 60:02d}"}
+    if rng.random() < 0.1:
+        m["day"] = rng.choice([0, True, len(DAYS) + 1])
+    if rng.random() < 0.05:
+        m[rng.choice(["start", "end"])] = rng.choice(["25:99", "8h", ""])
+    return m
+
+
+def _plan(rng):
+    """The solver plan, perturbed, or a random meeting list (duplicates, unknown people, bad days / times)."""
+    if rng.random() < 0.5:
+        meetings = json.loads(solve()[1])["meetings"]
+        for _ in range(rng.randint(0, 3)):
+            i = rng.randrange(len(meetings))
+            meetings[i] = dict(_meeting(rng), person=meetings[i]["person"])
+        rng.shuffle(meetings)
+    else:
+        meetings = [_meeting(rng) for _ in range(rng.randint(1, len(PERSONS) + 2))]
+    return {"meetings": meetings}
+
+
+def _diff(meetings, rng):
+    """A local-search move, or a random replacement / removal / addition."""
+    if rng.random() < 0.6:
+        return rng.choice(OPERATORS)(meetings, rng)
+    n = len(meetings)
+    replaced = {i: _meeting(rng) for i in rng.sample(range(n), rng.randint(0, min(2, n)))}
+    removed = frozenset(rng.sample(range(n), rng.randint(0, min(1, n - 1))))
+    added = tuple(_meeting(rng) for _ in range(rng.randint(0, 1)))
+    return MeetingDiff(replaced, removed, added)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_evaluate(seed):
+    rng = random.Random(seed)
+    plans = [_plan(rng) for _ in range(200)]
+    texts = [json.dumps(p) for p in plans] + ["no es json", "[]", '{"meetings": 3}']
+    assert evaluate_batch(texts) == [evaluate(t) for t in texts]
+    assert evaluate_plans(plans) == [evaluate_plan(p) for p in plans]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_delta_matches_full(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        current = evaluate_detailed(_plan(rng))
+        for _ in range(25):  # a chain of children, each evaluated from the previous one
+            diff = _diff(list(current.meetings), rng)
+            if not diff:
+                continue
+            child = evaluate_delta(current, diff)
+            meetings = diff.apply(current.meetings)
+            assert child.result == evaluate_plan({"meetings": meetings})
+            assert evaluate_child(current, {"meetings": meetings}).result == child.result
+            if child.meetings:
+                current = child
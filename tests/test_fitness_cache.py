@@ -0,0 +1,45 @@
+"""FitnessCache keys must never merge plans whose scores differ."""
+
+import json
+
+import pytest
+
+from evaluator import FITNESS_CACHE, evaluate, evaluate_cached, evaluate_many_cached
+from solver import solve
+
+
+def _tied_plans():
+    """The solver plan with Ana and Carla both starting day 1 at 08:10, in both input orders."""
+    meetings = json.loads(solve()[1])["meetings"]
+    slots = {"Ana": ("08:10", "08:55"), "Carla": ("08:10", "09:10")}
+    for m in meetings:
+        if m["person"] in slots:
+            m["start"], m["end"] = slots[m["person"]]
+    i, j = [k for k, m in enumerate(meetings) if m["person"] in slots]
+    swapped = list(meetings)
+    swapped[i], swapped[j] = swapped[j], swapped[i]
+    return json.dumps({"meetings": meetings}), json.dumps({"meetings": swapped})
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    FITNESS_CACHE.clear()
+    yield
+    FITNESS_CACHE.clear()
+
+
+def test_same_start_order_is_not_merged():
+    a, b = _tied_plans()
+    assert evaluate(a).score != evaluate(b).score  # the stable per-day sort keeps input order on ties
+    for plan in (a, b, a, b):
+        assert evaluate_cached(plan) == evaluate(plan)
+    assert evaluate_many_cached([a, b]) == [evaluate(a), evaluate(b)]
+
+
+def test_order_only_plans_share_an_entry():
+    meetings = json.loads(solve()[1])["meetings"]
+    a = json.dumps({"meetings": meetings})
+    b = json.dumps({"meetings": meetings[::-1]})
+    assert evaluate_cached(a) == evaluate(a)
+    assert evaluate_cached(b) == evaluate(b)
+    assert FITNESS_CACHE.hits == 1
@@ -0,0 +1,34 @@
+"""LLMCache keys: one sample per request ordinal, kept apart between island processes."""
+
+from llm_cache import LLMCache
+
+
+def _key(cache, prompt="INIT"):
+    return cache.make_key("gpt-4.1-nano", 0.9, 1200, prompt)
+
+
+def test_repeated_prompt_gets_a_new_sample():
+    cache = LLMCache()
+    first, second = _key(cache), _key(cache)
+    assert first != second
+    cache.reset_ordinals()
+    assert _key(cache) == first
+
+
+def test_island_scopes_do_not_share_samples():
+    islands = []
+    for num in (1, 2):
+        cache = LLMCache()  # each island process starts with fresh ordinals
+        cache.set_scope(f"island{num}")
+        islands.append([_key(cache), _key(cache)])
+    assert not set(islands[0]) & set(islands[1])
+
+
+def test_ordinals_survive_a_checkpoint(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite"), mode="record")
+    _key(cache)
+    snapshot = cache.ordinals()
+    expected = _key(cache)
+    resumed = LLMCache(path=str(tmp_path / "cache.sqlite"), mode="replay")
+    resumed.set_ordinals(snapshot)
+    assert _key(resumed) == expected
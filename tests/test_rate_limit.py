@@ -0,0 +1,104 @@
+"""429 classification, Retry-After parsing and the retry loop of _acall_llm."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import instrumentation
+import llm_cache
+import nodes
+import rate_limiter
+from rate_limiter import is_rate_limit, is_transient, retry_after
+from run_config import RunConfig
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int, message: str = "", headers: dict = None):
+        super().__init__(message or f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_rate_limit_classification():
+    assert is_rate_limit(_StatusError(429))
+    assert not is_rate_limit(_StatusError(500, "rate of errors too high"))
+    assert not is_rate_limit(_StatusError(400, "invalid temperature: must be a rate in [0, 2]"))
+    assert is_rate_limit(RuntimeError("Error code: 429 - Too Many Requests"))
+    assert is_rate_limit(RuntimeError("RESOURCE_EXHAUSTED: quota"))
+    assert not is_rate_limit(ValueError("generation rate dropped"))
+    assert is_transient(_StatusError(503)) and not is_transient(_StatusError(429))
+    assert is_transient(TimeoutError()) and not is_transient(ValueError("rate"))
+
+
+def test_retry_after_headers():
+    assert retry_after(_StatusError(429, headers={"retry-after-ms": "1500"})) == 1.5
+    assert retry_after(_StatusError(429, headers={"retry-after": "3"})) == 3.0
+    assert retry_after(_StatusError(429, headers={"retry-after": "soon"})) is None
+    assert retry_after(_StatusError(429)) is None
+    assert retry_after(RuntimeError("429")) is None
+
+
+class _FlakyLLM:
+    """Raises the queued errors, then answers."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def bind(self, **kwargs):
+        return self
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return AIMessage(content='{"meetings": []}')
+
+
+@pytest.fixture
+def flaky(monkeypatch, tmp_path):
+    """Install a _FlakyLLM backend; records the backoffs _acall_llm asks for."""
+    waits = []
+    monkeypatch.setattr(nodes, "_llms", {})
+    monkeypatch.setattr(instrumentation, "PERF_FILE", str(tmp_path / "perf.csv"))
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache())
+    monkeypatch.setattr(rate_limiter, "_limiter", rate_limiter.RateLimiter(rpm=1e9, tpm=1e12))
+    monkeypatch.setattr(nodes, "_rate_limit_wait", lambda e, attempt: waits.append(("429", attempt)))
+    monkeypatch.setattr(nodes, "_transient_wait", lambda e, attempt: waits.append(("5xx", attempt)) or 0.0)
+
+    def install(errors):
+        llm = _FlakyLLM(errors)
+        monkeypatch.setitem(nodes.BACKENDS, "flaky", lambda seed: llm)
+        return llm
+    return install, waits
+
+
+def _call():
+    return asyncio.run(nodes._acall_llm(RunConfig(backend="flaky"), "prompt", temperature=0.5))
+
+
+def test_no_backoff_after_the_last_retry(flaky):
+    install, waits = flaky
+    llm = install([_StatusError(429)] * nodes.MAX_RETRIES)
+    with pytest.raises(RuntimeError, match="Max retries"):
+        _call()
+    assert llm.calls == nodes.MAX_RETRIES
+    assert waits == [("429", attempt) for attempt in range(nodes.MAX_RETRIES - 1)]
+
+
+def test_retries_then_answers(flaky):
+    install, waits = flaky
+    llm = install([_StatusError(429), _StatusError(503)])
+    assert _call() == '{"meetings": []}'
+    assert llm.calls == 3
+    assert waits == [("429", 0), ("5xx", 1)]
+
+
+def test_other_errors_are_not_retried(flaky):
+    install, waits = flaky
+    llm = install([_StatusError(400, "rate must be positive")])
+    with pytest.raises(_StatusError):
+        _call()
+    assert llm.calls == 1 and waits == []
@@ -0,0 +1,43 @@
+"""The repair operator returns plans without per-meeting, ordering or travel violations."""
+
+import json
+import random
+
+from evaluator import DAYS, evaluate
+from repair import repair
+from solver import solve
+
+FIXABLE_ONLY_BY_ADDING = {"C6", "C11"}  # repair never adds people
+
+
+def _perturbed(rng):
+    meetings = json.loads(solve()[1])["meetings"]
+    for m in rng.sample(meetings, rng.randint(1, len(meetings))):
+        start = rng.randint(7 * 60, 18 * 60)
+        m["start"] = f"{start // 60:02d}:{start % 60:02d}"
+        m["end"] = f"{(start + rng.choice([10, 30, 60])) // 60:02d}:{(start + 5) % 60:02d}"
+        m["day"] = rng.choice(DAYS + (0, 9))
+    rng.shuffle(meetings)
+    meetings += [dict(rng.choice(meetings)), {"person": "Nadie", "day": 1, "start": "09:00", "end": "09:30"}]
+    return json.dumps({"meetings": meetings})
+
+
+def test_repaired_plans_only_miss_people():
+    rng = random.Random(0)
+    for _ in range(100):
+        plan = _perturbed(rng)
+        fixed = repair(plan)
+        result = evaluate(fixed)
+        assert set(result.counts) <= FIXABLE_ONLY_BY_ADDING, result.feedback
+        people = {m["person"] for m in json.loads(fixed)["meetings"]}
+        assert people <= {m["person"] for m in json.loads(plan)["meetings"]}
+
+
+def test_optimal_plan_survives_repair():
+    assert evaluate(repair(solve()[1])).score == 1.0
+
+
+def test_unusable_input():
+    assert repair("no es json") is None
+    assert repair('{"meetings": 3}') is None
+    assert repair('{"meetings": [{"person": "Nadie"}]}') is None
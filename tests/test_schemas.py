@@ -0,0 +1,81 @@
+"""Plan outputs are validated against the schema, with targeted re-asks for bad ones."""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import instrumentation
+import llm_cache
+import nodes
+import rate_limiter
+from run_config import RunConfig
+from schemas import plan_error
+
+VALID = '{"meetings": [{"person": "Ana", "day": 1, "start": "09:00", "end": "09:45"}]}'
+
+
+def test_plan_error():
+    assert plan_error(VALID) == ""
+    assert plan_error('{"meetings": []}') == ""
+    assert plan_error('{"plan": []}') == "meetings: Field required"
+    assert plan_error('{"meetings": [{"person": "Ana", "start": "09:00", "end": "09:45"}]}') == "meetings.0.day: Field required"
+    assert plan_error('{"meetings": [{"person": "Ana", "day": "uno", "start": "09:00", "end": "09:45"}]}').startswith("meetings.0.day:")
+    assert plan_error("no es json")
+
+
+class _ScriptedLLM:
+    """Answers with the queued texts, remembering each prompt."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    def bind(self, **kwargs):
+        return self
+
+    async def ainvoke(self, messages):
+        self.prompts.append(messages[0].content)
+        return AIMessage(content=self.answers.pop(0))
+
+
+@pytest.fixture
+def scripted(monkeypatch, tmp_path):
+    monkeypatch.setattr(nodes, "_llms", {})
+    monkeypatch.setattr(instrumentation, "PERF_FILE", str(tmp_path / "perf.csv"))
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache())
+    monkeypatch.setattr(rate_limiter, "_limiter", rate_limiter.RateLimiter(rpm=1e9, tpm=1e12))
+
+    def install(answers):
+        llm = _ScriptedLLM(answers)
+        monkeypatch.setitem(nodes.BACKENDS, "scripted", lambda seed: llm)
+        return llm
+    return install
+
+
+def _plan(max_reasks: int = 1):
+    cfg = RunConfig(backend="scripted", max_reasks=max_reasks, prompt_format="full")
+    return asyncio.run(nodes._acall_plan(cfg, "INIT", temperature=0.9, prompt_type="init"))
+
+
+def test_reask_fixes_a_bad_plan(scripted):
+    llm = scripted(['Aqui esta: {"meetings": [{"person": "Ana", "start": "09:00"}]}', f"```json\n{VALID}\n```"])
+    text, calls, counts = _plan()
+    assert text == VALID and calls == 2
+    assert counts == {"invalid_outputs": 1, "reasks": 1, "invalid_children": 0}
+    assert "meetings.0.day: Field required" in llm.prompts[1]
+    assert '"person": "Ana", "start": "09:00"' in llm.prompts[1]
+
+
+def test_unfixable_plan_is_admitted_and_counted(scripted):
+    scripted(["nada", "tampoco"])
+    text, calls, counts = _plan()
+    assert calls == 2
+    assert counts == {"invalid_outputs": 2, "reasks": 1, "invalid_children": 1}
+
+
+def test_no_reasks(scripted):
+    llm = scripted(["nada"])
+    _, calls, counts = _plan(max_reasks=0)
+    assert calls == 1 and len(llm.prompts) == 1
+    assert counts == {"invalid_outputs": 1, "reasks": 0, "invalid_children": 1}